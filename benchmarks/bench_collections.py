@@ -0,0 +1,107 @@
+# benchmarks/bench_collections.py
+"""
+Recall vs latency vs memory for each Qdrant collection profile
+(qdrant_utils.COLLECTION_PROFILES).
+
+    python benchmarks/bench_collections.py --url http://localhost:6333 --points 50000
+    python benchmarks/bench_collections.py --profiles default int8 --top-k 10
+
+Recall@k is measured against exact brute-force cosine search in NumPy.
+Memory is estimated from the profile: vectors kept in RAM (float32 unless
+on_disk) plus the quantized copy. The in-process ":memory:" default ignores
+quantization and on-disk settings, so use a real server for meaningful
+numbers. Prints JSON results.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from qdrant_client import QdrantClient
+from qdrant_utils import (COLLECTION_PROFILES, create_collection_if_not_exists, forget_collection,
+                          upsert_documents, query_similar)
+from bench_pipeline import summarize
+
+
+def make_corpus(points: int, dim: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    # Clustered unit vectors: closer to real embeddings than i.i.d. noise
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    matrix = centers[rng.integers(0, clusters, points)] + 0.5 * rng.standard_normal((points, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def estimate_memory_bytes(profile, points: int, dim: int) -> int:
+    ram = 0 if profile.get("on_disk") else points * dim * 4
+    if profile.get("quantization") == "int8":
+        ram += points * dim
+    elif profile.get("quantization") == "binary":
+        ram += points * dim // 8
+    return ram
+
+
+def wait_until_indexed(client, name: str, timeout: float = 600.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if str(client.get_collection(name).status).lower().endswith("green"):
+            return
+        time.sleep(0.5)
+
+
+def run(points: int, dim: int, queries: int, top_k: int, profiles, url: str = None):
+    client = QdrantClient(url=url) if url else QdrantClient(":memory:")
+    corpus = make_corpus(points, dim)
+    query_vecs = make_corpus(queries, dim, seed=1)
+    exact = np.argsort(-(query_vecs @ corpus.T), axis=1)[:, :top_k]
+
+    ids = list(range(points))
+    payloads = [{"source": f"doc{i % 50}.pdf", "text": f"chunk {i}"} for i in ids]
+    results = {"points": points, "dim": dim, "top_k": top_k, "backend": url or ":memory:", "profiles": {}}
+
+    for name in profiles:
+        profile = COLLECTION_PROFILES[name]
+        collection = f"bench_profile_{name}"
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+        forget_collection(client, collection)
+
+        create_collection_if_not_exists(client, collection, dim, profile=profile)
+        # The in-process client is not thread-safe: upsert serially there
+        upsert_documents(client, collection, corpus, payloads, ids, parallel=4 if url else 1)
+        wait_until_indexed(client, collection)
+
+        os.environ["QDRANT_COLLECTION_PROFILE"] = name  # query_similar picks the search params
+        samples, hits = [], 0
+        for i, q in enumerate(query_vecs):
+            t0 = time.perf_counter()
+            found = query_similar(client, collection, q, top_k=top_k)
+            samples.append(time.perf_counter() - t0)
+            hits += len({p["id"] for p in found} & set(exact[i].tolist()))
+
+        results["profiles"][name] = {
+            **summarize(samples),
+            "recall_at_k": hits / (queries * top_k),
+            "est_memory_mb": estimate_memory_bytes(profile, points, dim) / 2 ** 20,
+        }
+        client.delete_collection(collection)
+        forget_collection(client, collection)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--profiles", nargs="+", choices=sorted(COLLECTION_PROFILES),
+                        default=list(COLLECTION_PROFILES))
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+    print(json.dumps(run(args.points, args.dim, args.queries, args.top_k, args.profiles, args.url), indent=2))
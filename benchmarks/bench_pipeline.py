@@ -0,0 +1,291 @@
+# benchmarks/bench_pipeline.py
+"""
+Offline benchmark suite: every external service is replaced by a local fake
+(see fakes.py), so runs are repeatable and need no credentials.
+
+Measures latency percentiles and throughput for
+- chunk_text on sample_data/Geography_of_India.pdf
+- build_embeddings_and_upsert (cold and unchanged re-ingest)
+- query_similar
+- build_pipeline_graph().invoke, end to end and per node, sequential and concurrent
+
+    python benchmarks/bench_pipeline.py --output bench.json
+    python benchmarks/bench_pipeline.py --chat-latency 0.5 --vector-backend qdrant-memory
+    python benchmarks/bench_pipeline.py --compare baseline.json --tolerance 0.2
+
+With --compare, exits 1 when a p50/p90 latency grows or a throughput
+drops by more than the tolerance relative to the baseline file.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeServices
+
+SAMPLE_PDF = os.path.join(ROOT, "sample_data", "Geography_of_India.pdf")
+COLLECTION = "bench_docs"
+
+WEATHER_QUESTIONS = ["weather in Delhi", "what is the weather in Mumbai", "temperature in Chennai"]
+RAG_QUESTIONS = [
+    "What are the major rivers of India?",
+    "Describe the climate of the Thar desert",
+    "Which mountain ranges form the northern boundary?",
+]
+
+
+# -------------------------------------
+# Timing helpers
+# -------------------------------------
+def summarize(samples: List[float], wall_seconds: float = None) -> Dict[str, float]:
+    """
+    Latency percentiles in milliseconds; throughput is samples / wall time
+    (sum of samples when the work ran sequentially).
+    """
+    arr = np.asarray(samples, dtype=np.float64) * 1000
+    wall = wall_seconds if wall_seconds is not None else float(np.sum(samples))
+    return {
+        "n": len(samples),
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p90_ms": float(np.percentile(arr, 90)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "max_ms": float(arr.max()),
+        "throughput_per_s": len(samples) / wall if wall > 0 else float("inf"),
+    }
+
+
+def time_calls(fn: Callable[[int], object], iterations: int) -> List[float]:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def timed_invoke(graph, user_input: str):
+    """
+    Runs the graph once; returns (total seconds, {node: seconds}).
+    Node time is the gap between consecutive state updates.
+    """
+    nodes = {}
+    started = last = time.perf_counter()
+    for update in graph.stream({"user_input": user_input}, stream_mode="updates"):
+        now = time.perf_counter()
+        for node in update:
+            nodes[node] = nodes.get(node, 0.0) + (now - last)
+        last = now
+    return time.perf_counter() - started, nodes
+
+
+def configure_env(fakes: FakeServices, workdir: str, vector_backend: str):
+    os.environ.update({
+        "OPENWEATHER_URL": fakes.weather_url,
+        "OPENWEATHER_API_KEY": "bench",
+        "AZURE_OPENAI_ENDPOINT": fakes.url,
+        "AZURE_OPENAI_KEY": "bench",
+        "AZURE_OPENAI_DEPLOYMENT": "bench-chat",
+        "EMBEDDING_MODEL_NAME": "bench-embedding",
+        "QDRANT_COLLECTION": COLLECTION,
+        "LOCAL_VECTOR_DIR": os.path.join(workdir, "vectors"),
+        "LEXICAL_INDEX_DIR": os.path.join(workdir, "lexical"),
+        "INGEST_MANIFEST_PATH": os.path.join(workdir, "manifest.sqlite"),
+        "DOCSTORE_PATH": os.path.join(workdir, "docstore.sqlite"),
+        # Caches would turn repeated iterations into lookups
+        "EMBEDDING_CACHE_DIR": "",
+        "ANSWER_CACHE_ENABLED": "0",
+        "WEATHER_CACHE_TTL": "0",
+        "LANGSMITH_TRACING": "false",
+    })
+    if vector_backend == "local":
+        os.environ["VECTOR_BACKEND"] = "local"
+    else:
+        os.environ["VECTOR_BACKEND"] = "qdrant"
+        os.environ["QDRANT_URL"] = ":memory:"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+# -------------------------------------
+# Suite
+# -------------------------------------
+def run_suite(iterations: int = 20, concurrency: int = 8, dim: int = 1536,
+              latency: Dict[str, float] = None, vector_backend: str = "local") -> Dict:
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    fakes = FakeServices(latency=latency, dim=dim).start()
+    configure_env(fakes, workdir, vector_backend)
+
+    # Imported after the environment points at the fakes
+    import pdf_rag
+    import docstore
+    import ingest_manifest
+    from graph import build_pipeline_graph
+    from qdrant_utils import get_vector_client, query_similar
+    from metrics import metrics
+
+    results: Dict[str, Dict] = {}
+    try:
+        # --- chunk_text ---
+        with open(SAMPLE_PDF, "rb") as f:
+            text = pdf_rag.extract_text_from_pdf(f.read())
+        results["chunk_text"] = summarize(time_calls(lambda i: pdf_rag.chunk_text(text), iterations))
+
+        # --- ingestion ---
+        qclient = get_vector_client()
+
+        def reset_collection():
+            qclient.delete_collection(COLLECTION)
+            ingest_manifest.get_manifest().forget_collection(COLLECTION)
+            docstore.get_docstore().forget_collection(COLLECTION)
+
+        def ingest_cold(i):
+            reset_collection()
+            pdf_rag.build_embeddings_and_upsert(SAMPLE_PDF)
+
+        results["ingest_cold"] = summarize(time_calls(ingest_cold, iterations))
+        results["ingest_unchanged"] = summarize(
+            time_calls(lambda i: pdf_rag.build_embeddings_and_upsert(SAMPLE_PDF), iterations)
+        )
+
+        # --- query_similar ---
+        rng = np.random.default_rng(0)
+        queries = rng.standard_normal((iterations * 10, dim)).astype(np.float32)
+        results["query_similar"] = summarize(
+            time_calls(lambda i: query_similar(qclient, COLLECTION, queries[i], top_k=4), len(queries))
+        )
+
+        # --- graph.invoke, sequential with per-node breakdown ---
+        graph = build_pipeline_graph(openweather_key="bench")
+        for path, questions in (("weather", WEATHER_QUESTIONS), ("rag", RAG_QUESTIONS)):
+            totals, per_node = [], {}
+            for i in range(iterations):
+                total, nodes = timed_invoke(graph, questions[i % len(questions)])
+                totals.append(total)
+                for node, seconds in nodes.items():
+                    per_node.setdefault(node, []).append(seconds)
+            results[f"graph_{path}"] = summarize(totals)
+            for node, samples in per_node.items():
+                results[f"graph_{path}.{node}"] = summarize(samples)
+
+        # --- graph.invoke under concurrency ---
+        mixed = WEATHER_QUESTIONS + RAG_QUESTIONS
+        jobs = [mixed[i % len(mixed)] for i in range(iterations * concurrency)]
+
+        def one(question):
+            t0 = time.perf_counter()
+            graph.invoke({"user_input": question})
+            return time.perf_counter() - t0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, jobs))
+        results[f"graph_concurrent_{concurrency}"] = summarize(samples, time.perf_counter() - started)
+
+    finally:
+        fakes.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "dim": dim,
+            "latency_s": fakes.latency,
+            "vector_backend": vector_backend,
+            "fake_requests": fakes.requests,
+        },
+        "results": results,
+        # In-process histograms/counters collected while the suite ran
+        "metrics": metrics.snapshot(),
+    }
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.2,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Lists regressions of `current` against `baseline` beyond `tolerance`.
+    Latency changes smaller than `min_delta_ms` are treated as noise.
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_ms", "p90_ms"):
+            if cur[key] > base[key] * (1 + tolerance) and cur[key] - base[key] >= min_delta_ms:
+                regressions.append(f"{name}.{key}: {base[key]:.2f} → {cur[key]:.2f}")
+        slower = cur["p50_ms"] - base["p50_ms"] >= min_delta_ms
+        if slower and cur["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}.throughput_per_s: {base['throughput_per_s']:.2f} → "
+                               f"{cur['throughput_per_s']:.2f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--weather-latency", type=float, default=0.05)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--chat-latency", type=float, default=0.2)
+    parser.add_argument("--vector-backend", choices=["local", "qdrant-memory"], default="local")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        dim=args.dim,
+        latency={"weather": args.weather_latency, "embeddings": args.embedding_latency,
+                 "chat": args.chat_latency},
+        vector_backend=args.vector_backend,
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(f"\n{'benchmark':<32}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for name, r in report["results"].items():
+        print(f"{name:<32}{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['throughput_per_s']:>10.1f}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
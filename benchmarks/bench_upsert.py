@@ -0,0 +1,81 @@
+# benchmarks/bench_upsert.py
+"""
+Compares the original per-point upsert against qdrant_utils.upsert_documents.
+
+    python benchmarks/bench_upsert.py --points 20000 --dim 1536
+    python benchmarks/bench_upsert.py --url http://localhost:6333   # real server
+
+Defaults to an in-process Qdrant (":memory:"), which is not thread-safe:
+there every upsert is serial and --parallel only applies with --url.
+Prints JSON results.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_utils import upsert_documents
+
+
+def legacy_upsert(client, collection_name, vectors, metadatas, ids):
+    # The pre-batching implementation, kept here as the baseline
+    cleaned_vectors = [list(map(float, v)) for v in vectors]
+    points = [
+        PointStruct(id=id_, vector=cleaned_vectors[i], payload=metadatas[i])
+        for i, id_ in enumerate(ids)
+    ]
+    client.upsert(collection_name=collection_name, points=points)
+
+
+def make_client(url):
+    return QdrantClient(url=url) if url else QdrantClient(":memory:")
+
+
+def reset(client, name, dim):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(name, vectors_config=VectorParams(size=dim, distance=Distance.COSINE))
+
+
+def run(points: int, dim: int, url: str = None, batch_size: int = 256, parallel: int = 4):
+    parallel = parallel if url else 1
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((points, dim)).astype(np.float32)
+    as_lists = matrix.tolist()
+    ids = list(range(points))
+    payloads = [{"text": f"chunk {i}", "source": "bench.pdf"} for i in ids]
+    client = make_client(url)
+    results = {"points": points, "dim": dim, "backend": url or ":memory:", "parallel": parallel}
+
+    reset(client, "bench_upsert", dim)
+    t0 = time.perf_counter()
+    legacy_upsert(client, "bench_upsert", as_lists, payloads, ids)
+    results["legacy_points_per_sec"] = points / (time.perf_counter() - t0)
+
+    for label, vectors, wait in (("lists_wait", as_lists, True),
+                                 ("numpy_wait", matrix, True),
+                                 ("numpy_fire_and_forget", matrix, False)):
+        reset(client, "bench_upsert", dim)
+        stats = upsert_documents(client, "bench_upsert", vectors, payloads, ids,
+                                 batch_size=batch_size, parallel=parallel, wait=wait)
+        results[f"{label}_points_per_sec"] = stats["points_per_sec"]
+
+    client.delete_collection("bench_upsert")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent upserts (with --url only)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.points, args.dim, args.url, args.batch_size, args.parallel), indent=2))
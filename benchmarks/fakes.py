@@ -0,0 +1,205 @@
+# benchmarks/fakes.py
+"""
+Deterministic local stand-ins for the external HTTP services.
+
+One threaded HTTP server answers:
+- GET  /data/2.5/weather?q=<city> | ?lat=&lon= | ?id=  (OpenWeatherMap)
+- POST /openai/deployments/<name>/embeddings           (Azure OpenAI embeddings)
+- POST /openai/deployments/<name>/chat/completions     (Azure OpenAI chat, incl. stream=true)
+
+Responses depend only on the request, and every endpoint sleeps for a
+configurable latency so network time can be simulated. Qdrant is replaced
+by QDRANT_URL=:memory: or VECTOR_BACKEND=local rather than a fake server.
+"""
+import json
+import time
+import base64
+import hashlib
+import threading
+import numpy as np
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_LATENCY = {"weather": 0.05, "embeddings": 0.05, "chat": 0.2}
+
+CHAT_REPLY = (
+    "Based on the provided context, the answer summarizes the most relevant "
+    "facts in a few short sentences without adding unsupported details."
+)
+
+
+def fake_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vec = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def fake_weather(city: str) -> Dict:
+    digest = hashlib.sha256(city.lower().encode("utf-8")).digest()
+    return {
+        "name": city.title(),
+        "main": {"temp": 10 + digest[0] % 30, "feels_like": 10 + digest[1] % 30,
+                 "humidity": 20 + digest[2] % 70},
+        "weather": [{"main": "Clear", "description": "clear sky"}],
+        "wind": {"speed": round(digest[3] / 50, 1)},
+        "cod": 200,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid 40ms delayed-ACK stalls
+    disable_nagle_algorithm = True
+    server: "_FakeHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.endswith("/data/2.5/weather"):
+            self.server.record("weather")
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            if "lat" in query and "lon" in query:
+                city = f"{query['lat']},{query['lon']}"
+            else:
+                city = query.get("q") or query.get("id", "")
+            if not city:
+                return self._send_json(400, {"cod": "400", "message": "Nothing to geocode"})
+            return self._send_json(200, fake_weather(city))
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path.endswith("/embeddings"):
+            self.server.record("embeddings")
+            return self._embeddings(self._read_json())
+        if path.endswith("/chat/completions"):
+            self.server.record("chat")
+            return self._chat(self._read_json())
+        self._send_json(404, {"error": "not found"})
+
+    def _embeddings(self, request: Dict):
+        inputs = request.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        data = []
+        for i, text in enumerate(inputs):
+            vec = fake_vector(str(text), self.server.dim)
+            if request.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vec.tobytes()).decode("ascii")
+            else:
+                embedding = vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(str(t)) // 4 for t in inputs)
+        self._send_json(200, {
+            "object": "list", "data": data, "model": request.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat(self, request: Dict):
+        base = {"id": "chatcmpl-fake", "created": int(time.time()),
+                "model": request.get("model", "fake-chat")}
+        if not request.get("stream"):
+            return self._send_json(200, dict(
+                base,
+                object="chat.completion",
+                choices=[{"index": 0, "finish_reason": "stop",
+                          "message": {"role": "assistant", "content": CHAT_REPLY}}],
+                usage={"prompt_tokens": 100, "completion_tokens": 30, "total_tokens": 130},
+            ))
+
+        # Server-sent events, one word per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for word in CHAT_REPLY.split(" "):
+            chunk = dict(base, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        done = dict(base, object="chat.completion.chunk",
+                    choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: Dict[str, float], dim: int):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.dim = dim
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+        delay = self.latency.get(endpoint, 0.0)
+        if delay:
+            time.sleep(delay)
+
+
+# -------------------------------------
+# Fake Services
+# -------------------------------------
+class FakeServices:
+    """
+    Starts the fake server on a free local port:
+
+        with FakeServices(latency={"chat": 0.1}) as fakes:
+            os.environ["AZURE_OPENAI_ENDPOINT"] = fakes.url
+            os.environ["OPENWEATHER_URL"] = fakes.weather_url
+    """
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None, dim: int = 1536,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.dim = dim
+        self._server = _FakeHTTPServer((host, port), self.latency, dim)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def weather_url(self) -> str:
+        return f"{self.url}/data/2.5/weather"
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        return dict(self._server.requests)
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeServices":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
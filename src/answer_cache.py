@@ -0,0 +1,174 @@
+# src/answer_cache.py
+import os
+import time
+import threading
+import itertools
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from metrics import metrics
+
+
+# -------------------------------------
+# Semantic Answer Cache
+# -------------------------------------
+class SemanticAnswerCache:
+    """
+    Caches RAG answers by query embedding.
+
+    A new query whose cosine similarity to a stored query is at least
+    `threshold` gets the stored answer, skipping retrieval and the LLM.
+    Entries are LRU/TTL bounded and tied to a collection generation, so
+    re-ingesting a collection invalidates every answer built on it.
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 512, ttl: float = 3600.0,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        # Stacked unit vectors for one vectorized similarity pass
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+        self._version = 0
+        self._matrix_version = -1
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _rebuild_matrix(self):
+        self._matrix_version = self._version
+        self._matrix_keys = list(self._entries)
+        self._matrix = (
+            np.stack([self._entries[k]["vector"] for k in self._matrix_keys])
+            if self._matrix_keys else None
+        )
+
+    def lookup(self, vector, collection: str) -> Tuple[Optional[Dict], int]:
+        """
+        Returns ({"answer", "chunk_ids", "contexts", "similarity"} or None, generation).
+        Pass the generation on to `store` so an answer built while the
+        collection was re-ingested is not saved as current.
+        """
+        q = self._normalize(vector)
+        now = self._clock()
+
+        with self._lock:
+            generation = self._generations.get(collection, 0)
+            if self._matrix_version != self._version:
+                self._rebuild_matrix()
+            if self._matrix is None or self._matrix.shape[1] != q.shape[0]:
+                self.misses += 1
+                metrics.inc("cache_requests_total", cache="answer", result="miss")
+                return None, generation
+
+            sims = self._matrix @ q
+            for i in np.argsort(-sims):
+                if sims[i] < self.threshold:
+                    break
+                key = self._matrix_keys[i]
+                entry = self._entries[key]
+                if entry["collection"] != collection or entry["generation"] != generation:
+                    continue
+                if now - entry["stored_at"] > self.ttl:
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc("cache_requests_total", cache="answer", result="hit")
+                return {
+                    "answer": entry["answer"],
+                    "chunk_ids": entry["chunk_ids"],
+                    "contexts": entry["contexts"],
+                    "similarity": float(sims[i]),
+                }, generation
+
+            self.misses += 1
+            metrics.inc("cache_requests_total", cache="answer", result="miss")
+            return None, generation
+
+    def store(self, vector, answer: str, chunk_ids: List, collection: str,
+              contexts: List[str] = None, generation: int = None):
+        """
+        `generation` is the one `lookup` returned before retrieval; when the
+        collection has been re-ingested since, the answer is stale and dropped.
+        """
+        with self._lock:
+            current = self._generations.get(collection, 0)
+            if generation is not None and generation != current:
+                return
+            now = self._clock()
+            # Drop expired entries first, then the least recently used
+            for key in [k for k, e in self._entries.items() if now - e["stored_at"] > self.ttl]:
+                del self._entries[key]
+            while len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+
+            self._entries[next(self._ids)] = {
+                "vector": self._normalize(vector),
+                "answer": answer,
+                "chunk_ids": list(chunk_ids),
+                "contexts": list(contexts or []),
+                "collection": collection,
+                "generation": current,
+                "stored_at": now,
+            }
+            self._version += 1
+
+    def invalidate_collection(self, collection: str):
+        """
+        Call after (re-)ingesting `collection`: every answer based on it is dropped.
+        """
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            for key in [k for k, e in self._entries.items() if e["collection"] == collection]:
+                del self._entries[key]
+            self._version += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """
+    Shared cache configured from ANSWER_CACHE_THRESHOLD / ANSWER_CACHE_SIZE /
+    ANSWER_CACHE_TTL, or None unless ANSWER_CACHE_ENABLED=1 (opt-in: a close
+    paraphrase with a different meaning can clear the threshold).
+    """
+    global _answer_cache
+    if os.getenv("ANSWER_CACHE_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = SemanticAnswerCache(
+                threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+                maxsize=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+                ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+            )
+        return _answer_cache
@@ -0,0 +1,39 @@
+# src/async_utils.py
+import asyncio
+import threading
+from typing import Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+# -------------------------------------
+# Shared background event loop
+# -------------------------------------
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns a process-wide event loop running on a daemon thread.
+    Async clients bound to this loop keep their connection pools alive
+    across synchronous calls.
+    """
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever, name="async-utils-loop", daemon=True
+            )
+            _thread.start()
+        return _loop
+
+
+def run_sync(coro: Awaitable, timeout: float = None):
+    """
+    Run a coroutine on the background loop and block until it finishes.
+    """
+    loop = get_background_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run_sync() cannot be called from the background loop thread")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
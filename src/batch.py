@@ -0,0 +1,182 @@
+# src/batch.py
+"""
+Batch question answering for regression sets and bulk FAQ generation.
+
+Instead of one graph.invoke (one embedding call, one vector search) per
+question, a batch is
+1. routed in one pass (pipeline.adecide_actions),
+2. for RAG questions: embedded with one embeddings request, checked against
+   the answer cache, searched with one query_batch_points request, and
+   their chunk texts fetched from the docstore in one query,
+3. answered by LLM calls fanned out with bounded concurrency
+   (BATCH_LLM_CONCURRENCY); weather and greeting questions run alongside.
+
+Results keep the input order; a failing question gets an "error" instead of
+failing the batch.
+
+    python src/batch.py questions.txt --output answers.jsonl
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Sequence
+from async_utils import run_sync
+from pipeline import adecide_actions, aweather_node, build_guardrailed_prompt
+from pdf_rag import aretrieve_many, aembed_queries, hit_texts, COLLECTION_NAME
+from context_packer import pack_contexts
+from answer_cache import get_answer_cache
+from llm_utils import asummarize_with_llm
+from graph import greeting_node
+from metrics import metrics, timed, configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+async def _answer_rag(questions: List[str], results: List[Dict], indexes: List[int],
+                      semaphore: asyncio.Semaphore, top_k: int):
+    answer_cache = get_answer_cache()
+    queries = [questions[i] for i in indexes]
+    q_vecs = None
+    generations = None
+
+    try:
+        if answer_cache is not None:
+            # The cache lookup needs every query vector up front, as in rag_node
+            q_vecs = await aembed_queries(queries)
+            pending = []
+            for i, q_vec in zip(indexes, q_vecs):
+                # Each question keeps the generation its own lookup saw
+                cached, generation = answer_cache.lookup(q_vec, COLLECTION_NAME)
+                if cached is not None:
+                    results[i].update(raw=cached["contexts"], summary=cached["answer"])
+                else:
+                    pending.append((i, q_vec, generation))
+            indexes = [i for i, _, _ in pending]
+            q_vecs = [v for _, v, _ in pending]
+            generations = [g for _, _, g in pending]
+            queries = [questions[i] for i in indexes]
+
+        hit_lists = await aretrieve_many(queries, top_k=top_k, q_vecs=q_vecs)
+    except Exception as e:
+        # Embedding or search failed for the whole group
+        for i in indexes:
+            results[i]["error"] = _error(e)
+        return
+
+    # One docstore round trip for every hit of every question
+    flat = [hit for hits in hit_lists for hit in hits]
+    texts = iter(hit_texts(flat))
+    per_question = [[next(texts) for _ in hits] for hits in hit_lists]
+
+    async def answer(i: int, hits: List[Dict], hit_text: List, q_vec, generation):
+        try:
+            contexts = pack_contexts(hits, hit_text)["contexts"]
+            prompt = build_guardrailed_prompt(contexts, questions[i])
+            async with semaphore:
+                summary = await asummarize_with_llm(prompt)
+            results[i].update(raw=contexts, summary=summary)
+            if answer_cache is not None:
+                answer_cache.store(q_vec, summary, [h["id"] for h in hits], COLLECTION_NAME, contexts,
+                                   generation=generation)
+        except Exception as e:
+            results[i]["error"] = _error(e)
+
+    vecs = q_vecs if q_vecs is not None else [None] * len(indexes)
+    gens = generations if generations is not None else [None] * len(indexes)
+    await asyncio.gather(*(answer(i, hits, t, v, g)
+                           for i, hits, t, v, g in zip(indexes, hit_lists, per_question, vecs, gens)))
+
+
+async def _answer_weather(question: str, result: Dict, semaphore: asyncio.Semaphore,
+                          openweather_key: str):
+    try:
+        async with semaphore:
+            update = await aweather_node({"user_input": question}, openweather_key=openweather_key)
+        result.update(raw=update["raw"], summary=update["summary"])
+    except Exception as e:
+        result["error"] = _error(e)
+
+
+@timed("batch_seconds")
+async def aanswer_batch(questions: Sequence[str], openweather_key: str = None, top_k: int = 4,
+                        concurrency: int = None) -> List[Dict]:
+    """
+    Answers every question; returns [{"input", "action", "summary", "raw", "error"}]
+    in input order.
+    """
+    questions = list(questions)
+    concurrency = concurrency or int(os.getenv("BATCH_LLM_CONCURRENCY", "16"))
+    semaphore = asyncio.Semaphore(concurrency)
+    metrics.set_gauge("payload_items", len(questions), kind="batch_questions")
+
+    actions = await adecide_actions(questions)
+    results = [{"input": q, "action": a, "summary": None, "raw": None, "error": None}
+               for q, a in zip(questions, actions)]
+
+    tasks = []
+    rag = [i for i, a in enumerate(actions) if a == "pdf_rag"]
+    if rag:
+        tasks.append(_answer_rag(questions, results, rag, semaphore, top_k))
+    for i, action in enumerate(actions):
+        if action == "weather":
+            tasks.append(_answer_weather(questions[i], results[i], semaphore,
+                                         openweather_key or os.getenv("OPENWEATHER_API_KEY")))
+        elif action == "greeting":
+            results[i].update(greeting_node({"user_input": questions[i]}))
+
+    await asyncio.gather(*tasks)
+
+    failed = sum(1 for r in results if r["error"])
+    metrics.inc("batch_questions_total", len(results) - failed, result="ok")
+    metrics.inc("batch_questions_total", failed, result="error")
+    return results
+
+
+def answer_batch(questions: Sequence[str], openweather_key: str = None, top_k: int = 4,
+                 concurrency: int = None) -> List[Dict]:
+    """
+    Sync `aanswer_batch`, run on the shared background event loop.
+    """
+    return run_sync(aanswer_batch(questions, openweather_key, top_k, concurrency))
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Answer a file of questions (one per line) in one batch.")
+    parser.add_argument("questions", help="Text file with one question per line")
+    parser.add_argument("--output", default="-", help="JSONL output path ('-' for stdout)")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    with open(args.questions, encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+
+    started = time.perf_counter()
+    results = answer_batch(questions, top_k=args.top_k, concurrency=args.concurrency)
+    seconds = time.perf_counter() - started
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for r in results:
+            out.write(json.dumps({k: r[k] for k in ("input", "action", "summary", "error")}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    failed = sum(1 for r in results if r["error"])
+    logger.info("Answered %d questions in %.1fs (%.1f/s), %d errors",
+                len(results), seconds, len(results) / max(seconds, 1e-9), failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# src/bulk_ingest.py
+"""
+Bulk PDF ingestion.
+
+Page extraction runs across a process pool (large files are split into
+page ranges). The parent chunks each whole file with the same chunker as the
+Streamlit and streaming paths (ingest_stream.iter_chunks), so a PDF gets the
+same chunk ids however it is ingested; only chunks missing from the ingest
+manifest are embedded, through one shared scheduler and Qdrant client.
+
+Usage:
+    python src/bulk_ingest.py <directory-or-glob> [--workers N] [--report report.json]
+"""
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from pypdf import PdfReader
+from ingest_stream import iter_chunks
+from metrics import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_pdf_paths(target: str) -> List[str]:
+    """
+    A directory is searched recursively for *.pdf; anything else is a glob.
+    """
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*.pdf")
+    else:
+        pattern = target
+    return sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+
+
+# -------------------------------------
+# Worker side (runs in child processes)
+# -------------------------------------
+def count_pages(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def extract_pages(path: str, start: int, end: int) -> Dict:
+    """
+    Extracts the text of pages [start, end) of `path`.
+    """
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        pages = [(i, reader.pages[i].extract_text() or "") for i in range(start, end)]
+    return {
+        "path": path,
+        "start": start,
+        "pages": pages,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def plan_tasks(paths: List[str], page_counts: Dict[str, int],
+               pages_per_task: int) -> List[Tuple[str, int, int]]:
+    tasks = []
+    for path in paths:
+        total = page_counts.get(path, 0)
+        for start in range(0, total, pages_per_task):
+            tasks.append((path, start, min(start + pages_per_task, total)))
+    return tasks
+
+
+# -------------------------------------
+# Driver
+# -------------------------------------
+def bulk_ingest(
+    target: str,
+    workers: int = None,
+    pages_per_task: int = 50,
+    report_path: str = None,
+    embed_fn: Callable[[List[str]], List[List[float]]] = None,
+    upsert_fn: Callable[[List[str], List[Optional[List[float]]], str], None] = None,
+    diff_fn: Callable[[List[str], str], List[int]] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+) -> List[Dict]:
+    """
+    Ingests every PDF matched by `target` and returns one report per file:
+    {file, pages, chunks, embedded, extract_seconds, embed_seconds, upsert_seconds, error}.
+
+    `diff_fn(chunks, source_name)` returns the indexes of chunks that need
+    embedding (default: all); `upsert_fn(chunks, vectors, source_name)` gets
+    None for the others. All three default to the shared embedding
+    scheduler, ingest manifest and Qdrant collection from pdf_rag.
+    """
+    if embed_fn is None or upsert_fn is None:
+        from pdf_rag import get_ingest_backend
+        default_embed, default_upsert, default_diff = get_ingest_backend()
+        embed_fn = embed_fn or default_embed
+        upsert_fn = upsert_fn or default_upsert
+        diff_fn = diff_fn or default_diff
+
+    paths = resolve_pdf_paths(target)
+    reports = {
+        p: {"file": p, "pages": 0, "chunks": 0, "embedded": 0, "extract_seconds": 0.0,
+            "embed_seconds": 0.0, "upsert_seconds": 0.0, "error": None}
+        for p in paths
+    }
+    parts: Dict[str, Dict[int, List[Tuple[int, str]]]] = {p: {} for p in paths}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # --- Page counts ---
+        count_futures = {pool.submit(count_pages, p): p for p in paths}
+        for fut in as_completed(count_futures):
+            path = count_futures[fut]
+            try:
+                reports[path]["pages"] = fut.result()
+            except Exception as e:
+                reports[path]["error"] = f"{type(e).__name__}: {e}"
+
+        # --- Page extraction ---
+        tasks = plan_tasks(paths, {p: r["pages"] for p, r in reports.items()}, pages_per_task)
+        pending = {p: 0 for p in paths}
+        futures = {}
+        for path, start, end in tasks:
+            pending[path] += 1
+            futures[pool.submit(extract_pages, path, start, end)] = path
+
+        for fut in as_completed(futures):
+            path = futures[fut]
+            report = reports[path]
+            pending[path] -= 1
+            try:
+                result = fut.result()
+                parts[path][result["start"]] = result["pages"]
+                report["extract_seconds"] += result["seconds"]
+            except Exception as e:
+                report["error"] = f"{type(e).__name__}: {e}"
+
+            if pending[path] == 0 and report["error"] is None:
+                # All page ranges of this file are done → chunk, embed + upsert now
+                pages = _ordered_pages(parts.pop(path))
+                chunks = [text for _, text in iter_chunks(pages, chunk_size, chunk_overlap)]
+                _embed_and_upsert(path, chunks, report, embed_fn, upsert_fn, diff_fn)
+
+    total = time.perf_counter() - started
+    ordered = [reports[p] for p in paths]
+    logger.info("Ingested %d chunks from %d files in %.1fs (%d failed)",
+                sum(r["chunks"] for r in ordered), len(paths), total,
+                sum(1 for r in ordered if r["error"]))
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"target": target, "seconds": total, "files": ordered}, f, indent=2)
+
+    return ordered
+
+
+def _ordered_pages(parts: Dict[int, List[Tuple[int, str]]]) -> List[Tuple[int, str]]:
+    return [page for start in sorted(parts) for page in parts[start]]
+
+
+def _embed_and_upsert(path: str, chunks: List[str], report: Dict, embed_fn, upsert_fn, diff_fn):
+    report["chunks"] = len(chunks)
+    if not chunks:
+        return
+    source_name = os.path.basename(path)
+    try:
+        t0 = time.perf_counter()
+        # Unchanged chunks are already in the collection: no embedding call
+        needed = diff_fn(chunks, source_name) if diff_fn else range(len(chunks))
+        vectors = [None] * len(chunks)
+        if needed:
+            for i, vec in zip(needed, embed_fn([chunks[i] for i in needed])):
+                vectors[i] = vec
+        report["embedded"] = len(needed)
+        report["embed_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        upsert_fn(chunks, vectors, source_name)
+        report["upsert_seconds"] = time.perf_counter() - t0
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest PDFs into the vector store.")
+    parser.add_argument("target", help="Directory of PDFs or a glob such as 'docs/*.pdf'")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--pages-per-task", type=int, default=50)
+    parser.add_argument("--report", default="ingest_report.json", help="Per-file JSON report path")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    reports = bulk_ingest(args.target, workers=args.workers,
+                          pages_per_task=args.pages_per_task, report_path=args.report)
+    return 1 if any(r["error"] for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
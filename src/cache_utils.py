@@ -0,0 +1,101 @@
+# src/cache_utils.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries go stale after `ttl` seconds.
+
+    Stale entries are kept for another `stale_ttl` seconds so callers can
+    serve them while a fresh value is fetched (stale-while-revalidate).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0,
+                 stale_ttl: float = 0.0, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable, allow_stale: bool = False) -> Tuple[Any, bool]:
+        """
+        Return (value, is_fresh). On a miss the value is None.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            value, stored_at = entry
+            age = self._clock() - stored_at
+
+            if age <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value, True
+
+            if age <= self.ttl + self.stale_ttl:
+                if allow_stale:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, False
+                self.misses += 1
+                return None, False
+
+            # Past the stale window: drop it
+            del self._data[key]
+            self.misses += 1
+            return None, False
+
+    def get(self, key: Hashable, default=None):
+        value, fresh = self.lookup(key)
+        return value if fresh else default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (value, self._clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
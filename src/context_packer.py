@@ -0,0 +1,164 @@
+# src/context_packer.py
+"""
+Packs retrieved chunks into the prompt context.
+
+chunk_text overlaps consecutive chunks by ~200 characters, so neighbouring
+hits repeat text. The packer
+- merges adjacent chunks of the same source (by payload "chunk_index",
+  confirmed by the overlapping text), dropping the overlapping span,
+- drops chunks that are duplicates of, or contained in, another chunk,
+- orders the result by retrieval score,
+- keeps whole chunks within a token budget (token_utils.count_tokens).
+"""
+import os
+import logging
+from typing import Dict, List, Optional, Sequence
+from token_utils import count_tokens
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+# Shortest overlap treated as repeated text rather than a coincidence
+MIN_OVERLAP_CHARS = 20
+
+
+def default_budget() -> Optional[int]:
+    """
+    RAG_CONTEXT_TOKENS (default 3000); 0 disables the budget.
+    """
+    budget = int(os.getenv("RAG_CONTEXT_TOKENS", "3000"))
+    return budget if budget > 0 else None
+
+
+def overlap_length(left: str, right: str, max_overlap: int = 400) -> int:
+    """
+    Length of the longest suffix of `left` that is also a prefix of `right`.
+    """
+    longest = min(len(left), len(right), max_overlap)
+    tail = left[-longest:]
+    # Candidate starts are occurrences of right's first characters in the tail
+    probe = right[:MIN_OVERLAP_CHARS]
+    start = tail.find(probe)
+    while start != -1:
+        if right.startswith(tail[start:]):
+            return len(tail) - start
+        start = tail.find(probe, start + 1)
+    return 0
+
+
+def merge_texts(left: str, right: str) -> str:
+    k = overlap_length(left, right)
+    if k >= MIN_OVERLAP_CHARS:
+        return left + right[k:]
+    return left + "\n" + right
+
+
+def _entries(hits: Sequence, texts: Sequence[Optional[str]]) -> List[Dict]:
+    entries = []
+    for rank, (hit, text) in enumerate(zip(hits, texts)):
+        if not text:
+            continue
+        payload = (hit.get("payload") if isinstance(hit, dict) else getattr(hit, "payload", None)) or {}
+        score = hit.get("score") if isinstance(hit, dict) else getattr(hit, "score", None)
+        entries.append({
+            "text": text,
+            "source": payload.get("source"),
+            "chunk_index": payload.get("chunk_index"),
+            # Hits without a score keep their retrieval order
+            "score": score if score is not None else -rank,
+        })
+    return entries
+
+
+def joins_up(left: str, right: str) -> bool:
+    """
+    True when `right` continues `left` through chunk_text's overlap.
+    """
+    return overlap_length(left, right) >= MIN_OVERLAP_CHARS
+
+
+def merge_adjacent(entries: List[Dict]) -> List[Dict]:
+    """
+    Joins runs of consecutive chunk_index values from one source into one
+    entry, but only where the texts overlap: the stored index alone is not
+    trusted. Hits sharing a (source, chunk_index) stay separate entries.
+    """
+    by_source, rest = {}, []
+    for e in entries:
+        if e["source"] is not None and isinstance(e["chunk_index"], int):
+            by_source.setdefault(e["source"], []).append(e)
+        else:
+            rest.append(e)
+
+    merged = []
+    for group in by_source.values():
+        runs: List[Dict] = []
+        for e in sorted(group, key=lambda e: e["chunk_index"]):
+            for i, run in enumerate(runs):
+                if run["chunk_index"] == e["chunk_index"] - 1 and joins_up(run["text"], e["text"]):
+                    runs[i] = {**run, "text": merge_texts(run["text"], e["text"]),
+                               "chunk_index": e["chunk_index"], "score": max(run["score"], e["score"])}
+                    break
+            else:
+                runs.append(e)
+        merged.extend(runs)
+    return merged + rest
+
+
+def drop_duplicates(entries: List[Dict]) -> List[Dict]:
+    """
+    Removes entries whose text is contained in a longer (or better-scored equal) entry.
+    """
+    ordered = sorted(entries, key=lambda e: (-len(e["text"]), -e["score"]))
+    kept: List[Dict] = []
+    for e in ordered:
+        if any(e["text"] in k["text"] for k in kept):
+            continue
+        kept.append(e)
+    return kept
+
+
+def fit_budget(contexts: List[str], budget_tokens: Optional[int]) -> List[str]:
+    """
+    Whole contexts, in order, within `budget_tokens` (None/0 → no limit); one
+    that does not fit is skipped so smaller later ones can still be used.
+    """
+    if not budget_tokens:
+        return list(contexts)
+    separator = count_tokens(CONTEXT_SEPARATOR)
+    used, kept = 0, []
+    for text in contexts:
+        cost = count_tokens(text) + (separator if kept else 0)
+        if used + cost <= budget_tokens:
+            kept.append(text)
+            used += cost
+    return kept
+
+
+def pack_contexts(hits: Sequence, texts: Sequence[Optional[str]],
+                  budget_tokens: Optional[int] = None) -> Dict:
+    """
+    hits: retrieval hits ({"id", "score", "payload"}) aligned with `texts`.
+    budget_tokens: token cap for the joined contexts (None → default_budget(), 0 → unlimited).
+
+    Returns {"contexts", "tokens", "tokens_before", "tokens_saved"}, where
+    tokens_before is what joining every hit unchanged would have cost.
+    """
+    if budget_tokens is None:
+        budget_tokens = default_budget()
+
+    raw = [t for t in texts if t]
+    entries = drop_duplicates(merge_adjacent(_entries(hits, texts)))
+    entries.sort(key=lambda e: -e["score"])
+    contexts = fit_budget([e["text"] for e in entries], budget_tokens)
+
+    before = count_tokens(CONTEXT_SEPARATOR.join(raw)) if raw else 0
+    after = count_tokens(CONTEXT_SEPARATOR.join(contexts)) if contexts else 0
+    saved = max(0, before - after)
+
+    metrics.inc("prompt_context_tokens_saved_total", saved)
+    metrics.set_gauge("payload_items", len(contexts), kind="packed_contexts")
+    logger.debug("Packed %d hits into %d contexts: %d → %d tokens", len(raw), len(contexts), before, after)
+    return {"contexts": contexts, "tokens": after, "tokens_before": before, "tokens_saved": saved}
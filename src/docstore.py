@@ -0,0 +1,158 @@
+# src/docstore.py
+import os
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from metrics import metrics
+
+# SQLite caps bound parameters per statement; fetch/delete in slices
+_SQL_BATCH = 500
+
+
+# -------------------------------------
+# Chunk Document Store
+# -------------------------------------
+class ChunkStore:
+    """
+    Chunk texts keyed by (collection, vector point id), zlib-compressed in
+    SQLite. Point ids do not include the collection, so the same PDF in two
+    collections gets two independent rows.
+
+    Vector payloads only carry ids and metadata; retrieval fetches the texts
+    of all hits in one query, with an in-process LRU in front of SQLite.
+    """
+
+    def __init__(self, path: str, cache_size: int = 2048, level: int = 6):
+        self.path = path
+        self.level = level
+        self.cache_size = cache_size
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate_point_id_key()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " collection TEXT NOT NULL, point_id TEXT NOT NULL, data BLOB NOT NULL,"
+            " PRIMARY KEY (collection, point_id))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def _migrate_point_id_key(self):
+        # Stores written when point_id alone was the primary key
+        pk = [row[1] for row in self._conn.execute("PRAGMA table_info(chunks)") if row[5]]
+        if pk != ["point_id"]:
+            return
+        self._conn.execute("ALTER TABLE chunks RENAME TO chunks_by_point_id")
+        self._conn.execute(
+            "CREATE TABLE chunks ("
+            " collection TEXT NOT NULL, point_id TEXT NOT NULL, data BLOB NOT NULL,"
+            " PRIMARY KEY (collection, point_id))"
+        )
+        self._conn.execute(
+            "INSERT INTO chunks (collection, point_id, data)"
+            " SELECT collection, point_id, data FROM chunks_by_point_id"
+        )
+        self._conn.execute("DROP TABLE chunks_by_point_id")
+        self._conn.execute("DROP INDEX IF EXISTS chunks_collection")
+        self._conn.commit()
+
+    def _remember(self, key: Tuple[str, str], text: str):
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def put_many(self, collection: str, ids: Sequence, texts: Sequence[str]):
+        rows = [(collection, str(i), zlib.compress(t.encode("utf-8"), self.level))
+                for i, t in zip(ids, texts)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (collection, point_id, data) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            for i, t in zip(ids, texts):
+                if (collection, str(i)) in self._cache:
+                    self._cache[(collection, str(i))] = t
+
+    def get_many(self, collection: str, ids: Sequence) -> List[Optional[str]]:
+        """
+        Texts in the order of `ids` (None when unknown); one SQLite query per 500 misses.
+        """
+        keys = [str(i) for i in ids]
+        found: Dict[str, str] = {}
+        with self._lock:
+            missing = []
+            for key in dict.fromkeys(keys):
+                text = self._cache.get((collection, key))
+                if text is None:
+                    missing.append(key)
+                else:
+                    self._cache.move_to_end((collection, key))
+                    found[key] = text
+
+            for s in range(0, len(missing), _SQL_BATCH):
+                part = missing[s:s + _SQL_BATCH]
+                rows = self._conn.execute(
+                    "SELECT point_id, data FROM chunks"
+                    f" WHERE collection = ? AND point_id IN ({','.join('?' * len(part))})",
+                    [collection, *part]
+                )
+                for key, data in rows:
+                    found[key] = zlib.decompress(data).decode("utf-8")
+                    self._remember((collection, key), found[key])
+
+        hits = len(set(keys)) - len(missing)
+        metrics.inc("cache_requests_total", hits, cache="docstore", result="hit")
+        metrics.inc("cache_requests_total", len(missing), cache="docstore", result="miss")
+        return [found.get(key) for key in keys]
+
+    def delete(self, collection: str, ids: Iterable):
+        keys = [str(i) for i in ids]
+        with self._lock:
+            for s in range(0, len(keys), _SQL_BATCH):
+                part = keys[s:s + _SQL_BATCH]
+                self._conn.execute(
+                    f"DELETE FROM chunks WHERE collection = ? AND point_id IN ({','.join('?' * len(part))})",
+                    [collection, *part]
+                )
+            self._conn.commit()
+            for key in keys:
+                self._cache.pop((collection, key), None)
+
+    def forget_collection(self, collection: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE collection = ?", (collection,))
+            self._conn.commit()
+            for key in [k for k in self._cache if k[0] == collection]:
+                del self._cache[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_docstore: Optional[ChunkStore] = None
+_docstore_lock = threading.Lock()
+
+
+def get_docstore() -> ChunkStore:
+    """
+    Shared store at DOCSTORE_PATH (default .cache/docstore.sqlite), LRU of DOCSTORE_CACHE_SIZE texts.
+    """
+    global _docstore
+    with _docstore_lock:
+        if _docstore is None:
+            _docstore = ChunkStore(
+                os.getenv("DOCSTORE_PATH", ".cache/docstore.sqlite"),
+                cache_size=int(os.getenv("DOCSTORE_CACHE_SIZE", "2048")),
+            )
+        return _docstore
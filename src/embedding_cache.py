@@ -0,0 +1,172 @@
+# src/embedding_cache.py
+import os
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# -------------------------------------
+# Persistent Embedding Cache
+# -------------------------------------
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (model name, sha256(text)).
+
+    Vectors are appended as float32 rows to one file per dimension and read
+    back through a memory map; SQLite only stores the row index per key.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, "index.sqlite"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+        self._maps: Dict[int, np.memmap] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _vector_path(self, dim: int) -> str:
+        return os.path.join(self.cache_dir, f"vectors_{dim}.f32")
+
+    def _rows_on_disk(self, dim: int) -> int:
+        path = self._vector_path(dim)
+        return os.path.getsize(path) // (4 * dim) if os.path.exists(path) else 0
+
+    def _matrix(self, dim: int, min_rows: int) -> np.memmap:
+        # Re-map when the file has grown past the current mapping
+        mm = self._maps.get(dim)
+        if mm is None or mm.shape[0] < min_rows:
+            rows = self._rows_on_disk(dim)
+            mm = np.memmap(self._vector_path(dim), dtype=np.float32, mode="r",
+                           shape=(rows, dim))
+            self._maps[dim] = mm
+        return mm
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Returns one float32 vector per text, or None where the text is not cached.
+        """
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, dim, row FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *batch]
+                ).fetchall()
+                for h, dim, row in rows:
+                    found[h] = (dim, row)
+
+            results = []
+            for h in hashes:
+                loc = found.get(h)
+                if loc is None:
+                    results.append(None)
+                    continue
+                dim, row = loc
+                results.append(np.array(self._matrix(dim, row + 1)[row]))
+
+            hit_count = sum(r is not None for r in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        metrics.inc("cache_requests_total", hit_count, cache="embedding", result="hit")
+        metrics.inc("cache_requests_total", len(results) - hit_count, cache="embedding", result="miss")
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        dim = matrix.shape[1]
+
+        row_bytes = 4 * dim
+        with self._lock, open(self._vector_path(dim), "ab") as f:
+            # Streamlit, bulk_ingest workers and the server may share the
+            # directory: the append and the row index insert happen under one
+            # exclusive file lock, and the start row is the file's real end.
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                end = f.seek(0, os.SEEK_END)
+                if end % row_bytes:
+                    # Drop a partial row left by a writer that died mid-append
+                    end = f.truncate(end - end % row_bytes)
+                start = end // row_bytes
+                f.write(matrix.tobytes())
+                f.flush()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, row) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(model, text_hash(t), dim, start + i) for i, t in enumerate(texts)]
+                )
+                self._conn.commit()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._maps.clear()
+            self._conn.close()
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Returns the process-wide cache at EMBEDDING_CACHE_DIR.
+    Set EMBEDDING_CACHE_DIR to an empty string to disable caching.
+    """
+    global _default_cache
+    cache_dir = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+    if not cache_dir:
+        return None
+    with _default_lock:
+        if _default_cache is None or _default_cache.cache_dir != cache_dir:
+            _default_cache = EmbeddingCache(cache_dir)
+        return _default_cache
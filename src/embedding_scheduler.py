@@ -0,0 +1,115 @@
+# src/embedding_scheduler.py
+import os
+import random
+import time
+import logging
+import openai
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Sequence
+from token_utils import count_tokens
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def pack_batches(texts: Sequence[str], max_tokens: int = 32000, max_items: int = 256,
+                 token_counter: Callable[[str], int] = count_tokens) -> List[List[int]]:
+    """
+    Greedily packs text indices into batches that stay under `max_tokens`
+    and `max_items`. A single text larger than the budget gets its own batch.
+    """
+    batches, current, current_tokens = [], [], 0
+
+    for i, text in enumerate(texts):
+        tokens = token_counter(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+# -------------------------------------
+# Embedding Scheduler
+# -------------------------------------
+class EmbeddingScheduler:
+    """
+    Embeds a large list of texts as token-budgeted batches, running up to
+    `concurrency` batches at once and retrying transient failures per batch.
+    Results come back in input order.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]],
+                 max_batch_tokens: int = 32000, max_batch_items: int = 256,
+                 concurrency: int = 4, max_retries: int = 5, backoff: float = 1.0):
+        self.embed_fn = embed_fn
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self.embed_fn(batch)
+            except TRANSIENT_ERRORS as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** (attempt - 1)) * (1 + random.random())
+                metrics.inc("retries_total", stage="embedding_batch", error=type(e).__name__)
+                logger.warning("Embedding batch failed (%s), retry %d in %.1fs", type(e).__name__, attempt, delay)
+                time.sleep(delay)
+
+    def embed(self, texts: Sequence[str], on_batch_done: Callable[[int, int], None] = None) -> List[List[float]]:
+        texts = list(texts)
+        batches = pack_batches(texts, self.max_batch_tokens, self.max_batch_items)
+        results: List[List[float]] = [None] * len(texts)
+
+        if len(batches) <= 1 or self.concurrency <= 1:
+            for done, idx in enumerate(batches, 1):
+                for i, vec in zip(idx, self._embed_batch([texts[i] for i in idx])):
+                    results[i] = vec
+                if on_batch_done:
+                    on_batch_done(done, len(batches))
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [texts[i] for i in idx]): idx
+                for idx in batches
+            }
+            for done, fut in enumerate(as_completed(futures), 1):
+                for i, vec in zip(futures[fut], fut.result()):
+                    results[i] = vec
+                if on_batch_done:
+                    on_batch_done(done, len(batches))
+
+        return results
+
+
+def get_embedding_scheduler(embed_fn: Callable[[List[str]], List[List[float]]]) -> EmbeddingScheduler:
+    """
+    Scheduler configured from EMBED_BATCH_TOKENS / EMBED_BATCH_SIZE /
+    EMBED_CONCURRENCY / EMBED_MAX_RETRIES.
+    """
+    return EmbeddingScheduler(
+        embed_fn,
+        max_batch_tokens=int(os.getenv("EMBED_BATCH_TOKENS", "32000")),
+        max_batch_items=int(os.getenv("EMBED_BATCH_SIZE", "256")),
+        concurrency=int(os.getenv("EMBED_CONCURRENCY", "4")),
+        max_retries=int(os.getenv("EMBED_MAX_RETRIES", "5")),
+    )
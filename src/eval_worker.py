@@ -0,0 +1,180 @@
+# src/eval_worker.py
+"""
+Background evaluation worker pool.
+
+Finished runs are queued with `submit`; worker threads run the evaluators
+off the request path and post each score to LangSmith feedback as it
+completes. LLM-as-judge evaluators share one judge client and are limited
+to `judge_concurrency` calls at a time.
+"""
+import os
+import queue
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+from metrics import metrics, timed
+
+logger = logging.getLogger(__name__)
+
+
+class ExampleWrapper:
+    def __init__(self, inputs, expected=None):
+        self.inputs = inputs
+        self.expected = expected
+
+
+class RunWrapper:
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+
+# -------------------------------------
+# Worker Pool
+# -------------------------------------
+class EvalWorkerPool:
+    """
+    `submit(...)` returns a job id immediately; `result(job_id)` returns
+    {"status": "pending" | "done" | "dropped", "scores": {name: score}}.
+    """
+
+    def __init__(self, evaluators: Sequence[Callable], judge_evaluators: Sequence[Callable] = (),
+                 feedback_client=None, workers: int = 4, judge_concurrency: int = 2,
+                 queue_size: int = 256, max_results: int = 1000):
+        self.evaluators = list(evaluators)
+        self.judge_evaluators = set(judge_evaluators)
+        self.feedback_client = feedback_client
+        self.max_results = max_results
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._judge_slots = threading.Semaphore(judge_concurrency)
+        self._results: "OrderedDict[int, Dict]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self.completed = 0
+        self.dropped = 0
+        self.errors = 0
+
+        for i in range(workers):
+            t = threading.Thread(target=self._work, name=f"eval-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, run_id, inputs: Dict, outputs: Dict, expected: Dict = None) -> int:
+        """
+        Queues a finished run for evaluation without blocking. When the queue
+        is full the job is dropped rather than slowing down the caller.
+        """
+        job_id = next(self._ids)
+        job = (job_id, run_id, ExampleWrapper(inputs, expected or {}), RunWrapper(outputs))
+        with self._lock:
+            self._results[job_id] = {"status": "pending", "scores": {}}
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._results[job_id]["status"] = "dropped"
+                self.dropped += 1
+            metrics.inc("evaluations_total", result="dropped")
+            logger.warning("Evaluation queue full, skipped run %s", run_id)
+        return job_id
+
+    def result(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            entry = self._results.get(job_id)
+            return None if entry is None else {"status": entry["status"], "scores": dict(entry["scores"])}
+
+    def join(self):
+        """
+        Blocks until every queued job has been evaluated.
+        """
+        self._queue.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+    # -------------------------------------
+    # Worker side
+    # -------------------------------------
+    def _work(self):
+        while True:
+            job_id, run_id, example, run = self._queue.get()
+            try:
+                self._evaluate(job_id, run_id, example, run)
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, job_id: int, run_id, example: ExampleWrapper, run: RunWrapper):
+        scores = {}
+        for evaluator in self.evaluators:
+            name = evaluator.__name__
+            try:
+                with timed("evaluation_seconds", evaluator=name):
+                    if evaluator in self.judge_evaluators:
+                        with self._judge_slots:
+                            score = evaluator(run, example)
+                    else:
+                        score = evaluator(run, example)
+                scores[name] = score
+                self._post_feedback(run_id, name, score)
+            except Exception as e:
+                scores[name] = f"Error: {e}"
+                with self._lock:
+                    self.errors += 1
+
+            # Scores fill in one by one as evaluators finish
+            with self._lock:
+                entry = self._results.get(job_id)
+                if entry is not None:
+                    entry["scores"][name] = scores[name]
+
+        with self._lock:
+            entry = self._results.get(job_id)
+            if entry is not None:
+                entry["status"] = "done"
+            self.completed += 1
+
+    def _post_feedback(self, run_id, key: str, score):
+        if self.feedback_client is None or run_id is None:
+            return
+        try:
+            self.feedback_client.create_feedback(run_id=run_id, key=key, score=1 if score else 0)
+        except Exception as e:
+            logger.warning("Failed to post feedback %s for run %s: %s", key, run_id, e)
+
+
+_eval_pool: Optional[EvalWorkerPool] = None
+_eval_pool_lock = threading.Lock()
+
+
+def get_eval_pool(feedback_client=None) -> EvalWorkerPool:
+    """
+    Shared pool running greeting, guardrail and correctness evaluators,
+    sized by EVAL_WORKERS / EVAL_JUDGE_CONCURRENCY / EVAL_QUEUE_SIZE.
+    """
+    global _eval_pool
+    with _eval_pool_lock:
+        if _eval_pool is None:
+            from evaluations import greeting_eval, guardrail_eval, correctness_eval
+
+            _eval_pool = EvalWorkerPool(
+                evaluators=[greeting_eval, guardrail_eval, correctness_eval],
+                judge_evaluators=[correctness_eval],
+                feedback_client=feedback_client,
+                workers=int(os.getenv("EVAL_WORKERS", "4")),
+                judge_concurrency=int(os.getenv("EVAL_JUDGE_CONCURRENCY", "2")),
+                queue_size=int(os.getenv("EVAL_QUEUE_SIZE", "256")),
+            )
+        elif feedback_client is not None and _eval_pool.feedback_client is None:
+            _eval_pool.feedback_client = feedback_client
+        return _eval_pool
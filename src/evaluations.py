@@ -14,6 +14,8 @@ Includes:
 - Correctness evaluator (LLM-as-Judge)
 """
 
+import os
+import threading
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
@@ -67,6 +69,25 @@ class CorrectnessScore(BaseModel):
     reasoning: str = Field(description="Short explanation")
 
 
+_judge = None
+_judge_lock = threading.Lock()
+
+
+def get_judge():
+    """
+    Shared structured-output judge (EVAL_JUDGE_MODEL, default gpt-4.1-mini),
+    built once and reused by every correctness evaluation.
+    """
+    global _judge
+    with _judge_lock:
+        if _judge is None:
+            _judge = ChatOpenAI(
+                model=os.getenv("EVAL_JUDGE_MODEL", "gpt-4.1-mini"),
+                temperature=0
+            ).with_structured_output(CorrectnessScore)
+        return _judge
+
+
 def correctness_eval(run, example) -> bool:
     """
     LLM-as-Judge correctness evaluator.
@@ -105,12 +126,7 @@ A response is INCORRECT if:
 Return score = 1 if correct, else 0.
 """
 
-    llm = ChatOpenAI(
-        model="gpt-4.1-mini",
-        temperature=0
-    ).with_structured_output(CorrectnessScore)
-
-    result = llm.invoke([HumanMessage(content=prompt)])
+    result = get_judge().invoke([HumanMessage(content=prompt)])
 
     return result.score == 1
 
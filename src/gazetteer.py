@@ -0,0 +1,173 @@
+# src/gazetteer.py
+"""
+In-memory city gazetteer for weather questions.
+
+City names and aliases from a local CSV (id, name, country, lat, lon,
+aliases separated by "|") are compiled into a token trie, so every city in a
+question, including multi-word ones like "New Delhi" or "San Francisco", is
+found in one pass over the words. Known cities resolve straight to an id and
+coordinates; names outside the file that the weather API has already
+answered (or rejected) are remembered in a TTL cache, so a bad guess costs
+at most one failed round trip.
+"""
+import os
+import re
+import csv
+import threading
+from typing import Dict, Iterable, List, Optional
+from cache_utils import TTLCache
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cities.csv")
+
+_END = ""  # trie key holding the place that ends at a node
+_MISSING = False  # learned-cache value for names the API does not know
+
+
+def words(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def load_places(path: str) -> List[Dict]:
+    """
+    Rows of the gazetteer CSV as place dicts: {"id", "name", "country", "lat", "lon", "aliases"}.
+    """
+    places = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            places.append({
+                "id": int(row["id"]),
+                "name": row["name"],
+                "country": row.get("country", ""),
+                "lat": float(row["lat"]),
+                "lon": float(row["lon"]),
+                "aliases": [a for a in (row.get("aliases") or "").split("|") if a],
+            })
+    return places
+
+
+def place_from_weather(weather_json: Dict) -> Optional[Dict]:
+    """
+    Place dict from an OpenWeatherMap response, or None without id/coordinates.
+    """
+    coord = weather_json.get("coord") or {}
+    if weather_json.get("id") is None or "lat" not in coord or "lon" not in coord:
+        return None
+    return {
+        "id": weather_json["id"],
+        "name": weather_json.get("name", ""),
+        "country": (weather_json.get("sys") or {}).get("country", ""),
+        "lat": coord["lat"],
+        "lon": coord["lon"],
+        "aliases": [],
+    }
+
+
+# -------------------------------------
+# Gazetteer
+# -------------------------------------
+class Gazetteer:
+    """
+    gaz = Gazetteer(load_places("data/cities.csv"))
+    gaz.find("weather in New Delhi and Pune")
+        → [{"text": "new delhi", "place": {...}}, {"text": "pune", "place": {...}}]
+    gaz.lookup("bombay")  → Mumbai's place dict
+    """
+
+    def __init__(self, places: Iterable[Dict], learned_ttl: float = 86400.0,
+                 learned_size: int = 1024):
+        self.places: List[Dict] = list(places)
+        self._trie: Dict = {}
+        self._max_len = 0
+        self._learned = TTLCache(maxsize=learned_size, ttl=learned_ttl)
+
+        for place in self.places:
+            for name in [place["name"], *place.get("aliases", [])]:
+                self._add(name, place)
+
+    def _add(self, name: str, place: Dict):
+        tokens = words(name)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = place
+        self._max_len = max(self._max_len, len(tokens))
+
+    def find(self, text: str) -> List[Dict]:
+        """
+        Cities mentioned in `text`, in order, each once: [{"text", "place"}].
+        The longest name wins at each position ("new delhi" over "delhi").
+        """
+        tokens = words(text)
+        found, seen = [], set()
+        i = 0
+        while i < len(tokens):
+            node, match, end = self._trie, None, i
+            for j in range(i, min(len(tokens), i + self._max_len)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match, end = node[_END], j + 1
+            if match is None:
+                i += 1
+                continue
+            if match["id"] not in seen:
+                seen.add(match["id"])
+                found.append({"text": " ".join(tokens[i:end]), "place": match})
+            i = end
+        return found
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """
+        Place for an exact city name or alias, then for names learned from the API.
+        """
+        tokens = words(name)
+        node = self._trie
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                break
+        else:
+            if tokens and _END in node:
+                return node[_END]
+        learned = self._learned.get(" ".join(tokens))
+        return learned or None
+
+    # -------------------------------------
+    # Learned names
+    # -------------------------------------
+    def learn(self, name: str, place: Dict):
+        self._learned.set(" ".join(words(name)), place)
+
+    def learn_missing(self, name: str):
+        self._learned.set(" ".join(words(name)), _MISSING)
+
+    def is_missing(self, name: str) -> bool:
+        return self._learned.get(" ".join(words(name))) is _MISSING
+
+    def clear_learned(self):
+        self._learned.clear()
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    Shared gazetteer loaded from GAZETTEER_PATH (default data/cities.csv);
+    learned API names expire after GEOCODE_CACHE_TTL seconds.
+    """
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer(
+                load_places(os.getenv("GAZETTEER_PATH", DEFAULT_PATH)),
+                learned_ttl=float(os.getenv("GEOCODE_CACHE_TTL", "86400")),
+                learned_size=int(os.getenv("GEOCODE_CACHE_SIZE", "1024")),
+            )
+        return _gazetteer
@@ -1,7 +1,9 @@
+import time
 from langgraph.graph import END, StateGraph
-from typing import TypedDict
+from typing import Dict, Iterator, TypedDict
 from langsmith import traceable
-from pipeline import decide_action, weather_node, rag_node
+from pipeline import decide_action, adecide_action, weather_node, rag_node, aweather_node, arag_node
+from metrics import metrics, timed
 
 # Correct State definition
 class PipelineState(TypedDict):
@@ -18,15 +20,48 @@ def greeting_node(state):
         "summary": "Hi! How may I assist you today?"
     }
 
+def _node(name: str, fn):
+    # Per-node latency histogram + error counter
+    return timed("pipeline_node_seconds", node=name)(fn)
+
+
 def build_pipeline_graph(openweather_key: str = None):
     graph = StateGraph(PipelineState)
 
     # Nodes
-    graph.add_node("decider", lambda s: {"action": decide_action(s["user_input"])})
-    graph.add_node("greeting",greeting_node)
-    graph.add_node("weather", lambda s: weather_node(s, openweather_key=openweather_key))
-    graph.add_node("pdf_rag", rag_node)
+    graph.add_node("decider", _node("decider", lambda s: {"action": decide_action(s["user_input"])}))
+    graph.add_node("greeting", _node("greeting", greeting_node))
+    graph.add_node("weather", _node("weather", lambda s: weather_node(s, openweather_key=openweather_key)))
+    graph.add_node("pdf_rag", _node("pdf_rag", rag_node))
+
+    return _wire(graph)
+
+
+def build_async_pipeline_graph(openweather_key: str = None):
+    """
+    Same graph with async weather/RAG nodes; use `await graph.ainvoke(...)`.
+    Many questions can then share one event loop.
+    """
+    graph = StateGraph(PipelineState)
+
+    async def decider(s):
+        return {"action": await adecide_action(s["user_input"])}
+
+    async def greeting(s):
+        return greeting_node(s)
+
+    async def weather(s):
+        return await aweather_node(s, openweather_key=openweather_key)
 
+    graph.add_node("decider", _node("decider", decider))
+    graph.add_node("greeting", _node("greeting", greeting))
+    graph.add_node("weather", _node("weather", weather))
+    graph.add_node("pdf_rag", _node("pdf_rag", arag_node))
+
+    return _wire(graph)
+
+
+def _wire(graph: StateGraph):
     # Wiring
     graph.set_entry_point("decider")
 
@@ -44,4 +79,44 @@ def build_pipeline_graph(openweather_key: str = None):
     graph.add_edge("weather", END)
     graph.add_edge("pdf_rag", END)
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
+
+
+def stream_pipeline(graph, inputs: Dict) -> Iterator[Dict]:
+    """
+    Runs the compiled graph in streaming mode.
+
+    Yields {"type": "token", "text": ...} for each LLM token produced inside
+    a node, then one {"type": "final", "state": ..., "metrics": ...} with
+    time-to-first-token and total latency in seconds. Branches without an
+    LLM (greeting, weather, cached answers) count their first output as TTFT.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    state = dict(inputs)
+
+    for mode, chunk in graph.stream(inputs, stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            message, _meta = chunk
+            text = message.content if isinstance(message.content, str) else ""
+            if text:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                yield {"type": "token", "text": text}
+        elif mode == "updates":
+            for update in chunk.values():
+                if update:
+                    state.update(update)
+
+    finished = time.perf_counter()
+    metrics.observe("pipeline_ttft_seconds", (first_token_at or finished) - started)
+    metrics.observe("pipeline_request_seconds", finished - started, action=state.get("action"))
+    yield {
+        "type": "final",
+        "state": state,
+        "metrics": {
+            "ttft_s": (first_token_at or finished) - started,
+            "total_s": finished - started,
+            "streamed": first_token_at is not None,
+        },
+    }
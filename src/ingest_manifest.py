@@ -0,0 +1,156 @@
+# src/ingest_manifest.py
+import os
+import uuid
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+# Fixed namespace so the same (source, chunk) maps to the same point id everywhere
+CHUNK_NAMESPACE = uuid.UUID("6f1c2b4e-2f0a-5a7e-9a51-3c9d7e0b8d21")
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_point_id(source_name: str, text: str) -> str:
+    """
+    Deterministic point id: uuid5 of source name + chunk hash.
+    Re-ingesting the same chunk of the same document overwrites it in place.
+    """
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{source_name}:{chunk_hash(text)}"))
+
+
+# -------------------------------------
+# Per-source Manifest
+# -------------------------------------
+class IngestManifest:
+    """
+    Records which point ids each source currently has in a collection, and
+    each chunk's position in the source, so re-ingestion can embed only new
+    chunks, delete vanished ones and re-number the ones that moved.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " collection TEXT NOT NULL, source TEXT NOT NULL, point_id TEXT NOT NULL,"
+            " chunk_index INTEGER, PRIMARY KEY (collection, source, point_id))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        if "chunk_index" not in columns:
+            # Manifests written before positions were tracked
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN chunk_index INTEGER")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def point_ids(self, collection: str, source: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id FROM chunks WHERE collection = ? AND source = ?",
+                (collection, source)
+            )
+            return {r[0] for r in rows}
+
+    def positions(self, collection: str, source: str) -> Dict[str, Optional[int]]:
+        """
+        point id → chunk_index recorded by the last `replace` (None if unknown).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id, chunk_index FROM chunks WHERE collection = ? AND source = ?",
+                (collection, source)
+            )
+            return dict(rows)
+
+    def add(self, collection: str, source: str, ids: Iterable[str]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (collection, source, point_id) VALUES (?, ?, ?)",
+                [(collection, source, i) for i in ids]
+            )
+            self._conn.commit()
+
+    def replace(self, collection: str, source: str, ids: Iterable[str]):
+        """
+        Makes `ids` (in chunk order) the complete chunk set of `source`; a
+        repeated chunk keeps the position of its first occurrence.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND source = ?", (collection, source)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (collection, source, point_id, chunk_index)"
+                " VALUES (?, ?, ?, ?)",
+                [(collection, source, point_id, i) for i, point_id in enumerate(ids)]
+            )
+            self._conn.commit()
+
+    def forget_collection(self, collection: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE collection = ?", (collection,))
+            self._conn.commit()
+
+    def sources(self, collection: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, COUNT(*) FROM chunks WHERE collection = ? GROUP BY source",
+                (collection,)
+            )
+            return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def diff_source(known_ids: Set[str], ids: List[str]):
+    """
+    Returns (indexes of chunks that need embedding, ids that disappeared).
+    Duplicate chunks inside one document collapse onto their first occurrence.
+    """
+    seen = set()
+    new_indexes = []
+    for i, point_id in enumerate(ids):
+        if point_id in seen:
+            continue
+        seen.add(point_id)
+        if point_id not in known_ids:
+            new_indexes.append(i)
+    removed = sorted(set(known_ids) - seen)
+    return new_indexes, removed
+
+
+def moved_chunks(known_positions: Dict[str, Optional[int]], ids: List[str]) -> Dict[str, int]:
+    """
+    Already-known chunks whose position differs from the recorded one:
+    point id → new chunk_index.
+    """
+    first: Dict[str, int] = {}
+    for i, point_id in enumerate(ids):
+        first.setdefault(point_id, i)
+    return {
+        point_id: i for point_id, i in first.items()
+        if point_id in known_positions and known_positions[point_id] != i
+    }
+
+
+_manifest: Optional[IngestManifest] = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest() -> IngestManifest:
+    """
+    Shared manifest stored at INGEST_MANIFEST_PATH (default .cache/manifest.sqlite).
+    """
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = IngestManifest(os.getenv("INGEST_MANIFEST_PATH", ".cache/manifest.sqlite"))
+        return _manifest
@@ -0,0 +1,189 @@
+# src/ingest_stream.py
+"""
+Streaming, constant-memory PDF ingestion.
+
+Pages flow through generator stages connected by bounded queues:
+
+    page extraction → chunking → embedding → upsert
+
+Each stage runs on its own thread, so early chunks are searchable while
+later pages are still being extracted, and at most `queue_size` items are
+buffered between any two stages.
+"""
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class _Stopped(Exception):
+    """
+    Raised inside a stage whose pipeline was stopped, so its thread unwinds.
+    """
+
+
+# -------------------------------------
+# Stages
+# -------------------------------------
+def iter_pdf_pages(stream) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (page_number, text) one page at a time from a binary file object.
+    """
+    reader = PdfReader(stream)
+    for i, page in enumerate(reader.pages):
+        yield i, page.extract_text() or ""
+
+
+def iter_chunks(pages: Iterable[Tuple[int, str]], chunk_size: int = 1000,
+                chunk_overlap: int = 200) -> Iterator[Tuple[int, str]]:
+    """
+    Incremental version of `chunk_text`: keeps only a small tail buffer and
+    yields (chunk_index, text) as soon as a chunk can no longer change.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    buffer = ""
+    index = 0
+
+    for _, text in pages:
+        buffer = f"{buffer}\n{text}" if buffer else text
+        if len(buffer) < 2 * chunk_size:
+            continue
+
+        pieces = splitter.split_text(buffer)
+        # The last piece may still grow with the next page: carry it over
+        for piece in pieces[:-1]:
+            yield index, piece
+            index += 1
+        buffer = pieces[-1] if pieces else ""
+
+    if buffer.strip():
+        for piece in splitter.split_text(buffer):
+            yield index, piece
+            index += 1
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -------------------------------------
+# Bounded-queue plumbing
+# -------------------------------------
+def _put(q: "queue.Queue", item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump(source: Iterable, out_q: "queue.Queue", stop: threading.Event):
+    try:
+        for item in source:
+            if not _put(out_q, item, stop):
+                return
+        _put(out_q, _DONE, stop)
+    except BaseException as e:
+        _put(out_q, _StageError(e), stop)
+
+
+def _drain(in_q: "queue.Queue", stop: threading.Event) -> Iterator:
+    # Polls so a stage waiting on an upstream that gave up (stop set, no
+    # _DONE coming) still exits instead of blocking forever
+    while True:
+        try:
+            item = in_q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.exc
+        yield item
+
+
+def threaded(source: Iterable, queue_size: int, stop: threading.Event,
+             name: str) -> Iterator:
+    """
+    Runs `source` on a background thread and yields its items through a
+    queue holding at most `queue_size` items (backpressure).
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    threading.Thread(target=_pump, args=(source, q, stop), name=name, daemon=True).start()
+    return _drain(q, stop)
+
+
+# -------------------------------------
+# Driver
+# -------------------------------------
+def stream_ingest(
+    stream,
+    embed_fn: Callable[[List[str]], List[List[float]]],
+    upsert_fn: Callable[[List[Tuple[int, str]], List[List[float]]], None],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    batch_size: int = 64,
+    queue_size: int = 4,
+    on_progress: Callable[[str, Dict[str, int]], None] = None,
+) -> Dict[str, int]:
+    """
+    Ingests a PDF stream stage by stage and returns the final counters
+    ({"pages", "chunks", "embedded", "upserted"}). `upsert_fn` receives each
+    batch of (chunk_index, text) pairs with its vectors.
+    """
+    progress = {"pages": 0, "chunks": 0, "embedded": 0, "upserted": 0}
+    stop = threading.Event()
+
+    def report(stage: str, n: int):
+        progress[stage] += n
+        if on_progress:
+            on_progress(stage, dict(progress))
+
+    def pages():
+        for page in iter_pdf_pages(stream):
+            report("pages", 1)
+            yield page
+
+    def chunks():
+        for chunk in iter_chunks(threaded(pages(), queue_size, stop, "ingest-pages"),
+                                 chunk_size, chunk_overlap):
+            report("chunks", 1)
+            yield chunk
+
+    def embedded():
+        for batch in iter_batches(threaded(chunks(), queue_size * batch_size, stop,
+                                           "ingest-chunks"), batch_size):
+            vectors = embed_fn([text for _, text in batch])
+            report("embedded", len(batch))
+            yield batch, vectors
+
+    try:
+        for batch, vectors in threaded(embedded(), queue_size, stop, "ingest-embed"):
+            upsert_fn(batch, vectors)
+            report("upserted", len(batch))
+    finally:
+        stop.set()
+
+    return progress
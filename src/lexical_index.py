@@ -0,0 +1,217 @@
+# src/lexical_index.py
+import os
+import re
+import gzip
+import json
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what",
+    "when", "where", "which", "who", "why", "with", "about", "tell", "me",
+    "explain", "describe", "does", "do", "can", "give",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+# -------------------------------------
+# BM25 Inverted Index
+# -------------------------------------
+class BM25Index:
+    """
+    Incremental BM25 index: term → {doc_id: term frequency}.
+
+    Documents are keyed by the same point ids used in the vector store, so
+    lexical and dense hits can be fused by id. Only postings, lengths and
+    payload metadata are kept; chunk texts live in the docstore and hits
+    are resolved like dense ones (pdf_rag.hit_texts).
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75,
+                 collection: str = None):
+        self.path = path
+        self.collection = collection
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        # doc → its distinct terms, so removal touches only those postings
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.payloads: Dict[str, Dict] = {}
+        self.total_len = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, doc_id, text: str, payload: Dict = None):
+        key = str(doc_id)
+        tokens = tokenize(text)
+        with self._lock:
+            if key in self.doc_len:
+                self._remove_locked({key})
+            counts = Counter(tokens)
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[key] = tf
+            self.doc_terms[key] = list(counts)
+            self.doc_len[key] = len(tokens)
+            self.total_len += len(tokens)
+            self.payloads[key] = {k: v for k, v in (payload or {}).items() if k != "text"}
+            self.dirty = True
+
+    def add_many(self, ids: Sequence, texts: Sequence[str], payloads: Sequence[Dict] = None):
+        payloads = payloads or [None] * len(ids)
+        for doc_id, text, payload in zip(ids, texts, payloads):
+            self.add(doc_id, text, payload)
+
+    def remove(self, doc_ids: Iterable):
+        with self._lock:
+            keys = {str(d) for d in doc_ids if str(d) in self.doc_len}
+            if keys:
+                self._remove_locked(keys)
+                self.dirty = True
+
+    def update_payloads(self, payloads: Dict):
+        """
+        Merges payloads[doc_id] into the metadata of indexed documents.
+        """
+        with self._lock:
+            for doc_id, payload in payloads.items():
+                key = str(doc_id)
+                if key in self.payloads:
+                    self.payloads[key] = {**self.payloads[key], **payload}
+                    self.dirty = True
+
+    def _remove_locked(self, keys: Set[str]):
+        for key in keys:
+            for term in self.doc_terms.pop(key):
+                docs = self.postings[term]
+                del docs[key]
+                if not docs:
+                    del self.postings[term]
+        for key in keys:
+            self.total_len -= self.doc_len.pop(key)
+            del self.payloads[key]
+
+    def covers(self, query: str) -> bool:
+        """
+        True when every query term appears in the index.
+        """
+        terms = tokenize(query)
+        return bool(terms) and all(t in self.postings for t in terms)
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """
+        Returns hits shaped like qdrant_utils.query_similar: {"id", "score", "payload"}.
+        """
+        terms = tokenize(query)
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if not n_docs or not terms:
+                return []
+            avg_len = self.total_len / n_docs
+            scores: Dict[str, float] = {}
+
+            for term in set(terms):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for key, tf in docs.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[key] / avg_len)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+            top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+            return [{"id": key, "score": score, "payload": self.payloads[key]} for key, score in top]
+
+    # -------------------------------------
+    # Persistence
+    # -------------------------------------
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"postings": self.postings, "doc_len": self.doc_len, "doc_terms": self.doc_terms,
+                    "payloads": self.payloads}
+            tmp = self.path + ".tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.postings = data["postings"]
+        self.doc_len = data["doc_len"]
+        self.payloads = data["payloads"]
+        self.total_len = sum(self.doc_len.values())
+
+        self.doc_terms = data.get("doc_terms")
+        if self.doc_terms is None:
+            # Indexes saved without per-doc terms: invert the postings once
+            self.doc_terms = {key: [] for key in self.doc_len}
+            for term, docs in self.postings.items():
+                for key in docs:
+                    self.doc_terms[key].append(term)
+            self.dirty = True
+
+        # Indexes saved before texts moved to the docstore: hand them over once
+        legacy = {k: p.pop("text") for k, p in self.payloads.items() if "text" in p}
+        if legacy:
+            if self.collection:
+                from docstore import get_docstore
+                get_docstore().put_many(self.collection, list(legacy), list(legacy.values()))
+            self.dirty = True
+
+
+def is_keyword_query(query: str, index: BM25Index, max_terms: int = 3) -> bool:
+    """
+    Short queries whose terms are all indexed (e.g. "Rajasthan rainfall")
+    are answered lexically without calling the embedding API.
+    """
+    return len(tokenize(query)) <= max_terms and "?" not in query and index.covers(query)
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Dict]], top_k: int = 5, k: int = 60) -> List[Dict]:
+    """
+    Merges ranked hit lists by id: score = Σ 1 / (k + rank).
+    The first payload seen for an id is kept.
+    """
+    fused: Dict[str, Dict] = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results, 1):
+            key = str(hit["id"])
+            entry = fused.setdefault(key, {"id": hit["id"], "score": 0.0, "payload": hit["payload"]})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda h: h["score"], reverse=True)[:top_k]
+
+
+_indexes: Dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(collection_name: str) -> BM25Index:
+    """
+    Shared per-collection index persisted under LEXICAL_INDEX_DIR (default .cache/lexical).
+    """
+    path = os.path.join(os.getenv("LEXICAL_INDEX_DIR", ".cache/lexical"), f"{collection_name}.json.gz")
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = BM25Index(path, collection=collection_name)
+            _indexes[path] = index
+        return index
@@ -1,45 +1,131 @@
+
 import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import httpx
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from metrics import metrics, timed
+
+DEFAULT_API_VERSION = "2024-02-01"
+
+# (deployment, temperature) → client / compiled chain, built once per process.
+# An httpx.AsyncClient pool is bound to the event loop it first ran on, so
+# code running inside a loop gets its own registry per loop.
+_llms: Dict[Tuple[Optional[str], float], AzureChatOpenAI] = {}
+_chains: Dict[Tuple[Optional[str], float], object] = {}
+_loop_llms: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+_loop_chains: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def _registry(process_wide: Dict, per_loop: weakref.WeakKeyDictionary) -> Dict:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return process_wide
+    return per_loop.setdefault(loop, {})
+
+
+def _http_limits() -> httpx.Limits:
+    max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    return httpx.Limits(max_connections=max_connections,
+                        max_keepalive_connections=max_connections)
+
 
-def get_llm(temperature: float = 0.2):
+def get_llm(temperature: float = 0.2, deployment_name: str = None) -> AzureChatOpenAI:
     """
-    Returns an Azure OpenAI-compatible Chat LLM.
+    Returns the shared Azure OpenAI Chat LLM for (deployment, temperature).
+
+    The client and its pooled sync/async HTTP connections are created on
+    first use and reused afterwards (per event loop when called from async
+    code). Credentials are read from the environment and never logged.
     """
-    # model_name = model_name or os.getenv("LLM_MODEL", "gpt")
-    api_key = os.getenv("AZURE_OPENAI_KEY")
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-    deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT")  # required for AzureChatOpenAI
+    deployment_name = deployment_name or os.getenv("AZURE_OPENAI_DEPLOYMENT")  # required for AzureChatOpenAI
+    key = (deployment_name, float(temperature))
+
+    with _registry_lock:
+        llms = _registry(_llms, _loop_llms)
+        llm = llms.get(key)
+        if llm is None:
+            limits = _http_limits()
+            llm = AzureChatOpenAI(
+                deployment_name=deployment_name,
+                temperature=temperature,
+                openai_api_key=os.getenv("AZURE_OPENAI_KEY"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION", DEFAULT_API_VERSION),
+                http_client=httpx.Client(limits=limits),
+                http_async_client=httpx.AsyncClient(limits=limits),
+            )
+            llms[key] = llm
+        return llm
 
-    print(api_key)
-    print(endpoint)
-    print(deployment_name)
-    return AzureChatOpenAI(
-        deployment_name=deployment_name,
-        temperature=temperature,
-        openai_api_key=api_key,
-        azure_endpoint=endpoint,
-        api_version='2024-02-01'
+
+SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["article"],
+    template=(
+        "You are a helpful summarizer. Read the content carefully and "
+        "provide a concise summary (3-5 sentences):\n\n{article}"
     )
+)
+
+
+def build_summary_chain(llm):
+    # LCEL chain: prompt → model → output parser
+    return SUMMARY_PROMPT | llm | StrOutputParser()
+
+
+def get_summary_chain(temperature: float = 0.2, deployment_name: str = None):
+    """
+    Compiled summary chain on top of the shared `get_llm` client.
+    The same chain serves invoke / ainvoke / stream.
+    """
+    deployment_name = deployment_name or os.getenv("AZURE_OPENAI_DEPLOYMENT")
+    key = (deployment_name, float(temperature))
+
+    with _registry_lock:
+        chain = _registry(_chains, _loop_chains).get(key)
+    if chain is None:
+        llm = get_llm(temperature, deployment_name)
+        with _registry_lock:
+            chain = _registry(_chains, _loop_chains).setdefault(key, build_summary_chain(llm))
+    return chain
+
+
+def clear_llm_registry():
+    """
+    Drops cached clients and chains, e.g. after rotating credentials.
+    """
+    with _registry_lock:
+        _llms.clear()
+        _chains.clear()
+        _loop_llms.clear()
+        _loop_chains.clear()
+
+
+def _summary_chain_for(llm=None):
+    return get_summary_chain() if llm is None else build_summary_chain(llm)
 
 
 def summarize_with_llm(text: str, llm=None) -> str:
     """
     Summarizes text using LCEL (LangChain Expression Language) instead of deprecated LLMChain.
     """
-    if llm is None:
-        llm = get_llm()
+    chain = _summary_chain_for(llm)
+    metrics.set_gauge("payload_chars", len(text), kind="llm_prompt")
+    with timed("external_call_seconds", service="azure_openai", op="chat"):
+        return chain.invoke({"article": text})
 
-    prompt = PromptTemplate(
-        input_variables=["article"],
-        template=(
-            "You are a helpful summarizer. Read the content carefully and "
-            "provide a concise summary (3-5 sentences):\n\n{article}"
-        )
-    )
 
-    # LCEL chain: prompt → model → output parser
-    chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"article": text})
-    return response
+async def asummarize_with_llm(text: str, llm=None) -> str:
+    """
+    Async `summarize_with_llm` (chain.ainvoke), for the async graph and server.
+    """
+    chain = _summary_chain_for(llm)
+    metrics.set_gauge("payload_chars", len(text), kind="llm_prompt")
+    with timed("external_call_seconds", service="azure_openai", op="chat"):
+        return await chain.ainvoke({"article": text})
@@ -0,0 +1,231 @@
+# src/local_index.py
+import os
+import json
+import shutil
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+
+class _Collection:
+    """
+    One collection on disk:
+    - vectors.f32      unit-normalized float32 rows, append-only, memory-mapped
+    - payloads.sqlite  id → (row, payload); rows not referenced here are dead
+    """
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        self.vector_path = os.path.join(path, "vectors.f32")
+        self.conn = sqlite3.connect(os.path.join(path, "payloads.sqlite"), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS points (id TEXT PRIMARY KEY, row INTEGER NOT NULL, payload TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS points_row ON points (row)")
+        self.conn.commit()
+
+        rows = self._rows_on_disk()
+        self.alive = np.zeros(rows, dtype=bool)
+        for (row,) in self.conn.execute("SELECT row FROM points"):
+            self.alive[row] = True
+        self._matrix: Optional[np.memmap] = None
+
+    def _rows_on_disk(self) -> int:
+        if not os.path.exists(self.vector_path):
+            return 0
+        return os.path.getsize(self.vector_path) // (4 * self.dim)
+
+    def matrix(self) -> np.ndarray:
+        rows = len(self.alive)
+        if rows == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(self.vector_path, dtype=np.float32, mode="r",
+                                     shape=(rows, self.dim))
+        return self._matrix
+
+
+# -------------------------------------
+# Local Vector Index
+# -------------------------------------
+class LocalVectorIndex:
+    """
+    In-process vector store for small corpora and offline tests.
+
+    Cosine search is a single matrix-vector product over the memory-mapped
+    matrix followed by np.argpartition, so no service is needed.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.root_dir, name)
+
+    def _get(self, name: str) -> _Collection:
+        with self._lock:
+            coll = self._collections.get(name)
+            if coll is None:
+                meta_path = os.path.join(self._dir(name), "meta.json")
+                if not os.path.exists(meta_path):
+                    raise KeyError(f"Collection '{name}' does not exist")
+                with open(meta_path) as f:
+                    coll = _Collection(self._dir(name), json.load(f)["dim"])
+                self._collections[name] = coll
+            return coll
+
+    def collection_exists(self, name: str) -> bool:
+        return name in self._collections or os.path.exists(os.path.join(self._dir(name), "meta.json"))
+
+    def ensure_collection(self, name: str, vector_size: int):
+        with self._lock:
+            if self.collection_exists(name):
+                dim = self._get(name).dim
+                if dim != vector_size:
+                    raise ValueError(f"Collection '{name}' has vector size {dim}, got {vector_size}")
+                return
+            os.makedirs(self._dir(name), exist_ok=True)
+            with open(os.path.join(self._dir(name), "meta.json"), "w") as f:
+                json.dump({"dim": vector_size, "distance": "cosine"}, f)
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            coll = self._collections.pop(name, None)
+            if coll is not None:
+                coll.conn.close()
+            shutil.rmtree(self._dir(name), ignore_errors=True)
+
+    def upsert(self, name: str, ids: Sequence, vectors, payloads: Sequence[Dict]):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            coll = self._get(name)
+            if matrix.shape[1] != coll.dim:
+                raise ValueError(f"Collection '{name}' has vector size {coll.dim}, got {matrix.shape[1]}")
+            start = len(coll.alive)
+            keys = [json.dumps(i) for i in ids]
+
+            # Overwritten ids leave a dead row behind
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                for (row,) in coll.conn.execute(f"SELECT row FROM points WHERE id IN ({marks})", batch):
+                    coll.alive[row] = False
+
+            with open(coll.vector_path, "ab") as f:
+                f.write(np.ascontiguousarray(matrix).tobytes())
+            coll.alive = np.concatenate([coll.alive, np.ones(len(keys), dtype=bool)])
+            # A repeated id inside one batch keeps its last row
+            last_row = {k: start + i for i, k in enumerate(keys)}
+            for i, k in enumerate(keys):
+                if last_row[k] != start + i:
+                    coll.alive[start + i] = False
+
+            coll.conn.executemany(
+                "INSERT OR REPLACE INTO points (id, row, payload) VALUES (?, ?, ?)",
+                [(k, start + i, json.dumps(p)) for i, (k, p) in enumerate(zip(keys, payloads))]
+            )
+            coll.conn.commit()
+
+    def delete(self, name: str, ids: Sequence):
+        with self._lock:
+            coll = self._get(name)
+            keys = [json.dumps(i) for i in ids]
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                for (row,) in coll.conn.execute(f"SELECT row FROM points WHERE id IN ({marks})", batch):
+                    coll.alive[row] = False
+                coll.conn.execute(f"DELETE FROM points WHERE id IN ({marks})", batch)
+            coll.conn.commit()
+
+    def set_payloads(self, name: str, payloads: Dict):
+        """
+        Merges payloads[id] into the stored payload of each existing point.
+        """
+        with self._lock:
+            coll = self._get(name)
+            updates = []
+            for point_id, payload in payloads.items():
+                key = json.dumps(point_id)
+                row = coll.conn.execute("SELECT payload FROM points WHERE id = ?", (key,)).fetchone()
+                if row is not None:
+                    updates.append((json.dumps({**(json.loads(row[0]) or {}), **payload}), key))
+            coll.conn.executemany("UPDATE points SET payload = ? WHERE id = ?", updates)
+            coll.conn.commit()
+
+    def count(self, name: str) -> int:
+        return int(self._get(name).alive.sum())
+
+    def search(self, name: str, query, top_k: int = 5, with_vectors: bool = False) -> List[Dict]:
+        coll = self._get(name)
+        with self._lock:
+            matrix = coll.matrix()
+            alive = coll.alive
+
+        if matrix.shape[0] == 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+
+        scores = matrix @ q
+        scores = np.where(alive, scores, -np.inf)
+        k = min(top_k, int(alive.sum()))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return self._hits(coll, top, scores, matrix if with_vectors else None)
+
+    def _hits(self, coll: _Collection, rows, scores, matrix: np.ndarray = None) -> List[Dict]:
+        rows = [int(r) for r in rows]
+        marks = ",".join("?" * len(rows))
+        with self._lock:
+            found = {
+                row: (key, payload)
+                for key, row, payload in coll.conn.execute(
+                    f"SELECT id, row, payload FROM points WHERE row IN ({marks})", rows
+                )
+            }
+        hits = [
+            {"id": json.loads(found[r][0]), "score": float(scores[r]), "payload": json.loads(found[r][1])}
+            for r in rows if r in found
+        ]
+        if matrix is not None:
+            for hit, r in zip(hits, (r for r in rows if r in found)):
+                hit["vector"] = np.array(matrix[r])
+        return hits
+
+    def close(self):
+        with self._lock:
+            for coll in self._collections.values():
+                coll.conn.close()
+            self._collections.clear()
+
+
+_local_indexes: Dict[str, LocalVectorIndex] = {}
+_local_lock = threading.Lock()
+
+
+def get_local_index(root_dir: str = None) -> LocalVectorIndex:
+    """
+    Shared index rooted at LOCAL_VECTOR_DIR (default .cache/vectors).
+    """
+    root_dir = root_dir or os.getenv("LOCAL_VECTOR_DIR", ".cache/vectors")
+    with _local_lock:
+        index = _local_indexes.get(root_dir)
+        if index is None:
+            index = LocalVectorIndex(root_dir)
+            _local_indexes[root_dir] = index
+        return index
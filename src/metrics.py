@@ -0,0 +1,218 @@
+# src/metrics.py
+"""
+In-process metrics: histograms, counters and gauges keyed by name + labels.
+
+    from metrics import metrics, timed
+
+    @timed("pipeline_node_seconds", node="pdf_rag")
+    def rag_node(state): ...
+
+    with timed("external_call_seconds", service="qdrant", op="query"):
+        ...
+
+    metrics.inc("cache_requests_total", cache="weather", result="hit")
+    metrics.set_gauge("rag_prompt_chars", len(prompt))
+
+`metrics.render_prometheus()` returns the Prometheus text format and
+`metrics.snapshot()` a JSON-serializable dict; neither needs LangSmith.
+"""
+import os
+import time
+import bisect
+import logging
+import asyncio
+import functools
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Seconds; covers cache hits (sub-ms) up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile (Prometheus-style estimate).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+# -------------------------------------
+# Registry
+# -------------------------------------
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets)
+            hist.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    # -------------------------------------
+    # Export
+    # -------------------------------------
+    def snapshot(self) -> Dict:
+        with self._lock:
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else None,
+                        "p50": h.quantile(0.5),
+                        "p90": h.quantile(0.9),
+                        "p99": h.quantile(0.99),
+                    }
+                    for key, h in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+            counters = {
+                name: [{"labels": dict(key), "value": v} for key, v in series.items()]
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: [{"labels": dict(key), "value": v} for key, v in series.items()]
+                for name, series in self._gauges.items()
+            }
+        return {"histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip(self.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', repr(bound))])} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+            for kind, table in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(table.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class timed:
+    """
+    Records elapsed seconds into histogram `name` with `labels`; errors
+    also increment `errors_total` with the same labels plus the exception type.
+    Works as a context manager and as a decorator for sync and async functions.
+    """
+
+    def __init__(self, name: str, registry: MetricsRegistry = None, **labels):
+        self.name = name
+        self.registry = registry or metrics
+        self.labels = labels
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self._started, **self.labels)
+        if exc_type is not None:
+            self.registry.inc("errors_total", metric=self.name, error=exc_type.__name__, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        name, registry, labels = self.name, self.registry, self.labels
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(name, registry, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(name, registry, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def configure_logging(level: str = None):
+    """
+    Root logging for entry points (server, Streamlit, CLIs), from LOG_LEVEL (default INFO).
+    Debug output such as retrieved payloads is only formatted at DEBUG.
+    """
+    logging.basicConfig(
+        level=(level or os.getenv("LOG_LEVEL", "INFO")).upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
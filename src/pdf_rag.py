@@ -1,18 +1,35 @@
 import os
-from typing import List, Tuple
+import asyncio
+import logging
+import weakref
+from typing import List, Optional, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pypdf import PdfReader
 import openai
 from io import BytesIO
 from pypdf import PdfReader
-from openai import AzureOpenAI
-from uuid import uuid4
-from qdrant_utils import get_qdrant_client, create_collection_if_not_exists, upsert_documents, query_similar
+from openai import AsyncAzureOpenAI, AzureOpenAI
+from qdrant_utils import get_vector_client, create_collection_if_not_exists, upsert_documents, query_similar
+from qdrant_utils import collection_exists, delete_points, update_payloads
+from qdrant_utils import get_async_vector_client, aquery_similar, aquery_batch_similar
+from embedding_cache import EmbeddingCache, get_embedding_cache
+from embedding_scheduler import get_embedding_scheduler
+from ingest_stream import iter_chunks, stream_ingest
+from lexical_index import get_lexical_index, is_keyword_query, reciprocal_rank_fusion
+from answer_cache import get_answer_cache
+from ingest_manifest import chunk_point_id, diff_source, get_manifest, moved_chunks
+from docstore import get_docstore
+from rerank import mmr_rerank, mmr_settings
+from metrics import metrics, timed
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 COLLECTION_NAME = os.getenv("QDRANT_COLLECTION", "pdf_docs")
+# Azure OpenAI accepts at most 2048 inputs per embeddings request
+MAX_EMBED_INPUTS = 2048
 azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
 api_key=os.getenv("AZURE_OPENAI_KEY")
 qdrant_api_key=os.getenv("QDRANT_API_KEY")
@@ -21,41 +38,130 @@ model_name=os.getenv("EMBEDDING_MODEL_NAME")
 
 
 class AzureEmbeddingWrapper:
-    def __init__(self, azure_endpoint, api_key, api_version, model_name):
+    def __init__(self, azure_endpoint, api_key, api_version, model_name,
+                 cache: EmbeddingCache = None):
         self.client = AzureOpenAI(
             azure_endpoint=azure_endpoint,
             api_key=api_key,
             api_version=api_version
         )
+        self._client_options = {"azure_endpoint": azure_endpoint, "api_key": api_key,
+                                "api_version": api_version}
+        # Async clients hold loop-bound connection pools: one per event loop
+        self._aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAzureOpenAI]" = \
+            weakref.WeakKeyDictionary()
         self.model_name = model_name
+        self.cache = cache
+
+    @property
+    def aclient(self) -> AsyncAzureOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            client = AsyncAzureOpenAI(**self._client_options)
+            self._aclients[loop] = client
+        return client
+
+    def _create(self, inputs: list[str]):
+        metrics.set_gauge("payload_items", len(inputs), kind="embedding_batch")
+        with timed("external_call_seconds", service="azure_openai", op="embeddings"):
+            response = self.client.embeddings.create(
+                model=self.model_name,
+                input=inputs
+            )
+        return [item.embedding for item in response.data]
+
+    def _embed_cached(self, texts: list[str]):
+        # Only cache misses go to the API, each distinct text once
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+
+        fresh = {}
+        if missing:
+            vectors = self._create(missing)
+            self.cache.put_many(self.model_name, missing, vectors)
+            fresh = dict(zip(missing, vectors))
+
+        return [
+            v.tolist() if v is not None else list(fresh[t])
+            for t, v in zip(texts, cached)
+        ]
+
+    async def _acreate(self, inputs: list[str]):
+        metrics.set_gauge("payload_items", len(inputs), kind="embedding_batch")
+        with timed("external_call_seconds", service="azure_openai", op="embeddings"):
+            response = await self.aclient.embeddings.create(
+                model=self.model_name,
+                input=inputs
+            )
+        return [item.embedding for item in response.data]
+
+    async def _aembed_cached(self, texts: list[str]):
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+
+        fresh = {}
+        if missing:
+            vectors = await self._acreate(missing)
+            self.cache.put_many(self.model_name, missing, vectors)
+            fresh = dict(zip(missing, vectors))
+
+        return [
+            v.tolist() if v is not None else list(fresh[t])
+            for t, v in zip(texts, cached)
+        ]
+
+    async def aembed_query(self, query: str):
+        if self.cache is not None:
+            return (await self._aembed_cached([query]))[0]
+        return (await self._acreate([query]))[0]
+
+    async def aembed_documents(self, docs: list[str]):
+        if self.cache is not None:
+            return await self._aembed_cached(docs)
+        return await self._acreate(docs)
 
     # For queries (RAG)
     def embed_query(self, query: str):
-        response = self.client.embeddings.create(
-            model=self.model_name,
-            input=query
-        )
-        return response.data[0].embedding
+        if self.cache is not None:
+            return self._embed_cached([query])[0]
+        return self._create([query])[0]
 
     # For documents (RAG ingestion)
     def embed_documents(self, docs: list[str]):
-        response = self.client.embeddings.create(
-            model=self.model_name,
-            input=docs
+        if self.cache is not None:
+            return self._embed_cached(docs)
+        return self._create(docs)
+
+
+_embeddings = None
+
+
+def get_embeddings() -> AzureEmbeddingWrapper:
+    """
+    Returns the shared embedding wrapper (one client, one cache).
+    """
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = AzureEmbeddingWrapper(
+            azure_endpoint=azure_endpoint,
+            api_key=api_key,
+            api_version="2024-02-01",
+            model_name=model_name,
+            cache=get_embedding_cache()
         )
-        return [item.embedding for item in response.data]
+    return _embeddings
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    """Extract text from a PDF using PyPDF with a BytesIO buffer."""
-    pdf_stream = BytesIO(pdf_bytes)
-    reader = PdfReader(pdf_stream)
+def extract_pages_from_pdf(pdf_bytes: bytes) -> List[Tuple[int, str]]:
+    """(page_number, text) for every page, using PyPDF with a BytesIO buffer."""
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return [(i, page.extract_text() or "") for i, page in enumerate(reader.pages)]
 
-    text_chunks = []
-    for page in reader.pages:
-        text_chunks.append(page.extract_text() or "")
 
-    return "\n".join(text_chunks)
+def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    """Extract text from a PDF using PyPDF with a BytesIO buffer."""
+    return "\n".join(text for _, text in extract_pages_from_pdf(pdf_bytes))
 
 
 
@@ -71,12 +177,29 @@ def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> L
     return [d.page_content for d in docs]
 
 
-def build_embeddings_and_upsert(pdf_input, qdrant_url: str = None):
+def chunk_pages(pages: List[Tuple[int, str]], chunk_size: int = 1000,
+                chunk_overlap: int = 200) -> List[str]:
+    """
+    Chunks page texts with ingest_stream.iter_chunks, the chunker shared by
+    the Streamlit, streaming and bulk paths: the same PDF always yields the
+    same chunks, hence the same point ids, however it is ingested.
+    """
+    return [text for _, text in iter_chunks(pages, chunk_size, chunk_overlap)]
+
+
+def build_embeddings_and_upsert(pdf_input, qdrant_url: str = None,
+                                streaming: bool = False, on_progress=None):
     """
     Accepts either:
     - a file path (str)
     - a Streamlit UploadedFile object
+
+    With `streaming=True` the PDF is ingested page by page through bounded
+    stages (see ingest_stream) and `on_progress(stage, counters)` is called
+    as pages, chunks, embeddings and upserts complete.
     """
+    if streaming:
+        return stream_embeddings_and_upsert(pdf_input, qdrant_url, on_progress)
 
     # --- Detect input type ---
     if isinstance(pdf_input, str):
@@ -90,75 +213,415 @@ def build_embeddings_and_upsert(pdf_input, qdrant_url: str = None):
         pdf_bytes = pdf_input.read()
         source_name = getattr(pdf_input, "name", "uploaded.pdf")
 
-    # --- FIX: Pass bytes to extract_text_from_pdf ---
-    text = extract_text_from_pdf(pdf_bytes)
-
-    # --- Chunking ---
-    chunks = chunk_text(text)
+    pages = extract_pages_from_pdf(pdf_bytes)
 
-    # --- Embeddings ---
-    embeddings = AzureEmbeddingWrapper(
-        azure_endpoint=azure_endpoint,
-        api_key=api_key,
-        api_version="2024-02-01",
-        model_name=model_name
-    )
+    # --- Chunking (same chunker as the streaming and bulk paths) ---
+    chunks = chunk_pages(pages)
 
-    vectors = embeddings.embed_documents(chunks)
+    # --- Embeddings (token-budgeted, concurrent batches), new chunks only ---
+    scheduler = get_embedding_scheduler(get_embeddings().embed_documents)
 
     # --- Qdrant ---
-    qclient = get_qdrant_client()
-    dim = len(vectors[0])
+    qclient = get_vector_client(qdrant_url)
+    stats = sync_source(qclient, chunks, source_name, scheduler.embed)
+    get_lexical_index(COLLECTION_NAME).save()
+
+    return stats["chunks"]
+
+
+def _known_positions(qclient, source_name: str) -> dict:
+    # A dropped collection makes the manifest stale → treat everything as new
+    if not collection_exists(qclient, COLLECTION_NAME):
+        return {}
+    return get_manifest().positions(COLLECTION_NAME, source_name)
 
-    create_collection_if_not_exists(qclient, COLLECTION_NAME, dim)
 
-    ids = [str(uuid4()) for _ in chunks]
-    metadatas = [{"text": chunk, "source": source_name} for chunk in chunks]
+def _known_ids(qclient, source_name: str) -> set:
+    return set(_known_positions(qclient, source_name))
+
+
+def renumber_chunks(qclient, known_positions: dict, ids: List[str]) -> int:
+    """
+    Rewrites the "chunk_index" payload of kept chunks whose position changed
+    (an edit inserted or removed chunks before them), so merge_adjacent
+    does not treat former neighbours as adjacent. Payload-only: nothing is
+    re-embedded. Returns the number of chunks renumbered.
+    """
+    moved = moved_chunks(known_positions, ids)
+    if moved:
+        payloads = {point_id: {"chunk_index": i} for point_id, i in moved.items()}
+        update_payloads(qclient, COLLECTION_NAME, payloads)
+        get_lexical_index(COLLECTION_NAME).update_payloads(payloads)
+    return len(moved)
+
+
+def sync_source(qclient, chunks: List[str], source_name: str, embed_fn) -> dict:
+    """
+    Incrementally (re-)ingests one source: chunks are keyed by deterministic
+    ids, only chunks missing from the manifest are embedded and upserted,
+    and chunks that disappeared from the source are deleted.
+    Kept chunks that moved get their chunk_index rewritten (renumber_chunks).
+    Returns {"chunks", "embedded", "deleted", "renumbered"}.
+    """
+    ids = [chunk_point_id(source_name, c) for c in chunks]
+    known = _known_positions(qclient, source_name)
+    new_indexes, removed = diff_source(set(known), ids)
+
+    if new_indexes:
+        new_chunks = [chunks[i] for i in new_indexes]
+        vectors = embed_fn(new_chunks)
+        create_collection_if_not_exists(qclient, COLLECTION_NAME, len(vectors[0]))
+        upsert_chunks(qclient, new_chunks, vectors, source_name, ids=[ids[i] for i in new_indexes],
+                      indexes=new_indexes)
+
+    if removed:
+        delete_chunks(qclient, removed)
+    renumbered = renumber_chunks(qclient, known, ids)
+
+    get_manifest().replace(COLLECTION_NAME, source_name, ids)
+    stats = {"chunks": len(set(ids)), "embedded": len(new_indexes), "deleted": len(removed),
+             "renumbered": renumbered}
+    logger.info("%s: %d chunks, %d new, %d removed, %d renumbered",
+                source_name, stats["chunks"], stats["embedded"], stats["deleted"], renumbered)
+    return stats
+
+
+def upsert_chunks(qclient, chunks: List[str], vectors, source_name: str, ids: List[str] = None,
+                  indexes: List[int] = None):
+    """
+    Writes embedded chunks of one source into COLLECTION_NAME.
+    Shared by the batch, streaming and bulk ingestion paths.
+    Texts go to the local docstore first, so a point is never searchable
+    without its text; vector payloads only carry metadata, including the
+    chunk's position in the source (`indexes`) used to merge neighbours.
+    """
+    ids = ids or [chunk_point_id(source_name, chunk) for chunk in chunks]
+    if indexes is None:
+        metadatas = [{"source": source_name} for _ in chunks]
+    else:
+        metadatas = [{"source": source_name, "chunk_index": i} for i in indexes]
 
+    get_docstore().put_many(COLLECTION_NAME, ids, chunks)
     upsert_documents(qclient, COLLECTION_NAME, vectors, metadatas, ids)
+    # Same ids in the BM25 index so lexical and dense hits fuse by id
+    get_lexical_index(COLLECTION_NAME).add_many(ids, chunks, metadatas)
+    get_manifest().add(COLLECTION_NAME, source_name, ids)
 
-    return len(vectors)
+    _invalidate_answers()
 
 
+def delete_chunks(qclient, ids: List[str]):
+    """
+    Removes chunks from the vector store, the BM25 index and the docstore.
+    """
+    delete_points(qclient, COLLECTION_NAME, ids)
+    get_lexical_index(COLLECTION_NAME).remove(ids)
+    get_docstore().delete(COLLECTION_NAME, ids)
+    _invalidate_answers()
+
+
+def _invalidate_answers():
+    # Cached answers were built on the old collection contents
+    answer_cache = get_answer_cache()
+    if answer_cache is not None:
+        answer_cache.invalidate_collection(COLLECTION_NAME)
 
-def query_rag(query: str, top_k: int = 4):
+
+def get_ingest_backend(qdrant_url: str = None):
     """
-    Query Qdrant vector DB and return top relevant chunks.
+    Returns (embed_fn, upsert_fn, diff_fn) sharing one embedding scheduler
+    and one Qdrant client, for callers that ingest many documents (see
+    bulk_ingest). diff_fn(chunks, source_name) lists the chunks missing from
+    the manifest, so only those are embedded.
     """
-    embeddings = AzureEmbeddingWrapper(
-    azure_endpoint=azure_endpoint,
-    api_key=api_key,
-    api_version='2024-02-01',
-    model_name=model_name
-)
-    # embeddings = OpenAIEmbeddings()
-    q_vec = embeddings.embed_query(query)
+    scheduler = get_embedding_scheduler(get_embeddings().embed_documents)
+    qclient = get_vector_client(qdrant_url)
 
-    qclient = get_qdrant_client()
+    def diff_fn(chunks, source_name):
+        ids = [chunk_point_id(source_name, c) for c in chunks]
+        return diff_source(_known_ids(qclient, source_name), ids)[0]
 
-    results = query_similar(qclient, COLLECTION_NAME, q_vec, top_k=top_k)
-    print(results)
-    # Extract context text
-    contexts = []
-    for r in results:
-        print("\nPROCESSING RESULT:", r)
+    def upsert_fn(chunks, vectors, source_name):
+        # Vectors of new chunks are already computed; anything the manifest
+        # gained in between is embedded here
+        by_text = {t: v for t, v in zip(chunks, vectors) if v is not None}
+
+        def embed_new(new):
+            missing = [t for t in new if t not in by_text]
+            if missing:
+                by_text.update(zip(missing, scheduler.embed(missing)))
+            return [by_text[t] for t in new]
 
-        # Handle both dict and Qdrant ScoredPoint object
-        payload = None
+        sync_source(qclient, chunks, source_name, embed_new)
+        get_lexical_index(COLLECTION_NAME).save()
 
-        if isinstance(r, dict) and "payload" in r:
-            payload = r["payload"]
-        elif hasattr(r, "payload"):
-            payload = r.payload
+    return scheduler.embed, upsert_fn, diff_fn
 
-        print("PAYLOAD:", payload)
 
-        if isinstance(payload, dict) and "text" in payload:
-            txt = payload["text"]
-            print("FOUND TEXT:", txt[:200], "...")
-            contexts.append(txt)
+def stream_embeddings_and_upsert(pdf_input, qdrant_url: str = None, on_progress=None) -> int:
+    """
+    Constant-memory ingestion: extract → chunk → embed → upsert, one bounded
+    batch at a time. Returns the number of chunks upserted.
+    """
+    scheduler = get_embedding_scheduler(get_embeddings().embed_documents)
+    qclient = get_vector_client(qdrant_url)
+
+    if isinstance(pdf_input, str):
+        stream = open(pdf_input, "rb")
+        source_name = os.path.basename(pdf_input)
+    else:
+        stream = pdf_input
+        source_name = getattr(pdf_input, "name", "uploaded.pdf")
+
+    positions = _known_positions(qclient, source_name)
+    known = set(positions)
+    seen_set = set()
+    order: List[str] = []
+
+    def embed_new(texts):
+        # Chunks already in the collection (or earlier in this file) get no vector
+        ids = [chunk_point_id(source_name, t) for t in texts]
+        fresh = [i for i, pid in enumerate(ids) if pid not in known and pid not in seen_set]
+        seen_set.update(ids)
+        vectors = [None] * len(texts)
+        if fresh:
+            for i, vec in zip(fresh, scheduler.embed([texts[i] for i in fresh])):
+                vectors[i] = vec
+        return vectors
+
+    def upsert_batch(batch, vectors):
+        # Batches arrive in chunk order: order[i] is the id of chunk i
+        order.extend(chunk_point_id(source_name, text) for _, text in batch)
+        rows = [(index, text, vec) for (index, text), vec in zip(batch, vectors) if vec is not None]
+        if not rows:
+            return
+        create_collection_if_not_exists(qclient, COLLECTION_NAME, len(rows[0][2]))
+
+        upsert_chunks(qclient, [t for _, t, _ in rows], [v for _, _, v in rows], source_name,
+                      indexes=[i for i, _, _ in rows])
+
+    try:
+        progress = stream_ingest(
+            stream,
+            embed_fn=embed_new,
+            upsert_fn=upsert_batch,
+            batch_size=int(os.getenv("INGEST_BATCH_SIZE", "64")),
+            queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "4")),
+            on_progress=on_progress,
+        )
+        # Only a complete pass knows which chunks vanished from the source
+        removed = sorted(known - seen_set)
+        if removed:
+            delete_chunks(qclient, removed)
+        renumber_chunks(qclient, positions, order)
+        get_manifest().replace(COLLECTION_NAME, source_name, order)
+    finally:
+        if isinstance(pdf_input, str):
+            stream.close()
+        get_lexical_index(COLLECTION_NAME).save()
+
+    return progress["upserted"]
+
+
+def _plan_retrieval(query: str, mode: str = None, q_vec=None):
+    """
+    Resolves the effective retrieval mode; returns (mode, lexical_index).
+    """
+    mode = (mode or os.getenv("RAG_RETRIEVAL_MODE", "hybrid")).lower()
+    lexical = get_lexical_index(COLLECTION_NAME)
+
+    if mode == "hybrid":
+        if not len(lexical):
+            mode = "dense"
+        elif q_vec is None and is_keyword_query(query, lexical):
+            mode = "lexical"
+    return mode, lexical
+
+
+def _dense_hits(qclient, q_vec, top_k: int) -> List[dict]:
+    """
+    Vector search; with RAG_MMR=1 over-fetches candidates with their vectors
+    and keeps a diverse top_k (see rerank).
+    """
+    mmr = mmr_settings()
+    if mmr is None:
+        return query_similar(qclient, COLLECTION_NAME, q_vec, top_k=top_k)
+    candidates = query_similar(qclient, COLLECTION_NAME, q_vec,
+                               top_k=top_k * mmr["fetch_factor"], with_vectors=True)
+    return mmr_rerank(candidates, q_vec, top_k, mmr["lambda"])
+
+
+async def _adense_hits(qclient, q_vec, top_k: int) -> List[dict]:
+    mmr = mmr_settings()
+    if mmr is None:
+        return await aquery_similar(qclient, COLLECTION_NAME, q_vec, top_k=top_k)
+    candidates = await aquery_similar(qclient, COLLECTION_NAME, q_vec,
+                                      top_k=top_k * mmr["fetch_factor"], with_vectors=True)
+    return mmr_rerank(candidates, q_vec, top_k, mmr["lambda"])
+
+
+def retrieve(query: str, top_k: int = 4, mode: str = None, q_vec=None) -> List[dict]:
+    """
+    Ranked hits ({"id", "score", "payload"}) for `query`.
+
+    mode (default RAG_RETRIEVAL_MODE, "hybrid"):
+    - "dense":   vector search only
+    - "lexical": BM25 only, no embedding call
+    - "hybrid":  both, merged with reciprocal rank fusion; short keyword
+                 queries fully covered by the BM25 index skip the embedding
+    Pass `q_vec` when the query embedding is already known.
+    RAG_MMR=1 reranks the dense candidates for diversity (see `_dense_hits`).
+    """
+    mode, lexical = _plan_retrieval(query, mode, q_vec)
+
+    if mode == "lexical":
+        return lexical.search(query, top_k=top_k)
+
+    if q_vec is None:
+        embeddings = get_embeddings()
+        # embeddings = OpenAIEmbeddings()
+        q_vec = embeddings.embed_query(query)
+
+    qclient = get_vector_client()
+
+    if mode == "dense":
+        return _dense_hits(qclient, q_vec, top_k)
+
+    # Over-fetch from both retrievers, then fuse down to top_k
+    dense = _dense_hits(qclient, q_vec, top_k * 2)
+    sparse = lexical.search(query, top_k=top_k * 2)
+    return reciprocal_rank_fusion([dense, sparse], top_k=top_k)
+
+
+async def aretrieve(query: str, top_k: int = 4, mode: str = None, q_vec=None) -> List[dict]:
+    """
+    Async `retrieve`: same modes, with non-blocking embedding and vector search.
+    """
+    mode, lexical = _plan_retrieval(query, mode, q_vec)
+
+    if mode == "lexical":
+        return lexical.search(query, top_k=top_k)
+
+    if q_vec is None:
+        q_vec = await get_embeddings().aembed_query(query)
+
+    qclient = get_async_vector_client()
+
+    if mode == "dense":
+        return await _adense_hits(qclient, q_vec, top_k)
+
+    dense = await _adense_hits(qclient, q_vec, top_k * 2)
+    sparse = lexical.search(query, top_k=top_k * 2)
+    return reciprocal_rank_fusion([dense, sparse], top_k=top_k)
+
+
+async def aembed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Embeds many queries with one embeddings request per MAX_EMBED_INPUTS
+    (cached queries are not sent).
+    """
+    embeddings = get_embeddings()
+    vectors = []
+    for s in range(0, len(queries), MAX_EMBED_INPUTS):
+        vectors.extend(await embeddings.aembed_documents(queries[s:s + MAX_EMBED_INPUTS]))
+    return vectors
+
+
+async def aretrieve_many(queries: List[str], top_k: int = 4, mode: str = None,
+                         q_vecs: List = None) -> List[List[dict]]:
+    """
+    Batch `aretrieve`, one hit list per query: every query that needs an
+    embedding is embedded in one request and all vector searches go out in
+    one query_batch_points request; BM25 runs locally per query.
+    """
+    queries = list(queries)
+    q_vecs = list(q_vecs) if q_vecs is not None else [None] * len(queries)
+    plans = [_plan_retrieval(q, mode, v) for q, v in zip(queries, q_vecs)]
+
+    results: List[List[dict]] = [None] * len(queries)
+    dense_indexes = []
+    for i, (plan_mode, lexical) in enumerate(plans):
+        if plan_mode == "lexical":
+            results[i] = lexical.search(queries[i], top_k=top_k)
+        else:
+            dense_indexes.append(i)
+
+    if not dense_indexes:
+        return results
+
+    to_embed = [i for i in dense_indexes if q_vecs[i] is None]
+    if to_embed:
+        for i, vec in zip(to_embed, await aembed_queries([queries[i] for i in to_embed])):
+            q_vecs[i] = vec
+
+    # Same over-fetch as aretrieve: 2x for fusion, times the MMR fetch factor
+    mmr = mmr_settings()
+    limit = top_k * 2 * (mmr["fetch_factor"] if mmr else 1)
+    dense_lists = await aquery_batch_similar(
+        get_async_vector_client(), COLLECTION_NAME, [q_vecs[i] for i in dense_indexes],
+        top_k=limit, with_vectors=mmr is not None
+    )
+
+    for i, dense in zip(dense_indexes, dense_lists):
+        plan_mode, lexical = plans[i]
+        k = top_k if plan_mode == "dense" else top_k * 2
+        dense = mmr_rerank(dense, q_vecs[i], k, mmr["lambda"]) if mmr else dense[:k]
+        if plan_mode == "dense":
+            results[i] = dense
         else:
-            print("⚠ No text field found in payload!")
+            sparse = lexical.search(queries[i], top_k=top_k * 2)
+            results[i] = reciprocal_rank_fusion([dense, sparse], top_k=top_k)
+    return results
 
-    print("\nFINAL CONTEXTS:", contexts)
-    return contexts
\ No newline at end of file
+
+def query_rag(query: str, top_k: int = 4, mode: str = None):
+    """
+    Query the vector DB (plus the BM25 index in hybrid mode) and return top relevant chunks.
+    """
+    results = retrieve(query, top_k=top_k, mode=mode)
+    return extract_contexts(results)
+
+
+def _hit_fields(r):
+    # Handle both dict and Qdrant ScoredPoint object
+    if isinstance(r, dict):
+        return r.get("id"), r.get("payload")
+    return getattr(r, "id", None), getattr(r, "payload", None)
+
+
+def hit_texts(results) -> List[Optional[str]]:
+    """
+    Chunk text per hit, aligned with `results` (None when unknown): from the
+    payload when it still carries one (collections ingested before slim
+    payloads), otherwise fetched for all dense and lexical hits at once from
+    the docstore.
+    """
+    hits = [_hit_fields(r) for r in results]
+    texts = [p.get("text") if isinstance(p, dict) else None for _, p in hits]
+    missing = [i for i, t in enumerate(texts) if t is None]
+    if missing:
+        stored = get_docstore().get_many(COLLECTION_NAME, [hits[i][0] for i in missing])
+        for i, text in zip(missing, stored):
+            texts[i] = text
+    return texts
+
+
+def extract_contexts(results) -> List[str]:
+    """
+    Chunk texts of the hits that have one (see `hit_texts`).
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    contexts = []
+    for r, text in zip(results, hit_texts(results)):
+        hit_id, payload = _hit_fields(r)
+        if text is None:
+            logger.warning("No text found for hit %s", hit_id)
+            continue
+        contexts.append(text)
+        if debug:
+            source = payload.get("source") if isinstance(payload, dict) else None
+            logger.debug("Context from %s: %.200s ...", source, text)
+
+    metrics.set_gauge("payload_items", len(contexts), kind="rag_contexts")
+    metrics.set_gauge("payload_chars", sum(len(c) for c in contexts), kind="rag_contexts")
+    return contexts
@@ -1,34 +1,54 @@
 
-from typing import Dict, List
-from weather import fetch_weather, format_weather_summary
-from pdf_rag import query_rag
+import re
+import httpx
+from typing import Dict, List, Union
+from weather import fetch_weather, fetch_weather_many, format_weather_summary
+from weather import afetch_weather, afetch_weather_many
+from pdf_rag import retrieve, aretrieve, hit_texts, get_embeddings, COLLECTION_NAME
+from context_packer import CONTEXT_SEPARATOR, fit_budget, pack_contexts
+from answer_cache import get_answer_cache
+from router import get_router
+from gazetteer import get_gazetteer, place_from_weather
 from langsmith import traceable
-from llm_utils import summarize_with_llm
+from llm_utils import summarize_with_llm, asummarize_with_llm
 
 
 def decide_action(user_input: str) -> str:
-    lower = user_input.lower().strip()
+    """
+    Routes to "greeting", "weather" or "pdf_rag" (see router.IntentRouter).
+    """
+    return get_router().route(user_input)
 
-    greeting_triggers = ["hi", "hello", "hey", "good morning", "good evening"]
 
-    if any(lower == g or lower.startswith(g + " ") for g in greeting_triggers):
-        return "greeting"
+def decide_actions(user_inputs: List[str]) -> List[str]:
+    """
+    Batch `decide_action`: ambiguous inputs share one embedding call.
+    """
+    return get_router().route_many(user_inputs)
+
 
-    weather_triggers = ["weather", "temperature", "rain", "sunny", "forecast", "humidity"]
+async def adecide_action(user_input: str) -> str:
+    """
+    Async `decide_action`: the embedding fallback does not block the event loop.
+    """
+    return await get_router().aroute(user_input)
 
-    if any(tok in lower for tok in weather_triggers):
-        return "weather"
 
-    return "pdf_rag"
+async def adecide_actions(user_inputs: List[str]) -> List[str]:
+    return await get_router().aroute_many(user_inputs)
 
-def build_guardrailed_prompt(contexts: List[str], user_question: str) -> str:
+def build_guardrailed_prompt(contexts: List[str], user_question: str,
+                             max_context_tokens: int = None) -> str:
     """
     Construct a guardrailed prompt guaranteeing the LLM stays inside the context.
+    With `max_context_tokens`, only the leading contexts that fit are kept
+    (see context_packer.pack_contexts for merging and deduplication).
     """
+    contexts = fit_budget(contexts, max_context_tokens)
 
     context_block = (
         "No related documents found in the vector store."
-        if not contexts else "\n\n---\n\n".join(contexts)
+        if not contexts else CONTEXT_SEPARATOR.join(contexts)
     )
 
     return f"""
@@ -52,9 +72,9 @@ Your answer must strictly follow the rules above.
 """.strip()
 
 
-def extract_city(txt: str) -> str:
+def _guess_city(txt: str) -> str:
     """
-    Extracts a city name using a simple heuristic.
+    Heuristic for cities missing from the gazetteer: the word after " in ", else the last word.
     """
     lower = txt.lower()
     if " in " in lower:
@@ -64,8 +84,81 @@ def extract_city(txt: str) -> str:
         except Exception:
             pass
 
-    tokens = txt.strip().split()
-    return tokens[-1].strip("?,.") if tokens else "London"
+    tokens = lower.strip().split()
+    return tokens[-1].strip("?,.") if tokens else "london"
+
+
+def _guess_cities(txt: str) -> List[str]:
+    lower = txt.lower()
+    if " in " in lower:
+        after = lower.split(" in ", 1)[1]
+        parts = [p.split() for p in re.split(r",|\band\b|&", after)]
+        cities = [p[0].strip(",.?") for p in parts if p]
+        if len(cities) > 1:
+            return cities
+
+    return [_guess_city(txt)]
+
+
+def extract_city(txt: str) -> str:
+    """
+    Extracts a city name: the first gazetteer match (multi-word names included),
+    else a simple heuristic.
+    """
+    return extract_cities(txt)[0]
+
+def extract_cities(txt: str) -> List[str]:
+    """
+    Extracts one or more cities, e.g. "compare weather in Pune, New Delhi and Chennai".
+    Falls back to the heuristic when no known city is mentioned.
+    """
+    found = get_gazetteer().find(txt)
+    if found:
+        return [m["text"] for m in found]
+    return _guess_cities(txt)
+
+
+def resolve_locations(txt: str) -> List[Union[str, Dict]]:
+    """
+    Cities in `txt` as gazetteer places (queried by coordinates), or as
+    names for unknown cities. Raises ValueError for a name the weather API
+    has already rejected, without another round trip.
+    """
+    gazetteer = get_gazetteer()
+    found = gazetteer.find(txt)
+    if found:
+        return [m["place"] for m in found]
+
+    locations = []
+    for name in _guess_cities(txt):
+        if gazetteer.is_missing(name):
+            raise ValueError(f"Unknown city: {name}")
+        locations.append(gazetteer.lookup(name) or name)
+    return locations
+
+
+def _learn_locations(locations: List, results: List) -> List[Dict]:
+    """
+    Remembers API answers for guessed names; shows the gazetteer name for places.
+    """
+    gazetteer = get_gazetteer()
+    labelled = []
+    for location, weather_json in zip(locations, results):
+        if isinstance(location, dict):
+            weather_json = {**weather_json, "name": location["name"]}
+        else:
+            place = place_from_weather(weather_json)
+            if place is not None:
+                gazetteer.learn(location, place)
+        labelled.append(weather_json)
+    return labelled
+
+
+def _learn_failure(locations: List, error: Exception):
+    # A 404 for a single guessed name means the city does not exist
+    if (len(locations) == 1 and isinstance(locations[0], str)
+            and isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404):
+        get_gazetteer().learn_missing(locations[0])
 
 # Components used by LangGraph
 @traceable(name="Weather Node")
@@ -73,11 +166,26 @@ def weather_node(state: Dict, openweather_key: str = None) -> Dict:
     """
     LangGraph node: Calls weather API and formats it.
     """
-    user_input = state["user_input"]
-    city = extract_city(user_input)
+    locations = resolve_locations(state["user_input"])
+
+    try:
+        if len(locations) > 1:
+            # One parallel round trip for all cities
+            weather_json = _learn_locations(locations, fetch_weather_many(locations, api_key=openweather_key))
+        else:
+            weather_json = _learn_locations(locations, [fetch_weather(locations[0], api_key=openweather_key)])[0]
+    except Exception as e:
+        _learn_failure(locations, e)
+        raise
+
+    return _weather_update(weather_json)
 
-    weather_json = fetch_weather(city, api_key=openweather_key)
-    summary = format_weather_summary(weather_json)
+
+def _weather_update(weather_json) -> Dict:
+    if isinstance(weather_json, list):
+        summary = "\n".join(format_weather_summary(w) for w in weather_json)
+    else:
+        summary = format_weather_summary(weather_json)
 
     return {
         "action": "weather",
@@ -91,9 +199,20 @@ def rag_node(state: Dict) -> Dict:
     LangGraph node: RAG retrieval + guardrailed LLM.
     """
     user_input = state["user_input"]
+    answer_cache = get_answer_cache()
+    q_vec = generation = None
+
+    # semantic answer cache: a close-enough earlier question skips retrieval + LLM
+    if answer_cache is not None:
+        q_vec = get_embeddings().embed_query(user_input)
+        cached, generation = answer_cache.lookup(q_vec, COLLECTION_NAME)
+        if cached is not None:
+            return {"action": "pdf_rag", "raw": cached["contexts"], "summary": cached["answer"]}
 
-    # retrieve from vector DB
-    contexts = query_rag(user_input)
+    # retrieve from vector DB (reusing the query embedding)
+    hits = retrieve(user_input, q_vec=q_vec)
+    # merge overlapping neighbours, drop duplicates, fit RAG_CONTEXT_TOKENS
+    contexts = pack_contexts(hits, hit_texts(hits))["contexts"]
 
     # guardrailed prompt
     prompt = build_guardrailed_prompt(contexts, user_input)
@@ -101,6 +220,61 @@ def rag_node(state: Dict) -> Dict:
     # summarize with LLM
     summary = summarize_with_llm(prompt)
 
+    if answer_cache is not None:
+        answer_cache.store(q_vec, summary, [h["id"] for h in hits], COLLECTION_NAME, contexts,
+                           generation=generation)
+
+    return {
+        "action": "pdf_rag",
+        "raw": contexts,
+        "summary": summary
+    }
+
+
+# Async variants used by graph.build_async_pipeline_graph
+@traceable(name="Weather Node")
+async def aweather_node(state: Dict, openweather_key: str = None) -> Dict:
+    """
+    Async LangGraph node: non-blocking weather lookup on the shared connection pool.
+    """
+    locations = resolve_locations(state["user_input"])
+
+    try:
+        if len(locations) > 1:
+            weather_json = _learn_locations(locations, await afetch_weather_many(locations, api_key=openweather_key))
+        else:
+            weather_json = _learn_locations(locations, [await afetch_weather(locations[0], api_key=openweather_key)])[0]
+    except Exception as e:
+        _learn_failure(locations, e)
+        raise
+
+    return _weather_update(weather_json)
+
+@traceable(name="RAG Node")
+async def arag_node(state: Dict) -> Dict:
+    """
+    Async LangGraph node: same flow as `rag_node` with awaited I/O.
+    """
+    user_input = state["user_input"]
+    answer_cache = get_answer_cache()
+    q_vec = generation = None
+
+    if answer_cache is not None:
+        q_vec = await get_embeddings().aembed_query(user_input)
+        cached, generation = answer_cache.lookup(q_vec, COLLECTION_NAME)
+        if cached is not None:
+            return {"action": "pdf_rag", "raw": cached["contexts"], "summary": cached["answer"]}
+
+    hits = await aretrieve(user_input, q_vec=q_vec)
+    contexts = pack_contexts(hits, hit_texts(hits))["contexts"]
+
+    prompt = build_guardrailed_prompt(contexts, user_input)
+    summary = await asummarize_with_llm(prompt)
+
+    if answer_cache is not None:
+        answer_cache.store(q_vec, summary, [h["id"] for h in hits], COLLECTION_NAME, contexts,
+                           generation=generation)
+
     return {
         "action": "pdf_rag",
         "raw": contexts,
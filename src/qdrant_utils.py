@@ -1,104 +1,755 @@
 # src/qdrant_utils.py
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import (
     Distance,
     VectorParams,
     PointStruct,
     QueryRequest,
-    NamedVector
+    Batch,
+    PointIdsList,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParamsDiff,
+    HnswConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Disabled,
+    PayloadSchemaType,
+    SearchParams,
+    QuantizationSearchParams
 )
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import os
+import time
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from abc import ABC, abstractmethod
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from qdrant_client.models import Filter
+from local_index import LocalVectorIndex, get_local_index
+from metrics import metrics, timed, configure_logging
+
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------------
-# Qdrant Client
+# Qdrant Client (process-wide registry)
 # -------------------------------------
-def get_qdrant_client(url: str = None, api_key: str = None) -> QdrantClient:
+_clients: Dict[Tuple[str, str, bool], QdrantClient] = {}
+_clients_lock = threading.Lock()
+
+# client → {collection_name: vector_size} for collections known to exist
+_ready_collections: "weakref.WeakKeyDictionary[QdrantClient, Dict[str, int]]" = weakref.WeakKeyDictionary()
+
+
+def _connection_key(url: str = None, api_key: str = None, prefer_grpc: bool = None) -> Tuple[str, str, bool]:
     url = url or os.getenv(
         "QDRANT_URL",
         "https://42a3d4c3-be2f-4463-82c1-294e135a6512.us-east4-0.gcp.cloud.qdrant.io:6333"
     )
     api_key = api_key or os.getenv("QDRANT_API_KEY")
+    if prefer_grpc is None:
+        prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "0").lower() in ("1", "true", "yes")
+    return url, api_key, prefer_grpc
+
+
+def get_qdrant_client(url: str = None, api_key: str = None, prefer_grpc: bool = None) -> QdrantClient:
+    """
+    Returns a shared, pooled client per (url, api_key, prefer_grpc).
+    Set QDRANT_PREFER_GRPC=1 to use gRPC for lower query latency, or
+    QDRANT_URL=:memory: for an in-process Qdrant (tests, benchmarks).
+    """
+    key = _connection_key(url, api_key, prefer_grpc)
+    url, api_key, prefer_grpc = key
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if url == ":memory:":
+                client = QdrantClient(":memory:")
+            else:
+                client = QdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc)
+            _clients[key] = client
+        return client
+
+
+def get_vector_client(url: str = None, api_key: str = None) -> "VectorBackend":
+    """
+    Returns the configured vector store backend (see VectorBackend):
+    - VECTOR_BACKEND=qdrant (default): adapter over the shared QdrantClient
+    - VECTOR_BACKEND=local: adapter over the LocalVectorIndex under LOCAL_VECTOR_DIR
+    """
+    backend = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    if backend == "local":
+        return LocalBackend(get_local_index())
+    if backend != "qdrant":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+    return QdrantBackend(get_qdrant_client(url, api_key))
+
+
+# Async clients hold loop-bound connections: one registry per event loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+
+
+class _InProcessAsyncClient:
+    """
+    Awaitable facade over the shared ":memory:" QdrantClient, so sync and
+    async code paths see the same in-process data (a separate
+    AsyncQdrantClient(":memory:") would start empty). Calls run inline: the
+    in-process client is not thread-safe and does no network I/O.
+    """
+
+    def __init__(self, client: QdrantClient):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return attr(*args, **kwargs)
+        return call
+
+
+def get_async_qdrant_client(url: str = None, api_key: str = None,
+                            prefer_grpc: bool = None) -> AsyncQdrantClient:
+    """
+    Async counterpart of `get_qdrant_client`, shared per running event loop.
+    QDRANT_URL=:memory: wraps the shared in-process client.
+    """
+    key = _connection_key(url, api_key, prefer_grpc)
+    url, api_key, prefer_grpc = key
+    if url == ":memory:":
+        return _InProcessAsyncClient(get_qdrant_client(url, api_key, prefer_grpc))
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None:
+            client = AsyncQdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc)
+            per_loop[key] = client
+        return client
+
+
+def get_async_vector_client(url: str = None, api_key: str = None) -> "AsyncVectorBackend":
+    """
+    Async counterpart of `get_vector_client`, for `aquery_similar` and
+    `aquery_batch_similar`.
+    """
+    backend = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    if backend == "local":
+        return LocalBackend(get_local_index())
+    if backend != "qdrant":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+    return AsyncQdrantBackend(get_async_qdrant_client(url, api_key))
+
+
+def close_qdrant_clients():
+    """
+    Closes every registered client and forgets cached collection checks.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _ready_collections.clear()
+        _async_clients.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Failed to close Qdrant client: %s", e)
+
+
+atexit.register(close_qdrant_clients)
+
+
+# -------------------------------------
+# Collection Profiles
+# -------------------------------------
+# Storage/index settings applied when a collection is created or migrated.
+# - quantization: None | "int8" (4x smaller) | "binary" (32x smaller, needs
+#   high-dimensional embeddings); quantized vectors stay in RAM, originals
+#   are used to rescore `oversampling * top_k` candidates
+# - on_disk: original vectors memory-mapped from disk instead of RAM
+# - hnsw: graph parameters; hnsw_ef is the search-time beam width
+# - payload_indexes: field → schema; "source" backs per-document deletes
+COLLECTION_PROFILES: Dict[str, Dict] = {
+    "default": {
+        "quantization": None,
+        "on_disk": False,
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": False},
+        "hnsw_ef": None,
+        "payload_indexes": {"source": "keyword"},
+    },
+    "int8": {
+        "quantization": "int8",
+        "quantile": 0.99,
+        "on_disk": True,
+        "rescore": True,
+        "oversampling": 2.0,
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": False},
+        "hnsw_ef": None,
+        "payload_indexes": {"source": "keyword"},
+    },
+    "binary": {
+        "quantization": "binary",
+        "on_disk": True,
+        "rescore": True,
+        "oversampling": 3.0,
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": False},
+        "hnsw_ef": 128,
+        "payload_indexes": {"source": "keyword"},
+    },
+    "on_disk": {
+        "quantization": None,
+        "on_disk": True,
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": True},
+        "hnsw_ef": None,
+        "payload_indexes": {"source": "keyword"},
+    },
+}
+
+
+def get_collection_profile(name: str = None) -> Dict:
+    """
+    Profile by name, default from QDRANT_COLLECTION_PROFILE ("default").
+    """
+    name = name or os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile: {name} "
+                         f"(expected one of {', '.join(COLLECTION_PROFILES)})")
+    return COLLECTION_PROFILES[name]
+
+
+def _quantization_config(profile: Dict):
+    kind = profile.get("quantization")
+    if kind is None:
+        return None
+    if kind == "int8":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=profile.get("quantile", 0.99), always_ram=True
+        ))
+    if kind == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unknown quantization: {kind}")
+
+
+def _hnsw_config(profile: Dict) -> HnswConfigDiff:
+    return HnswConfigDiff(**profile.get("hnsw", {}))
+
+
+def search_params(profile: Dict = None) -> SearchParams:
+    """
+    Query-time settings matching the profile (rescoring, oversampling, hnsw_ef).
+    """
+    profile = profile or get_collection_profile()
+    quantization = None
+    if profile.get("quantization"):
+        quantization = QuantizationSearchParams(
+            rescore=profile.get("rescore", True),
+            oversampling=profile.get("oversampling")
+        )
+    return SearchParams(hnsw_ef=profile.get("hnsw_ef"), quantization=quantization)
+
+
+def _is_local_mode(client) -> bool:
+    # ":memory:" / path clients accept but ignore quantization and payload indexes
+    options = getattr(client, "init_options", None) or {}
+    return options.get("location") == ":memory:" or bool(options.get("path"))
+
+
+def _hit(point, with_vectors: bool) -> Dict:
+    hit = {"id": point.id, "score": point.score, "payload": point.payload}
+    if with_vectors:
+        hit["vector"] = point.vector
+    return hit
+
+
+def _send_batch(client, collection_name, ids, matrix, metadatas, wait: bool):
+    # Column-oriented Batch, built without per-point PointStruct validation;
+    # ndarray.tolist() converts the float32 block in C.
+    client.upsert(
+        collection_name=collection_name,
+        points=Batch.model_construct(
+            ids=list(ids),
+            vectors=matrix.tolist(),
+            payloads=list(metadatas)
+        ),
+        wait=wait
+    )
+
+
+# -------------------------------------
+# Vector Backends
+# -------------------------------------
+class VectorBackend(ABC):
+    """
+    What ingestion and sync retrieval need from a vector store.
+    get_vector_client returns an adapter; the module-level helpers also
+    accept a raw QdrantClient or LocalVectorIndex and wrap it with
+    `as_backend`. Storage tuning (profiles, payload indexes) is a no-op
+    unless the backend supports it.
+    """
+
+    @abstractmethod
+    def collection_exists(self, name: str) -> bool: ...
+
+    @abstractmethod
+    def ensure_collection(self, name: str, vector_size: int, distance: Distance = Distance.COSINE,
+                          profile: Dict = None): ...
+
+    @abstractmethod
+    def delete_collection(self, name: str): ...
+
+    @abstractmethod
+    def upsert(self, name: str, ids: List, matrix: np.ndarray, payloads: List[Dict],
+               batch_size: int, parallel: int, wait: bool) -> int:
+        """
+        Writes the points; returns the number of batches sent.
+        """
+
+    @abstractmethod
+    def delete(self, name: str, ids: List, batch_size: int): ...
+
+    @abstractmethod
+    def set_payloads(self, name: str, payloads: Dict, batch_size: int):
+        """
+        Merges payload[id] into each point's payload; vectors are untouched.
+        """
+
+    @abstractmethod
+    def search(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]: ...
+
+    def forget_collection(self, name: str):
+        pass
+
+    def ensure_payload_indexes(self, name: str, profile: Dict):
+        pass
+
+    def migrate(self, name: str, profile: Dict):
+        pass
+
+
+class AsyncVectorBackend(ABC):
+    """
+    Searches for the async graph and server; get_async_vector_client
+    returns one, and `as_async_backend` wraps raw async clients.
+    """
+
+    @abstractmethod
+    async def asearch(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]: ...
+
+    @abstractmethod
+    async def asearch_batch(self, name: str, vectors: List, top_k: int,
+                            with_vectors: bool) -> List[List[Dict]]: ...
+
+
+class QdrantBackend(VectorBackend):
+    """
+    Sync QdrantClient: batched (optionally parallel) upserts, collection
+    profiles and cached existence checks.
+    """
+
+    def __init__(self, client: QdrantClient):
+        self.client = client
+
+    def collection_exists(self, name: str) -> bool:
+        if name in _ready_collections.get(self.client, {}):
+            return True
+        return self.client.collection_exists(name)
+
+    def ensure_collection(self, name: str, vector_size: int, distance: Distance = Distance.COSINE,
+                          profile: Dict = None):
+        known = _ready_collections.setdefault(self.client, {})
+
+        # Fast path: already checked by this client
+        if name in known:
+            if known[name] != vector_size:
+                raise ValueError(
+                    f"Collection '{name}' has vector size {known[name]}, got {vector_size}"
+                )
+            return
+
+        if not self.client.collection_exists(name):
+            profile = profile or get_collection_profile()
+            self.client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(
+                    size=vector_size,
+                    distance=distance,
+                    on_disk=profile.get("on_disk", False)
+                ),
+                hnsw_config=_hnsw_config(profile),
+                quantization_config=_quantization_config(profile)
+            )
+            self.ensure_payload_indexes(name, profile)
+            logger.info("Created Qdrant collection: %s (quantization=%s, on_disk=%s)",
+                        name, profile.get("quantization"), profile.get("on_disk"))
+        else:
+            existing = self.client.get_collection(name).config.params.vectors
+            existing_size = getattr(existing, "size", vector_size)
+            if existing_size != vector_size:
+                raise ValueError(
+                    f"Collection '{name}' has vector size {existing_size}, got {vector_size}"
+                )
+            logger.info("Qdrant collection already exists: %s", name)
+
+        known[name] = vector_size
+
+    def delete_collection(self, name: str):
+        if self.client.collection_exists(name):
+            self.client.delete_collection(name)
+        self.forget_collection(name)
+
+    def forget_collection(self, name: str):
+        _ready_collections.get(self.client, {}).pop(name, None)
+
+    def ensure_payload_indexes(self, name: str, profile: Dict):
+        if _is_local_mode(self.client):
+            return
+        for field, schema in profile.get("payload_indexes", {}).items():
+            self.client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=PayloadSchemaType(schema),
+                wait=True
+            )
+
+    def migrate(self, name: str, profile: Dict):
+        self.client.update_collection(
+            collection_name=name,
+            vectors_config={"": VectorParamsDiff(on_disk=profile.get("on_disk", False))},
+            hnsw_config=_hnsw_config(profile),
+            quantization_config=_quantization_config(profile) or Disabled.DISABLED,
+        )
+        self.ensure_payload_indexes(name, profile)
+        logger.info("Migrated Qdrant collection %s (quantization=%s, on_disk=%s)",
+                    name, profile.get("quantization"), profile.get("on_disk"))
+
+    def upsert(self, name: str, ids: List, matrix: np.ndarray, payloads: List[Dict],
+               batch_size: int, parallel: int, wait: bool) -> int:
+        if _is_local_mode(self.client):
+            # The in-process (":memory:" / path) client is not thread-safe
+            parallel = 1
+
+        spans = [(s, min(s + batch_size, len(ids))) for s in range(0, len(ids), batch_size)]
+
+        def send(span, wait_flag):
+            s, e = span
+            _send_batch(self.client, name, ids[s:e], matrix[s:e], payloads[s:e], wait_flag)
+
+        if spans:
+            head, last = spans[:-1], spans[-1]
+            if parallel <= 1 or len(spans) == 1:
+                for span in head:
+                    send(span, wait)
+            else:
+                with ThreadPoolExecutor(max_workers=parallel) as pool:
+                    list(pool.map(lambda span: send(span, wait), head))
+            # Last batch always waits when wait=False → barrier for everything before it
+            send(last, True)
+        return len(spans)
+
+    def delete(self, name: str, ids: List, batch_size: int):
+        for s in range(0, len(ids), batch_size):
+            self.client.delete(
+                collection_name=name,
+                points_selector=PointIdsList(points=ids[s:s + batch_size]),
+                wait=True
+            )
+
+    def set_payloads(self, name: str, payloads: Dict, batch_size: int):
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id]))
+            for point_id, payload in payloads.items()
+        ]
+        for s in range(0, len(operations), batch_size):
+            self.client.batch_update_points(
+                collection_name=name, update_operations=operations[s:s + batch_size], wait=True
+            )
+
+    def search(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]:
+        # New Qdrant API → client.query_points() (qdrant-client 1.16.1)
+        response = self.client.query_points(
+            collection_name=name,
+            query=[float(x) for x in vector],
+            limit=top_k,
+            search_params=search_params(),
+            with_vectors=with_vectors
+        )
+        return [_hit(p, with_vectors) for p in response.points]
+
+
+class AsyncQdrantBackend(AsyncVectorBackend):
+    """
+    AsyncQdrantClient for the async graph and server: searches only.
+    """
+
+    def __init__(self, client: AsyncQdrantClient):
+        self.client = client
+
+    async def asearch(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]:
+        response = await self.client.query_points(
+            collection_name=name,
+            query=[float(x) for x in vector],
+            limit=top_k,
+            search_params=search_params(),
+            with_vectors=with_vectors
+        )
+        return [_hit(p, with_vectors) for p in response.points]
+
+    async def asearch_batch(self, name: str, vectors: List, top_k: int,
+                            with_vectors: bool) -> List[List[Dict]]:
+        params = search_params()
+        responses = await self.client.query_batch_points(
+            collection_name=name,
+            requests=[
+                QueryRequest(query=[float(x) for x in vec], limit=top_k, params=params,
+                             with_payload=True, with_vector=with_vectors)
+                for vec in vectors
+            ]
+        )
+        return [[_hit(p, with_vectors) for p in r.points] for r in responses]
+
+
+class LocalBackend(VectorBackend, AsyncVectorBackend):
+    """
+    In-process LocalVectorIndex. Searches are CPU-only, so the async
+    variants run inline.
+    """
+
+    def __init__(self, index: LocalVectorIndex):
+        self.index = index
+
+    def collection_exists(self, name: str) -> bool:
+        return self.index.collection_exists(name)
+
+    def ensure_collection(self, name: str, vector_size: int, distance: Distance = Distance.COSINE,
+                          profile: Dict = None):
+        self.index.ensure_collection(name, vector_size)
+
+    def delete_collection(self, name: str):
+        self.index.delete_collection(name)
+
+    def upsert(self, name: str, ids: List, matrix: np.ndarray, payloads: List[Dict],
+               batch_size: int, parallel: int, wait: bool) -> int:
+        self.index.upsert(name, ids, matrix, payloads)
+        return 1
+
+    def delete(self, name: str, ids: List, batch_size: int):
+        self.index.delete(name, ids)
+
+    def set_payloads(self, name: str, payloads: Dict, batch_size: int):
+        self.index.set_payloads(name, payloads)
+
+    def search(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]:
+        return self.index.search(name, vector, top_k=top_k, with_vectors=with_vectors)
+
+    async def asearch(self, name: str, vector, top_k: int, with_vectors: bool) -> List[Dict]:
+        return self.search(name, vector, top_k, with_vectors)
+
+    async def asearch_batch(self, name: str, vectors: List, top_k: int,
+                            with_vectors: bool) -> List[List[Dict]]:
+        return [self.search(name, v, top_k, with_vectors) for v in vectors]
+
+
+def as_backend(client) -> VectorBackend:
+    """
+    Sync adapter for `client` (adapters are returned unchanged). Async
+    clients only search, so they are rejected here rather than failing on
+    the first write.
+    """
+    if isinstance(client, VectorBackend):
+        return client
+    if isinstance(client, LocalVectorIndex):
+        return LocalBackend(client)
+    if isinstance(client, (AsyncVectorBackend, AsyncQdrantClient, _InProcessAsyncClient)):
+        raise TypeError(f"{type(client).__name__} is async-only; use get_vector_client() here")
+    return QdrantBackend(client)
+
 
-    return QdrantClient(url=url, api_key=api_key)
+def as_async_backend(client) -> AsyncVectorBackend:
+    """
+    Async adapter for `client` (adapters are returned unchanged).
+    """
+    if isinstance(client, AsyncVectorBackend):
+        return client
+    if isinstance(client, LocalVectorIndex):
+        return LocalBackend(client)
+    if isinstance(client, (AsyncQdrantClient, _InProcessAsyncClient)):
+        return AsyncQdrantBackend(client)
+    raise TypeError(f"{type(client).__name__} has no async search; use get_async_vector_client()")
+
+
+def ensure_payload_indexes(client, collection_name: str, profile: Dict = None):
+    as_backend(client).ensure_payload_indexes(collection_name, profile or get_collection_profile())
+
+
+def migrate_collection(client, collection_name: str, profile: Dict = None):
+    """
+    Applies a profile to an existing collection in place: on-disk storage,
+    HNSW parameters and quantization are updated with `update_collection`
+    (Qdrant rebuilds the affected segments in the background, points are
+    kept), then missing payload indexes are created.
+    """
+    as_backend(client).migrate(collection_name, profile or get_collection_profile())
 
 
 # -------------------------------------
 # Create Collection
 # -------------------------------------
 def create_collection_if_not_exists(
-    client: QdrantClient,
+    client,
     collection_name: str,
     vector_size: int,
-    distance: Distance = Distance.COSINE
+    distance: Distance = Distance.COSINE,
+    profile: Dict = None
 ):
-    collections = client.get_collections().collections
-
-    if not any(c.name == collection_name for c in collections):
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=vector_size,
-                distance=distance
-            )
-        )
-        print(f"✅ Created Qdrant collection: {collection_name}")
-    else:
-        print(f"➡️ Qdrant collection already exists: {collection_name}")
+    as_backend(client).ensure_collection(collection_name, vector_size, distance, profile)
+
+
+def forget_collection(client, collection_name: str):
+    """
+    Drops the cached existence check, e.g. after deleting or recreating a collection.
+    """
+    as_backend(client).forget_collection(collection_name)
 
 
 # -------------------------------------
 # Upsert Documents
 # -------------------------------------
+@timed("external_call_seconds", service="vector_store", op="upsert")
 def upsert_documents(
-    client: QdrantClient,
+    client,
     collection_name: str,
-    vectors: List[List[float]],
+    vectors,
     metadatas: List[Dict],
-    ids: List[str]
-):
-    # Ensure vectors are valid
-    cleaned_vectors = [list(map(float, v)) for v in vectors]
-
-    points = [
-        PointStruct(
-            id=id_,
-            vector=cleaned_vectors[i],
-            payload=metadatas[i]
-        )
-        for i, id_ in enumerate(ids)
-    ]
+    ids: List[str],
+    batch_size: int = None,
+    parallel: int = None,
+    wait: bool = True
+) -> Dict[str, float]:
+    """
+    Upserts `vectors` (list of lists or a 2-D NumPy array) in batches.
+
+    - batch_size / parallel: points per request and concurrent requests
+      (defaults from QDRANT_UPSERT_BATCH / QDRANT_UPSERT_PARALLEL); the
+      in-process client always upserts serially.
+    - wait=False: batches are sent fire-and-forget; the final batch is then
+      sent with wait=True as a consistency barrier, since Qdrant applies
+      accepted updates in order.
+    Returns throughput stats.
+    """
+    batch_size = batch_size or int(os.getenv("QDRANT_UPSERT_BATCH", "256"))
+    parallel = parallel or int(os.getenv("QDRANT_UPSERT_PARALLEL", "4"))
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or len(matrix) != len(ids) or len(ids) != len(metadatas):
+        raise ValueError("vectors, metadatas and ids must have the same length")
+    metrics.set_gauge("payload_bytes", matrix.nbytes, kind="upsert_vectors")
+
+    started = time.perf_counter()
+    batches = as_backend(client).upsert(collection_name, list(ids), matrix, list(metadatas),
+                                        batch_size, parallel, wait)
+
+    seconds = time.perf_counter() - started
+    stats = {
+        "points": len(ids),
+        "batches": batches,
+        "seconds": seconds,
+        "points_per_sec": len(ids) / seconds if seconds > 0 else float("inf"),
+    }
+    logger.info("Upserted %d points into %s (%d batches, %.0f points/s)",
+                len(ids), collection_name, batches, stats["points_per_sec"])
+    return stats
+
 
-    client.upsert(collection_name=collection_name, points=points)
-    print(f"📌 Upserted {len(points)} points into {collection_name}")
+# -------------------------------------
+# Delete Points
+# -------------------------------------
+def collection_exists(client, collection_name: str) -> bool:
+    return as_backend(client).collection_exists(collection_name)
+
+
+@timed("external_call_seconds", service="vector_store", op="delete")
+def delete_points(client, collection_name: str, ids: List, batch_size: int = None) -> int:
+    """
+    Deletes points by id in batches; returns the number of ids sent.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    batch_size = batch_size or int(os.getenv("QDRANT_UPSERT_BATCH", "256"))
+    as_backend(client).delete(collection_name, ids, batch_size)
+    logger.info("Deleted %d points from %s", len(ids), collection_name)
+    return len(ids)
+
+
+@timed("external_call_seconds", service="vector_store", op="set_payload")
+def update_payloads(client, collection_name: str, payloads: Dict, batch_size: int = None) -> int:
+    """
+    Payload-only update: merges payloads[id] into each listed point (no
+    re-embedding or vector upload); returns the number of points updated.
+    """
+    if not payloads:
+        return 0
+    batch_size = batch_size or int(os.getenv("QDRANT_UPSERT_BATCH", "256"))
+    as_backend(client).set_payloads(collection_name, dict(payloads), batch_size)
+    return len(payloads)
 
 
 # -------------------------------------
 # Query Similar Vectors
-# Uses new Qdrant API → client.query_points()
 # -------------------------------------
+@timed("external_call_seconds", service="vector_store", op="query")
+def query_similar(client, collection_name, query_embedding, top_k=5, with_vectors=False):
+    """
+    With `with_vectors=True` each hit also carries its "vector" (for reranking).
+    """
+    return as_backend(client).search(collection_name, query_embedding, top_k, with_vectors)
 
-def query_similar(client, collection_name, query_embedding, top_k=5):
+
+@timed("external_call_seconds", service="vector_store", op="query")
+async def aquery_similar(client, collection_name, query_embedding, top_k=5, with_vectors=False):
     """
-    Correct for qdrant-client 1.16.1
+    Async `query_similar` for AsyncQdrantClient (or the local index).
     """
-    q_vec = [float(x) for x in query_embedding]
-    print(q_vec)
-    # Query the collection
-    response = client.query_points(
-        collection_name=collection_name,
-        query=q_vec,
-        limit=top_k
-    )
+    return await as_async_backend(client).asearch(collection_name, query_embedding, top_k, with_vectors)
+
+
+@timed("external_call_seconds", service="vector_store", op="query_batch")
+async def aquery_batch_similar(client, collection_name, query_embeddings, top_k=5,
+                               with_vectors=False) -> List[List[Dict]]:
+    """
+    Several searches in one `query_batch_points` request (AsyncQdrantClient
+    or the local index); one hit list per query.
+    """
+    query_embeddings = list(query_embeddings)
+    if not query_embeddings:
+        return []
+    return await as_async_backend(client).asearch_batch(collection_name, query_embeddings, top_k, with_vectors)
+
+
+def main(argv: List[str] = None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Apply a collection profile to an existing Qdrant collection.")
+    parser.add_argument("collection")
+    parser.add_argument("--profile", choices=sorted(COLLECTION_PROFILES), required=True)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    client = get_qdrant_client()
+    migrate_collection(client, args.collection, get_collection_profile(args.profile))
+    forget_collection(client, args.collection)
+
 
-    # Normalize results
-    results = []
-    for p in response.points:
-        results.append({
-            "id": p.id,
-            "score": p.score,
-            "payload": p.payload
-        })
-    return results
+if __name__ == "__main__":
+    main()
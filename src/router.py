@@ -0,0 +1,249 @@
+# src/router.py
+"""
+Intent router compiled once into a word-level trie.
+
+Each intent lists trigger phrases; the input is tokenized once and every
+phrase occurrence is found in a single pass, on whole words only (so "rain"
+no longer matches "Ukraine" or "train"). The highest-priority matched
+intent wins. Inputs that match several intents, or only "weak" triggers,
+are ambiguous and can be settled by cosine similarity to per-intent
+embedding centroids built from example questions.
+"""
+import os
+import re
+import asyncio
+import threading
+import numpy as np
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_END = ""  # trie key holding the phrases that end at a node
+
+DEFAULT_INTENTS: List[Dict] = [
+    {
+        "name": "greeting",
+        "priority": 30,
+        # Only when the message starts with it: "hi", "hello there", not "say hi to ..."
+        "anchored": True,
+        "phrases": ["hi", "hello", "hey", "good morning", "good evening", "good afternoon"],
+        "examples": ["hi", "hello there", "good morning"],
+    },
+    {
+        "name": "weather",
+        "priority": 20,
+        "phrases": ["weather", "forecast", "raining", "rainy", "sunny", "humid", "windy",
+                    "snowing", "umbrella"],
+        # Also common in document questions ("average temperature of the Deccan")
+        "weak_phrases": ["temperature", "rain", "humidity"],
+        "examples": [
+            "what is the weather in Mumbai",
+            "will it rain in Delhi today",
+            "current temperature in Chennai",
+            "is it sunny in Pune right now",
+            "weather forecast for Bangalore",
+        ],
+    },
+    {
+        "name": "pdf_rag",
+        "priority": 0,
+        "phrases": [],
+        "examples": [
+            "explain chapter 2 of the document",
+            "what are the major rivers of India",
+            "describe the climate zones mentioned in the report",
+            "summarize the section about agriculture",
+            "what is the average annual rainfall in Rajasthan",
+        ],
+    },
+]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+# -------------------------------------
+# Intent Router
+# -------------------------------------
+class IntentRouter:
+    """
+    router = IntentRouter(DEFAULT_INTENTS, default="pdf_rag")
+    router.route("will it rain in Pune?")          → "weather"
+    router.route_many([...])                        → ["weather", "pdf_rag", ...]
+
+    `embed_many_fn(texts) -> vectors` enables the embedding fallback for
+    ambiguous inputs; intent centroids are computed once from "examples".
+    `aroute` / `aroute_many` await `aembed_many_fn` when given, otherwise
+    run `embed_many_fn` in a worker thread.
+    """
+
+    def __init__(self, intents: Sequence[Dict] = DEFAULT_INTENTS, default: str = "pdf_rag",
+                 embed_many_fn: Callable[[List[str]], List[List[float]]] = None,
+                 aembed_many_fn: Callable[[List[str]], Awaitable[List[List[float]]]] = None):
+        self.intents = [dict(i) for i in intents]
+        self.default = default
+        self.embed_many_fn = embed_many_fn
+        self.aembed_many_fn = aembed_many_fn
+        self.priority = {i["name"]: i.get("priority", 0) for i in self.intents}
+        self._trie: Dict = {}
+        self._max_len = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_names: List[str] = []
+        self._lock = threading.Lock()
+
+        for intent in self.intents:
+            for phrase in intent.get("phrases", []):
+                self._add(phrase, intent, weak=False)
+            for phrase in intent.get("weak_phrases", []):
+                self._add(phrase, intent, weak=True)
+
+    def _add(self, phrase: str, intent: Dict, weak: bool):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, []).append((intent["name"], weak, bool(intent.get("anchored"))))
+        self._max_len = max(self._max_len, len(tokens))
+
+    def match(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        {intent: {"strong": n, "weak": n}} for every whole-word phrase occurrence.
+        """
+        tokens = tokenize(text)
+        found: Dict[str, Dict[str, int]] = {}
+        trie = self._trie
+        for start in range(len(tokens)):
+            node = trie
+            for token in tokens[start:start + self._max_len]:
+                node = node.get(token)
+                if node is None:
+                    break
+                for name, weak, anchored in node.get(_END, ()):
+                    if anchored and start != 0:
+                        continue
+                    counts = found.setdefault(name, {"strong": 0, "weak": 0})
+                    counts["weak" if weak else "strong"] += 1
+        return found
+
+    def classify(self, text: str) -> Dict:
+        """
+        Lexical decision: {"intent", "matched", "ambiguous"}.
+        """
+        matched = self.match(text)
+        if not matched:
+            return {"intent": self.default, "matched": {}, "ambiguous": False}
+
+        ranked = sorted(matched, key=lambda n: (matched[n]["strong"] > 0, self.priority.get(n, 0)),
+                        reverse=True)
+        best = ranked[0]
+        strong = [n for n in matched if matched[n]["strong"]]
+        ambiguous = len(strong) > 1 or not strong
+        return {"intent": best, "matched": matched, "ambiguous": ambiguous}
+
+    # -------------------------------------
+    # Embedding fallback
+    # -------------------------------------
+    def _ensure_centroids(self):
+        with self._lock:
+            if self._centroids is not None:
+                return
+            spans, examples = [], []
+            for intent in self.intents:
+                intent_examples = list(intent.get("examples") or [])
+                if intent_examples:
+                    spans.append((intent["name"], len(examples), len(examples) + len(intent_examples)))
+                    examples.extend(intent_examples)
+
+            # Every intent's examples in one embedding call, sliced per intent
+            names, rows = [], []
+            vecs = np.asarray(self.embed_many_fn(examples), dtype=np.float32) if examples else None
+            for name, start, end in spans:
+                centroid = vecs[start:end].mean(axis=0)
+                rows.append(centroid / (np.linalg.norm(centroid) or 1.0))
+                names.append(name)
+            self._centroid_names = names
+            self._centroids = np.stack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+    def _pending(self, decisions: List[Dict]) -> List[int]:
+        if self.embed_many_fn is None:
+            return []
+        return [i for i, d in enumerate(decisions) if d["ambiguous"]]
+
+    def _settle(self, decisions: List[Dict], pending: List[int], vectors):
+        vecs = np.asarray(vectors, dtype=np.float32)
+        vecs /= np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+        sims = vecs @ self._centroids.T
+        for row, i in enumerate(pending):
+            # Only intents the text triggered (or the default) are candidates
+            allowed = set(decisions[i]["matched"]) | {self.default}
+            order = np.argsort(-sims[row])
+            for j in order:
+                name = self._centroid_names[j]
+                if name in allowed:
+                    decisions[i]["intent"] = name
+                    break
+
+    def _resolve(self, decisions: List[Dict], texts: List[str]) -> List[str]:
+        pending = self._pending(decisions)
+        if pending:
+            self._ensure_centroids()
+            if len(self._centroid_names):
+                # One embedding call for every ambiguous input in the batch
+                self._settle(decisions, pending, self.embed_many_fn([texts[i] for i in pending]))
+        return [d["intent"] for d in decisions]
+
+    async def _aresolve(self, decisions: List[Dict], texts: List[str]) -> List[str]:
+        pending = self._pending(decisions)
+        if pending:
+            # Centroids are embedded once, off the event loop
+            await asyncio.to_thread(self._ensure_centroids)
+            if len(self._centroid_names):
+                inputs = [texts[i] for i in pending]
+                if self.aembed_many_fn is not None:
+                    vectors = await self.aembed_many_fn(inputs)
+                else:
+                    vectors = await asyncio.to_thread(self.embed_many_fn, inputs)
+                self._settle(decisions, pending, vectors)
+        return [d["intent"] for d in decisions]
+
+    def route(self, text: str) -> str:
+        return self.route_many([text])[0]
+
+    def route_many(self, texts: Sequence[str]) -> List[str]:
+        texts = list(texts)
+        return self._resolve([self.classify(t) for t in texts], texts)
+
+    async def aroute(self, text: str) -> str:
+        """
+        `route` for async callers: the embedding fallback does not block the loop.
+        """
+        return (await self.aroute_many([text]))[0]
+
+    async def aroute_many(self, texts: Sequence[str]) -> List[str]:
+        texts = list(texts)
+        return await self._aresolve([self.classify(t) for t in texts], texts)
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> IntentRouter:
+    """
+    Shared router over DEFAULT_INTENTS. ROUTER_EMBEDDING_FALLBACK=1 settles
+    ambiguous inputs with the shared embedding client.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            embed_many_fn = aembed_many_fn = None
+            if os.getenv("ROUTER_EMBEDDING_FALLBACK", "0").lower() in ("1", "true", "yes"):
+                from pdf_rag import get_embeddings
+                embed_many_fn = get_embeddings().embed_documents
+                aembed_many_fn = get_embeddings().aembed_documents
+            _router = IntentRouter(DEFAULT_INTENTS, default="pdf_rag", embed_many_fn=embed_many_fn,
+                                   aembed_many_fn=aembed_many_fn)
+        return _router
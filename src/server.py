@@ -0,0 +1,204 @@
+# src/server.py
+"""
+Lightweight asyncio HTTP server for the async LangGraph pipeline.
+
+    POST /ask      {"input": "..."}  →  {"action", "summary", "raw"}
+    GET  /healthz                    →  {"status": "ok", "inflight", "waiting"}
+    GET  /metrics                    →  Prometheus text (?format=json for a JSON snapshot)
+
+All requests share one event loop. At most `max_inflight` questions run at
+once, up to `max_queue` more wait for a slot, and anything beyond that is
+rejected with 503 (backpressure). Each question has a per-request timeout (504).
+
+Usage:
+    python src/server.py --port 8080 --max-inflight 200 --max-queue 800 --timeout 60
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from typing import Dict, Tuple, Union
+from metrics import configure_logging, metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class AskServer:
+    def __init__(self, graph, max_inflight: int = 200, max_queue: int = 800,
+                 timeout: float = 60.0):
+        self.graph = graph
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_inflight)
+        self.inflight = 0
+        self.waiting = 0
+
+    # -------------------------------------
+    # Request handling
+    # -------------------------------------
+    async def ask(self, payload: Dict) -> Tuple[int, Dict]:
+        user_input = payload.get("input") if isinstance(payload, dict) else None
+        if not isinstance(user_input, str) or not user_input.strip():
+            return 400, {"error": "Body must be JSON with a non-empty 'input' string"}
+
+        if self.inflight + self.waiting >= self.max_inflight + self.max_queue:
+            return 503, {"error": "Server busy, retry later"}
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.inflight += 1
+        metrics.set_gauge("server_inflight", self.inflight)
+        started = asyncio.get_running_loop().time()
+        try:
+            result = await asyncio.wait_for(
+                self.graph.ainvoke({"user_input": user_input}), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            return 504, {"error": f"Timed out after {self.timeout}s"}
+        except Exception as e:
+            logger.exception("Pipeline failed for /ask")
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.inflight -= 1
+            self._slots.release()
+            metrics.set_gauge("server_inflight", self.inflight)
+            metrics.observe("server_request_seconds", asyncio.get_running_loop().time() - started)
+
+        return 200, {
+            "action": result.get("action"),
+            "summary": result.get("summary"),
+            "raw": result.get("raw"),
+        }
+
+    async def route(self, method: str, path: str, body: bytes,
+                    query: str = "") -> Tuple[int, Union[Dict, str]]:
+        if path == "/healthz":
+            return 200, {"status": "ok", "inflight": self.inflight, "waiting": self.waiting}
+
+        if path == "/metrics":
+            if "format=json" in query:
+                return 200, metrics.snapshot()
+            return 200, metrics.render_prometheus()
+
+        if path != "/ask":
+            return 404, {"error": "Not found"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "Invalid JSON"}
+        return await self.ask(payload)
+
+    # -------------------------------------
+    # Minimal HTTP/1.1 with keep-alive
+    # -------------------------------------
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.upper() == "HTTP/1.1"
+                )
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                path, _, query = target.partition("?")
+                status, response = await self.route(method.upper(), path, body, query)
+                if path == "/ask":
+                    metrics.inc("server_responses_total", status=status)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str],
+                       keep_alive: bool):
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=str).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+
+async def serve(host: str, port: int, max_inflight: int, max_queue: int, timeout: float):
+    from graph import build_async_pipeline_graph
+
+    graph = build_async_pipeline_graph(openweather_key=os.getenv("OPENWEATHER_API_KEY"))
+    app = AskServer(graph, max_inflight=max_inflight, max_queue=max_queue, timeout=timeout)
+    server = await app.start(host, port)
+    logger.info("Serving on http://%s:%d (max_inflight=%d, max_queue=%d)", host, port, max_inflight, max_queue)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the async pipeline over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-inflight", type=int, default=200)
+    parser.add_argument("--max-queue", type=int, default=800)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+    configure_logging()
+    asyncio.run(serve(args.host, args.port, args.max_inflight, args.max_queue, args.timeout))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
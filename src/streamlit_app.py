@@ -4,15 +4,17 @@ import time
 import streamlit as st
 from dotenv import load_dotenv
 
-from graph import build_pipeline_graph
+from graph import build_pipeline_graph, stream_pipeline
 from pdf_rag import build_embeddings_and_upsert
-from evaluations import greeting_eval, guardrail_eval, correctness_eval
+from eval_worker import get_eval_pool
+from metrics import configure_logging, metrics
 
 import langsmith as ls
 from langsmith import Client
 
 # ------------------- Load .env and Setup LangSmith -------------------
 load_dotenv()
+configure_logging()
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
@@ -24,16 +26,8 @@ else:
 
 ls_client = Client() if LS_API_KEY else None
 
-# ------------------- Wrapper Classes -------------------
-class ExampleWrapper:
-    def __init__(self, inputs, expected=None):
-        self.inputs = inputs
-        self.expected = expected
-
-
-class RunWrapper:
-    def __init__(self, outputs):
-        self.outputs = outputs
+# Evaluations run on background workers; scores reach LangSmith when ready
+eval_pool = get_eval_pool(feedback_client=ls_client)
 
 # ------------------- Streamlit Page Setup -------------------
 st.set_page_config(page_title="Weather + PDF RAG (LangGraph)", layout="wide")
@@ -83,6 +77,10 @@ if "pdf_uploaded" not in st.session_state:
 if "allow_question" not in st.session_state:
     st.session_state.allow_question = True
 
+# ------------------- Metrics (no LangSmith needed) -------------------
+with st.sidebar.expander("Pipeline metrics"):
+    st.json(metrics.snapshot())
+
 # ------------------- Reset -------------------
 if st.button("Reset Conversation"):
     st.session_state.history = []
@@ -102,7 +100,15 @@ if not st.session_state.pdf_uploaded:
     uploaded = st.file_uploader("Choose a PDF", type=["pdf"])
 
 if uploaded and not st.session_state.pdf_uploaded:
-    count = build_embeddings_and_upsert(uploaded)
+    status = st.empty()
+
+    def show_progress(stage, counters):
+        status.caption(
+            f"Pages: {counters['pages']} · Chunks: {counters['chunks']} · "
+            f"Embedded: {counters['embedded']} · Upserted: {counters['upserted']}"
+        )
+
+    count = build_embeddings_and_upsert(uploaded, streaming=True, on_progress=show_progress)
     st.success(f"PDF embedded successfully ({count} chunks)")
     st.session_state.pdf_uploaded = True
     time.sleep(1)
@@ -118,57 +124,52 @@ else:
 
 if st.session_state.allow_question and st.button("Send") and user_input.strip():
 
-    with st.spinner("Thinking..."):
-
-        invoke_fn = st.session_state.graph.invoke
-
-        if LS_API_KEY:
-            invoke_fn = ls.traceable(
-                run_type="chain",
-                name="LangGraph Pipeline"
-            )(invoke_fn)
+    # ------------------- Stream tokens into the bot bubble -------------------
+    bubble = st.empty()
+    bubble.markdown("<div class='bot-bubble'><b>Bot:</b> Thinking...</div>", unsafe_allow_html=True)
+    streamed = ""
+    result, run_metrics = {}, {}
+
+    # 🔥 CAPTURE RUN ID
+    with ls.trace(name="Graph Run", run_type="chain", inputs={"user_input": user_input}) as run_ctx:
+        for event in stream_pipeline(st.session_state.graph, {"user_input": user_input}):
+            if event["type"] == "token":
+                streamed += event["text"]
+                bubble.markdown(
+                    f"<div class='bot-bubble'><b>Bot:</b> {streamed}▌</div>",
+                    unsafe_allow_html=True
+                )
+            else:
+                result, run_metrics = event["state"], event["metrics"]
+        run_ctx.end(outputs={"summary": result.get("summary"), **run_metrics})
+        run_id = run_ctx.id if LS_API_KEY else None
+
+    bubble.markdown(
+        f"<div class='bot-bubble'><b>Bot:</b> {result.get('summary')}</div>",
+        unsafe_allow_html=True
+    )
 
-        # 🔥 CAPTURE RUN ID
-        with ls.trace(name="Graph Run", run_type="chain") as run_ctx:
-            result = invoke_fn({"user_input": user_input})
-            run_id = run_ctx.id if LS_API_KEY else None
+    # Time-to-first-token is the latency users actually see
+    if ls_client and run_id:
+        ls_client.create_feedback(run_id=run_id, key="ttft_seconds", score=run_metrics["ttft_s"])
 
-        # ------------------- Wrap -------------------
-        example = ExampleWrapper(
-            inputs={"input": user_input},
-            expected={"output": result.get("summary")}
-        )
+    # ------------------- Queue Evaluations (non-blocking) -------------------
+    eval_job = eval_pool.submit(
+        run_id,
+        inputs={"input": user_input},
+        outputs=result,
+        expected={"output": result.get("summary")}
+    )
 
-        run_wrapper = RunWrapper(outputs=result)
-
-        # ------------------- Evaluations -------------------
-        eval_results = {}
-        evaluators = [greeting_eval, guardrail_eval, correctness_eval]
-
-        for evaluator in evaluators:
-            try:
-                score = evaluator(run_wrapper, example)
-                eval_results[evaluator.__name__] = score
-
-                # 🔥 LOG TO LANGSMITH
-                if ls_client and run_id:
-                    ls_client.create_feedback(
-                        run_id=run_id,
-                        key=evaluator.__name__,
-                        score=1 if score else 0
-                    )
-
-            except Exception as e:
-                eval_results[evaluator.__name__] = f"Error: {e}"
-
-        # ------------------- Save History -------------------
-        st.session_state.history.append({
-            "input": user_input,
-            "output": result.get("summary"),
-            "action": result.get("action"),
-            "raw": result.get("raw"),
-            "evaluation": eval_results
-        })
+    # ------------------- Save History -------------------
+    st.session_state.history.append({
+        "input": user_input,
+        "output": result.get("summary"),
+        "action": result.get("action"),
+        "raw": result.get("raw"),
+        "eval_job": eval_job,
+        "metrics": run_metrics
+    })
 
     st.session_state.allow_question = False
     st.rerun()
@@ -179,18 +180,45 @@ if not st.session_state.allow_question:
         st.rerun()
 
 # ------------------- Render Chat -------------------
-for chat in reversed(st.session_state.history):
+def render_bot_bubble(chat):
+    scores = chat.get("evaluation")
+    if scores is None:
+        job = eval_pool.result(chat["eval_job"]) or {"status": "done", "scores": {}}
+        if job["status"] != "pending":
+            # Copy finished scores into history so they survive pool eviction,
+            # then rerun once so this bubble stops polling
+            chat["evaluation"] = job["scores"]
+            st.rerun()
+        scores = job["scores"]
+
+    eval_text = "<br><small>✅ Evaluations: " + ", ".join(
+        f"{k}={v}" for k, v in scores.items()
+    )
+    if chat.get("evaluation") is None:
+        eval_text += (", " if scores else "") + "⏳ evaluating..."
+    eval_text += "</small>"
+
+    if chat.get("metrics"):
+        eval_text += (
+            f"<br><small>⏱ First token: {chat['metrics']['ttft_s']:.2f}s · "
+            f"Total: {chat['metrics']['total_s']:.2f}s</small>"
+        )
 
     st.markdown(
-        f"<div class='user-bubble'><b>You:</b> {chat['input']}</div>",
+        f"<div class='bot-bubble'><b>Bot:</b> {chat['output']}{eval_text}</div>",
         unsafe_allow_html=True
     )
 
-    eval_text = "<br><small>✅ Evaluations: " + ", ".join(
-        f"{k}={v}" for k, v in chat["evaluation"].items()
-    ) + "</small>"
+
+for chat in reversed(st.session_state.history):
 
     st.markdown(
-        f"<div class='bot-bubble'><b>Bot:</b> {chat['output']}{eval_text}</div>",
+        f"<div class='user-bubble'><b>You:</b> {chat['input']}</div>",
         unsafe_allow_html=True
     )
+
+    if chat.get("evaluation") is None:
+        # Re-render only this bubble every 2s until its evaluations finish
+        st.fragment(render_bot_bubble, run_every="2s")(chat)
+    else:
+        render_bot_bubble(chat)
@@ -0,0 +1,45 @@
+# src/token_utils.py
+import os
+import logging
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_loaded = False
+_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    Loads the tiktoken encoding once. Returns None when tiktoken is missing,
+    TOKEN_ENCODING is empty, or the BPE file cannot be fetched (offline).
+    """
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    with _lock:
+        if not _encoding_loaded:
+            name = os.getenv("TOKEN_ENCODING", "cl100k_base")
+            if tiktoken is not None and name:
+                try:
+                    _encoding = tiktoken.get_encoding(name)
+                except Exception as e:
+                    logger.warning("tiktoken encoding '%s' unavailable, estimating tokens (%s)", name, type(e).__name__)
+            _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count for `text`; falls back to ~4 characters per token.
+    """
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
@@ -1,24 +1,300 @@
 # src/weather.py
 import os
-import requests
-from typing import Dict
+import asyncio
+import logging
+import threading
+import weakref
+import httpx
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple, Union
+from cache_utils import TTLCache
+from async_utils import run_sync
+from metrics import metrics, timed
 
-OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+logger = logging.getLogger(__name__)
 
-def fetch_weather(city: str, api_key: str = None) -> Dict:
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+
+def normalize_city(city: str) -> str:
+    """
+    Canonical cache key for a city: lowercase, single-spaced, no trailing punctuation.
+    """
+    return " ".join(city.strip().strip("?,.!").lower().split())
+
+
+def location_query(location: Union[str, Dict]) -> Tuple[str, Dict]:
+    """
+    (cache key, query params) for a city name or a gazetteer place dict.
+    Places are queried by coordinates and cached by id, so every spelling
+    and alias of a city shares one cache entry.
+    """
+    if isinstance(location, dict):
+        return f"id:{location['id']}", {"lat": location["lat"], "lon": location["lon"]}
+    return normalize_city(location), {"q": location}
+
+
+# -------------------------------------
+# Weather Cache
+# -------------------------------------
+class WeatherCache:
     """
-    Fetch current weather for `city` from OpenWeatherMap.
-    Returns the JSON response (dict).
+    TTL + LRU cache for OpenWeatherMap responses keyed by (location, units).
+
+    With `stale_while_revalidate` enabled, an expired entry is returned
+    immediately and refreshed on a background thread.
+    """
+
+    def __init__(self, ttl: float = 600.0, maxsize: int = 256,
+                 stale_while_revalidate: bool = False, stale_ttl: float = 3600.0):
+        self.stale_while_revalidate = stale_while_revalidate
+        self._cache = TTLCache(
+            maxsize=maxsize,
+            ttl=ttl,
+            stale_ttl=stale_ttl if stale_while_revalidate else 0.0
+        )
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(city: Union[str, Dict], units: str) -> Tuple[str, str]:
+        return location_query(city)[0], units
+
+    def get_or_fetch(self, city: str, units: str, fetch: Callable[[], Dict]) -> Dict:
+        key = self.key(city, units)
+        value, fresh = self._cache.lookup(key, allow_stale=self.stale_while_revalidate)
+
+        if fresh:
+            metrics.inc("cache_requests_total", cache="weather", result="hit")
+            return value
+
+        if value is not None:
+            # Stale hit → serve it now, refresh in the background
+            metrics.inc("cache_requests_total", cache="weather", result="stale")
+            self._refresh_in_background(key, fetch)
+            return value
+
+        metrics.inc("cache_requests_total", cache="weather", result="miss")
+        value = fetch()
+        self._cache.set(key, value)
+        return value
+
+    async def aget_or_fetch(self, city: str, units: str,
+                            fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        key = self.key(city, units)
+        value, fresh = self._cache.lookup(key, allow_stale=self.stale_while_revalidate)
+
+        if fresh:
+            metrics.inc("cache_requests_total", cache="weather", result="hit")
+            return value
+
+        if value is not None:
+            metrics.inc("cache_requests_total", cache="weather", result="stale")
+            self._arefresh_in_background(key, fetch)
+            return value
+
+        metrics.inc("cache_requests_total", cache="weather", result="miss")
+        value = await fetch()
+        self._cache.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, fetch: Callable[[], Dict]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run():
+            try:
+                self._cache.set(key, fetch())
+            except Exception as e:
+                logger.warning("Background weather refresh failed for %s: %s", key[0], e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name="weather-refresh", daemon=True).start()
+
+    def _arefresh_in_background(self, key, fetch: Callable[[], Awaitable[Dict]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def _run():
+            try:
+                self._cache.set(key, await fetch())
+            except Exception as e:
+                logger.warning("Background weather refresh failed for %s: %s", key[0], e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        asyncio.ensure_future(_run())
+
+    def set(self, city: str, units: str, value: Dict):
+        self._cache.set(self.key(city, units), value)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
+
+
+weather_cache = WeatherCache(
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+    maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "256")),
+    stale_while_revalidate=os.getenv("WEATHER_CACHE_SWR", "0").lower() in ("1", "true", "yes"),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+)
+
+
+# -------------------------------------
+# Async Weather Client
+# -------------------------------------
+class AsyncWeatherClient:
+    """
+    Async OpenWeatherMap client with a persistent keep-alive connection pool
+    and bounded request concurrency.
+
+    One httpx.AsyncClient is kept per event loop, so the client can be used
+    both from the shared background loop (sync facade) and from async graphs.
+    """
+
+    def __init__(self, base_url: str = OPENWEATHER_URL, api_key: str = None,
+                 max_connections: int = 20, max_concurrency: int = 10,
+                 timeout: float = 10.0, cache: WeatherCache = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self._per_loop = weakref.WeakKeyDictionary()
+
+    def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        session = self._per_loop.get(loop)
+        if session is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            session = (client, asyncio.Semaphore(self.max_concurrency))
+            self._per_loop[loop] = session
+        return session
+
+    def _resolve_key(self, api_key: str = None) -> str:
+        api_key = api_key or self.api_key or os.getenv("OPENWEATHER_API_KEY")
+        if not api_key:
+            raise ValueError("OpenWeatherMap API key not provided")
+        return api_key
+
+    async def _request(self, city: Union[str, Dict], api_key: str, units: str) -> Dict:
+        client, semaphore = self._session()
+        params = {**location_query(city)[1], "appid": api_key, "units": units}
+        async with semaphore:
+            with timed("external_call_seconds", service="openweather", op="current"):
+                resp = await client.get(self.base_url, params=params)
+                resp.raise_for_status()
+        metrics.set_gauge("payload_bytes", len(resp.content), kind="weather_response")
+        return resp.json()
+
+    async def fetch(self, city: Union[str, Dict], api_key: str = None, units: str = "metric",
+                    use_cache: bool = True) -> Dict:
+        api_key = self._resolve_key(api_key)
+        if self.cache is None or not use_cache:
+            return await self._request(city, api_key, units)
+        return await self.cache.aget_or_fetch(
+            city, units, lambda: self._request(city, api_key, units)
+        )
+
+    async def fetch_many(self, cities: Iterable[Union[str, Dict]], api_key: str = None,
+                         units: str = "metric", use_cache: bool = True,
+                         return_exceptions: bool = False) -> List:
+        """
+        Fetch several cities concurrently. Results keep the input order;
+        repeated cities (after normalization) are requested once.
+        """
+        cities = list(cities)
+        api_key = self._resolve_key(api_key)
+
+        unique = {}
+        for city in cities:
+            unique.setdefault(location_query(city)[0], city)
+
+        results = await asyncio.gather(
+            *(self.fetch(c, api_key=api_key, units=units, use_cache=use_cache)
+              for c in unique.values()),
+            return_exceptions=return_exceptions
+        )
+        by_key = dict(zip(unique.keys(), results))
+        return [by_key[location_query(c)[0]] for c in cities]
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        session = self._per_loop.pop(loop, None)
+        if session is not None:
+            await session[0].aclose()
+
+
+weather_client = AsyncWeatherClient(
+    max_connections=int(os.getenv("WEATHER_MAX_CONNECTIONS", "20")),
+    max_concurrency=int(os.getenv("WEATHER_MAX_CONCURRENCY", "10")),
+    cache=weather_cache,
+)
+
+
+# -------------------------------------
+# Sync facade
+# -------------------------------------
+def fetch_weather(city: Union[str, Dict], api_key: str = None, units: str = "metric",
+                  use_cache: bool = True) -> Dict:
+    """
+    Fetch current weather for `city` (a name or a gazetteer place) from OpenWeatherMap.
+    Returns the JSON response (dict), served from `weather_cache` when fresh.
     """
     if api_key is None:
         api_key = os.getenv("OPENWEATHER_API_KEY")
     if not api_key:
         raise ValueError("OpenWeatherMap API key not provided")
 
-    params = {"q": city, "appid": api_key, "units": "metric"}
-    resp = requests.get(OPENWEATHER_URL, params=params, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+    return run_sync(weather_client.fetch(city, api_key=api_key, units=units,
+                                         use_cache=use_cache))
+
+
+def fetch_weather_many(cities: Iterable[Union[str, Dict]], api_key: str = None,
+                       units: str = "metric", use_cache: bool = True,
+                       return_exceptions: bool = False) -> List:
+    """
+    Fetch current weather for several cities in one parallel round trip.
+    Returns a list of JSON responses in the same order as `cities`.
+    """
+    return run_sync(weather_client.fetch_many(
+        cities, api_key=api_key, units=units, use_cache=use_cache,
+        return_exceptions=return_exceptions
+    ))
+
+
+async def afetch_weather(city: Union[str, Dict], api_key: str = None, units: str = "metric",
+                         use_cache: bool = True) -> Dict:
+    """
+    Async `fetch_weather` for callers already running on an event loop.
+    """
+    return await weather_client.fetch(city, api_key=api_key, units=units, use_cache=use_cache)
+
+
+async def afetch_weather_many(cities: Iterable[Union[str, Dict]], api_key: str = None,
+                              units: str = "metric", use_cache: bool = True,
+                              return_exceptions: bool = False) -> List:
+    return await weather_client.fetch_many(
+        cities, api_key=api_key, units=units, use_cache=use_cache,
+        return_exceptions=return_exceptions
+    )
+
 
 def format_weather_summary(weather_json: Dict) -> str:
     """
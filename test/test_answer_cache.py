@@ -0,0 +1,44 @@
+# tests/test_answer_cache.py
+from answer_cache import SemanticAnswerCache
+
+def test_similar_query_hits_and_dissimilar_misses():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.store([1.0, 0.0, 0.0], "Delhi is the capital.", ["id-1"], "docs", ["ctx"])
+
+    hit, _ = cache.lookup([0.99, 0.05, 0.0], "docs")
+    assert hit["answer"] == "Delhi is the capital."
+    assert hit["chunk_ids"] == ["id-1"]
+    assert cache.lookup([0.0, 1.0, 0.0], "docs")[0] is None
+    assert cache.lookup([1.0, 0.0, 0.0], "other-collection")[0] is None
+
+def test_reingest_invalidates_and_ttl_expires():
+    now = [0.0]
+    cache = SemanticAnswerCache(threshold=0.9, ttl=10, clock=lambda: now[0])
+    cache.store([1.0, 0.0], "old", [], "docs")
+    cache.invalidate_collection("docs")
+    assert cache.lookup([1.0, 0.0], "docs")[0] is None
+
+    cache.store([1.0, 0.0], "new", [], "docs")
+    assert cache.lookup([1.0, 0.0], "docs")[0]["answer"] == "new"
+    now[0] = 11
+    assert cache.lookup([1.0, 0.0], "docs")[0] is None
+
+def test_lru_eviction():
+    cache = SemanticAnswerCache(threshold=0.99, maxsize=2)
+    cache.store([1.0, 0.0, 0.0], "a", [], "docs")
+    cache.store([0.0, 1.0, 0.0], "b", [], "docs")
+    cache.lookup([1.0, 0.0, 0.0], "docs")          # touch "a"
+    cache.store([0.0, 0.0, 1.0], "c", [], "docs")  # evicts "b"
+    assert cache.lookup([0.0, 1.0, 0.0], "docs")[0] is None
+    assert cache.lookup([1.0, 0.0, 0.0], "docs")[0]["answer"] == "a"
+
+def test_answer_from_before_reingest_is_not_stored():
+    cache = SemanticAnswerCache(threshold=0.9)
+    _, generation = cache.lookup([1.0, 0.0], "docs")
+    cache.invalidate_collection("docs")  # re-ingested while the LLM was answering
+    cache.store([1.0, 0.0], "stale", [], "docs", generation=generation)
+    assert cache.lookup([1.0, 0.0], "docs")[0] is None
+
+    _, generation = cache.lookup([1.0, 0.0], "docs")
+    cache.store([1.0, 0.0], "fresh", [], "docs", generation=generation)
+    assert cache.lookup([1.0, 0.0], "docs")[0]["answer"] == "fresh"
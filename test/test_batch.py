@@ -0,0 +1,98 @@
+import batch
+import docstore
+import ingest_manifest
+import pdf_rag
+from docstore import ChunkStore
+from ingest_manifest import IngestManifest
+from local_index import LocalVectorIndex
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def aembed_documents(self, docs):
+        self.calls.append(list(docs))
+        return [[1.0, 0.0] if "river" in d else [0.0, 1.0] for d in docs]
+
+
+def _local_collection(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setenv("RAG_RETRIEVAL_MODE", "dense")
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "0")
+    monkeypatch.setattr(docstore, "_docstore", ChunkStore(str(tmp_path / "docstore.sqlite")))
+    monkeypatch.setattr(ingest_manifest, "_manifest", IngestManifest(str(tmp_path / "manifest.sqlite")))
+    monkeypatch.setattr(pdf_rag, "COLLECTION_NAME", "docs_batch")
+    monkeypatch.setattr(batch, "COLLECTION_NAME", "docs_batch")
+
+    qclient = LocalVectorIndex(str(tmp_path / "vectors"))
+    qclient.ensure_collection("docs_batch", 2)
+    pdf_rag.upsert_chunks(qclient, ["rivers of the north", "deserts of the west"],
+                          [[1.0, 0.0], [0.0, 1.0]], "geo.pdf", ids=["p1", "p2"])
+    monkeypatch.setattr(pdf_rag, "get_async_vector_client", lambda: qclient)
+
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(pdf_rag, "_embeddings", embeddings)
+    return embeddings
+
+
+def test_answer_batch_embeds_and_searches_once(tmp_path, monkeypatch):
+    embeddings = _local_collection(tmp_path, monkeypatch)
+
+    searches = []
+    real_search = pdf_rag.aquery_batch_similar
+
+    async def counting_search(client, collection, vectors, **kwargs):
+        searches.append(len(vectors))
+        return await real_search(client, collection, vectors, **kwargs)
+    monkeypatch.setattr(pdf_rag, "aquery_batch_similar", counting_search)
+
+    async def fake_llm(prompt):
+        if "broken" in prompt:
+            raise RuntimeError("llm down")
+        return "north" if "rivers of the north" in prompt else "west"
+    monkeypatch.setattr(batch, "asummarize_with_llm", fake_llm)
+
+    async def fake_weather(state, openweather_key=None):
+        return {"raw": {"temp": 30}, "summary": "sunny"}
+    monkeypatch.setattr(batch, "aweather_node", fake_weather)
+
+    questions = ["Which river flows north?", "hello", "What is the weather in Pune?",
+                 "Where is the desert?", "Explain the broken pump"]
+    results = batch.answer_batch(questions, top_k=1)
+
+    assert [r["input"] for r in results] == questions
+    assert [r["action"] for r in results] == ["pdf_rag", "greeting", "weather", "pdf_rag", "pdf_rag"]
+    assert embeddings.calls == [[questions[0], questions[3], questions[4]]]
+    assert searches == [3]
+
+    assert results[0]["summary"] == "north" and results[0]["raw"] == ["rivers of the north"]
+    assert results[3]["summary"] == "west"
+    assert results[1]["summary"] and results[1]["error"] is None
+    assert results[2]["summary"] == "sunny"
+    assert results[4]["summary"] is None and results[4]["error"] == "RuntimeError: llm down"
+
+
+def test_each_answer_is_stored_with_its_own_lookup_generation(tmp_path, monkeypatch):
+    _local_collection(tmp_path, monkeypatch)
+
+    class RecordingCache:
+        def __init__(self):
+            self.lookups, self.stored = 0, {}
+
+        def lookup(self, vector, collection):
+            # A re-ingest lands between the two lookups
+            self.lookups += 1
+            return None, self.lookups
+
+        def store(self, vector, answer, chunk_ids, collection, contexts=None, generation=None):
+            self.stored[answer] = generation
+    cache = RecordingCache()
+    monkeypatch.setattr(batch, "get_answer_cache", lambda: cache)
+
+    async def fake_llm(prompt):
+        return "north" if "rivers of the north" in prompt else "west"
+    monkeypatch.setattr(batch, "asummarize_with_llm", fake_llm)
+
+    batch.answer_batch(["Which river flows north?", "Where is the desert?"], top_k=1)
+    assert cache.stored == {"north": 1, "west": 2}
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from fakes import FakeServices  # noqa: E402
+from bench_pipeline import compare, summarize  # noqa: E402
+
+
+def test_fake_azure_and_weather_endpoints():
+    from openai import AzureOpenAI
+    from weather import AsyncWeatherClient
+    from async_utils import run_sync
+
+    with FakeServices(latency={"weather": 0, "embeddings": 0, "chat": 0}, dim=8) as fakes:
+        client = AzureOpenAI(azure_endpoint=fakes.url, api_key="x", api_version="2024-02-01")
+        first = client.embeddings.create(model="emb", input=["a", "b"]).data
+        again = client.embeddings.create(model="emb", input=["a"]).data
+        assert len(first[0].embedding) == 8
+        assert first[0].embedding == again[0].embedding
+        assert first[0].embedding != first[1].embedding
+
+        reply = client.chat.completions.create(model="chat", messages=[{"role": "user", "content": "hi"}])
+        assert reply.choices[0].message.content
+
+        weather = AsyncWeatherClient(base_url=fakes.weather_url, api_key="x")
+        data = run_sync(weather.fetch("Pune"))
+        assert data["name"] == "Pune"
+        assert fakes.requests == {"embeddings": 2, "chat": 1, "weather": 1}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"results": {"slow": summarize([0.100] * 10), "tiny": summarize([0.0001] * 10)}}
+    current = {"results": {"slow": summarize([0.150] * 10), "tiny": summarize([0.0002] * 10)}}
+    regressions = compare(baseline, current, tolerance=0.2)
+    assert any(r.startswith("slow.p50_ms") for r in regressions)
+    assert not any(r.startswith("tiny") for r in regressions)
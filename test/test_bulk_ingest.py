@@ -0,0 +1,67 @@
+# tests/test_bulk_ingest.py
+import json
+import os
+import shutil
+from bulk_ingest import bulk_ingest, plan_tasks
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "sample_data", "Geography_of_India.pdf")
+
+def test_plan_tasks_splits_large_files():
+    tasks = plan_tasks(["a.pdf", "b.pdf"], {"a.pdf": 120, "b.pdf": 10}, pages_per_task=50)
+    assert tasks == [("a.pdf", 0, 50), ("a.pdf", 50, 100), ("a.pdf", 100, 120), ("b.pdf", 0, 10)]
+
+def test_bulk_ingest_directory_writes_report(tmp_path):
+    shutil.copy(SAMPLE_PDF, tmp_path / "one.pdf")
+    shutil.copy(SAMPLE_PDF, tmp_path / "two.pdf")
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+    upserts = {}
+
+    reports = bulk_ingest(
+        str(tmp_path), workers=2, pages_per_task=1,
+        report_path=str(tmp_path / "report.json"),
+        embed_fn=lambda chunks: [[1.0, 0.0] for _ in chunks],
+        upsert_fn=lambda chunks, vectors, source: upserts.setdefault(source, len(chunks)),
+    )
+
+    by_name = {os.path.basename(r["file"]): r for r in reports}
+    assert by_name["broken.pdf"]["error"]
+    assert by_name["one.pdf"]["error"] is None
+    assert by_name["one.pdf"]["chunks"] == upserts["one.pdf"] > 0
+    assert by_name["one.pdf"]["pages"] > 0
+    assert json.loads((tmp_path / "report.json").read_text())["files"][0]["file"].endswith(".pdf")
+
+def test_reingest_embeds_nothing_whichever_path_ran_first(tmp_path, monkeypatch):
+    import docstore
+    import ingest_manifest
+    import pdf_rag
+    from docstore import ChunkStore
+    from ingest_manifest import IngestManifest
+
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setattr(docstore, "_docstore", ChunkStore(str(tmp_path / "docstore.sqlite")))
+    monkeypatch.setattr(ingest_manifest, "_manifest", IngestManifest(str(tmp_path / "manifest.sqlite")))
+    monkeypatch.setattr(pdf_rag, "COLLECTION_NAME", "docs_bulk")
+
+    embedded = []
+
+    class FakeEmbeddings:
+        def embed_documents(self, texts):
+            embedded.extend(texts)
+            return [[1.0, float(len(t))] for t in texts]
+    monkeypatch.setattr(pdf_rag, "_embeddings", FakeEmbeddings())
+
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    shutil.copy(SAMPLE_PDF, pdf_dir / "geo.pdf")
+
+    first = bulk_ingest(str(pdf_dir), workers=1, pages_per_task=1)[0]
+    assert first["error"] is None and first["embedded"] == len(embedded) > 0
+
+    # Same chunks (and ids) from the upload and streaming paths → nothing to embed
+    embedded.clear()
+    pdf_rag.build_embeddings_and_upsert(str(pdf_dir / "geo.pdf"))
+    pdf_rag.build_embeddings_and_upsert(str(pdf_dir / "geo.pdf"), streaming=True)
+    again = bulk_ingest(str(pdf_dir), workers=1, pages_per_task=1)[0]
+    assert embedded == [] and again["embedded"] == 0 and again["chunks"] == first["chunks"]
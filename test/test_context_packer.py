@@ -0,0 +1,63 @@
+from context_packer import fit_budget, merge_texts, overlap_length, pack_contexts
+from pdf_rag import chunk_text
+from pipeline import build_guardrailed_prompt
+from token_utils import count_tokens
+
+
+def _hits(chunks, indexes, scores, source="geo.pdf"):
+    return [{"id": i, "score": s, "payload": {"source": source, "chunk_index": i}}
+            for i, s in zip(indexes, scores)], [chunks[i] for i in indexes]
+
+
+def test_adjacent_chunks_merge_without_repeating_the_overlap():
+    text = " ".join(f"Sentence {i} describes river basin number {i}." for i in range(200))
+    chunks = chunk_text(text)
+    assert overlap_length(chunks[3], chunks[4]) > 50
+
+    hits, texts = _hits(chunks, [4, 3, 9], [0.9, 0.8, 0.7])
+    packed = pack_contexts(hits, texts, budget_tokens=0)
+
+    merged, other = packed["contexts"]
+    assert merged in text and merged.startswith(chunks[3]) and merged.endswith(chunks[4])
+    assert other == chunks[9]
+    assert packed["tokens_saved"] > 0
+    assert packed["tokens"] == count_tokens("\n\n---\n\n".join(packed["contexts"]))
+
+
+def test_duplicates_dropped_order_by_score_and_budget():
+    hits = [
+        {"id": "a", "score": 0.2, "payload": {"source": "x.pdf"}},
+        {"id": "b", "score": 0.9, "payload": {"source": "y.pdf"}},
+        {"id": "c", "score": 0.5, "payload": {"source": "x.pdf"}},
+        {"id": "d", "score": 0.4, "payload": {}},
+    ]
+    texts = ["monsoon winds", "the Thar desert is arid", "monsoon winds bring rain", None]
+    packed = pack_contexts(hits, texts, budget_tokens=0)
+    assert packed["contexts"] == ["the Thar desert is arid", "monsoon winds bring rain"]
+
+    budget = count_tokens("the Thar desert is arid")
+    assert pack_contexts(hits, texts, budget_tokens=budget)["contexts"] == ["the Thar desert is arid"]
+
+
+def test_prompt_budget():
+    contexts = ["alpha " * 400, "beta"]
+    assert fit_budget(contexts, 50) == ["beta"]
+    prompt = build_guardrailed_prompt(contexts, "q?", max_context_tokens=50)
+    assert "alpha" not in prompt and "beta" in prompt
+
+
+def test_colliding_or_unrelated_neighbours_are_kept_apart():
+    text = " ".join(f"Sentence {i} describes river basin number {i}." for i in range(200))
+    chunks = chunk_text(text)
+    other = "The Deccan plateau lies between the Western and Eastern Ghats."
+    hits = [{"id": "a", "score": 0.9, "payload": {"source": "geo.pdf", "chunk_index": 0}},
+            {"id": "b", "score": 0.8, "payload": {"source": "geo.pdf", "chunk_index": 0}},
+            {"id": "c", "score": 0.7, "payload": {"source": "geo.pdf", "chunk_index": 1}}]
+
+    # Same chunk_index, different text: both survive; index 1 only joins its real neighbour
+    packed = pack_contexts(hits, [chunks[0], other, chunks[1]], budget_tokens=0)
+    assert packed["contexts"] == [merge_texts(chunks[0], chunks[1]), other]
+
+    # Stored indexes say adjacent, text says otherwise → no stitching
+    packed = pack_contexts(hits[1:], [other, chunks[5]], budget_tokens=0)
+    assert packed["contexts"] == [other, chunks[5]] and packed["tokens_saved"] == 0
@@ -0,0 +1,81 @@
+import docstore
+import ingest_manifest
+import pdf_rag
+from docstore import ChunkStore
+from ingest_manifest import IngestManifest
+from local_index import LocalVectorIndex
+
+
+def test_chunk_store_roundtrip_lru_and_delete(tmp_path):
+    store = ChunkStore(str(tmp_path / "docs.sqlite"), cache_size=2)
+    texts = ["alpha " * 200, "beta", "gamma ✓"]
+    store.put_many("docs", ["a", "b", "c"], texts)
+
+    assert store.get_many("docs", ["c", "x", "a", "c"]) == ["gamma ✓", None, texts[0], "gamma ✓"]
+    assert len(store._cache) == 2
+    # compressed on disk
+    size = store._conn.execute("SELECT length(data) FROM chunks WHERE point_id = 'a'").fetchone()[0]
+    assert size < len(texts[0]) / 10
+
+    store.put_many("docs", ["c"], ["gamma v2"])
+    store.delete("docs", ["a"])
+    assert store.get_many("docs", ["a", "c"]) == [None, "gamma v2"]
+
+    store.forget_collection("docs")
+    assert len(store) == 0
+
+
+def test_same_point_ids_in_two_collections_are_independent(tmp_path):
+    path = str(tmp_path / "docs.sqlite")
+    store = ChunkStore(path)
+    store.put_many("docs_a", ["p1", "p2"], ["north v1", "west v1"])
+    store.put_many("docs_b", ["p1", "p2"], ["north v1", "west v1"])
+
+    store.put_many("docs_a", ["p1"], ["north v2"])
+    store.delete("docs_a", ["p2"])
+    assert store.get_many("docs_a", ["p1", "p2"]) == ["north v2", None]
+    assert store.get_many("docs_b", ["p1", "p2"]) == ["north v1", "west v1"]
+
+    store.forget_collection("docs_a")
+    store.close()
+    assert ChunkStore(path).get_many("docs_b", ["p1", "p2"]) == ["north v1", "west v1"]
+
+
+def test_point_id_keyed_store_is_migrated(tmp_path):
+    import sqlite3
+    import zlib
+    path = str(tmp_path / "docs.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chunks (point_id TEXT PRIMARY KEY, collection TEXT NOT NULL, data BLOB NOT NULL)")
+    conn.execute("INSERT INTO chunks VALUES ('p1', 'docs', ?)", (zlib.compress(b"old text"),))
+    conn.commit()
+    conn.close()
+
+    store = ChunkStore(path)
+    store.put_many("other", ["p1"], ["new text"])
+    assert store.get_many("docs", ["p1"]) == ["old text"]
+    assert store.get_many("other", ["p1"]) == ["new text"]
+
+
+def test_slim_payloads_resolve_texts_from_docstore(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setattr(docstore, "_docstore", ChunkStore(str(tmp_path / "docstore.sqlite")))
+    monkeypatch.setattr(ingest_manifest, "_manifest", IngestManifest(str(tmp_path / "manifest.sqlite")))
+    monkeypatch.setattr(pdf_rag, "COLLECTION_NAME", "docs_slim")
+    qclient = LocalVectorIndex(str(tmp_path / "vectors"))
+
+    chunks = ["rivers of the north", "deserts of the west"]
+    qclient.ensure_collection("docs_slim", 2)
+    pdf_rag.upsert_chunks(qclient, chunks, [[1.0, 0.0], [0.0, 1.0]], "geo.pdf", ids=["p1", "p2"])
+
+    hits = qclient.search("docs_slim", [0.0, 1.0], top_k=2)
+    assert all("text" not in h["payload"] for h in hits)
+    assert hits[0]["payload"] == {"source": "geo.pdf"}
+
+    # old-style payloads with text and slim ones mix in one result list
+    legacy = {"id": "old", "score": 0.1, "payload": {"text": "legacy chunk", "source": "x.pdf"}}
+    assert pdf_rag.extract_contexts(hits + [legacy]) == ["deserts of the west", "rivers of the north",
+                                                          "legacy chunk"]
+
+    pdf_rag.delete_chunks(qclient, ["p2"])
+    assert docstore.get_docstore().get_many("docs_slim", ["p1", "p2"]) == ["rivers of the north", None]
@@ -0,0 +1,56 @@
+# tests/test_embedding_cache.py
+from types import SimpleNamespace
+from embedding_cache import EmbeddingCache
+from pdf_rag import AzureEmbeddingWrapper
+
+def test_embedding_cache_roundtrip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many("m", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    got = cache.get_many("m", ["b", "c", "a"])
+    assert got[0].tolist() == [3.0, 4.0]
+    assert got[1] is None
+    assert got[2].tolist() == [1.0, 2.0]
+    assert cache.get_many("other-model", ["a"]) == [None]
+
+    # Survives a reopen
+    cache.close()
+    assert EmbeddingCache(str(tmp_path)).get_many("m", ["a"])[0].tolist() == [1.0, 2.0]
+
+class FakeEmbeddingsAPI:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, model, input):
+        self.inputs.append(list(input))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t)), 0.5]) for t in input])
+
+def test_wrapper_only_embeds_misses(tmp_path):
+    wrapper = AzureEmbeddingWrapper("https://example.invalid", "k", "2024-02-01", "m",
+                                    cache=EmbeddingCache(str(tmp_path)))
+    api = FakeEmbeddingsAPI()
+    wrapper.client = SimpleNamespace(embeddings=api)
+
+    assert wrapper.embed_documents(["aa", "bbb", "aa"]) == [[2.0, 0.5], [3.0, 0.5], [2.0, 0.5]]
+    assert wrapper.embed_query("bbb") == [3.0, 0.5]
+    assert api.inputs == [["aa", "bbb"]]
+    assert wrapper.cache.stats()["hits"] == 1
+
+def _write_rows(cache_dir, prefix, value):
+    cache = EmbeddingCache(cache_dir)
+    for i in range(200):
+        cache.put_many("m", [f"{prefix}-{i}"], [[value, float(i)]])
+
+def test_concurrent_processes_keep_rows_aligned(tmp_path):
+    import multiprocessing
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_write_rows, args=(str(tmp_path), p, v)) for p, v in (("a", 1.0), ("b", 2.0), ("c", 3.0))]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    cache = EmbeddingCache(str(tmp_path))
+    for prefix, value in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        got = cache.get_many("m", [f"{prefix}-{i}" for i in range(200)])
+        assert [v.tolist() for v in got] == [[value, float(i)] for i in range(200)]
@@ -0,0 +1,32 @@
+# tests/test_embedding_scheduler.py
+import threading
+import httpx
+import openai
+from embedding_scheduler import EmbeddingScheduler, pack_batches
+
+def test_pack_batches_respects_token_and_item_limits():
+    texts = ["x" * 40] * 5
+    counter = lambda t: len(t) // 4
+    assert pack_batches(texts, max_tokens=25, max_items=10, token_counter=counter) == [[0, 1], [2, 3], [4]]
+    assert pack_batches(texts, max_tokens=1000, max_items=2, token_counter=counter) == [[0, 1], [2, 3], [4]]
+    assert pack_batches(["x" * 400], max_tokens=10, token_counter=counter) == [[0]]
+
+def test_scheduler_keeps_order_and_retries_per_batch():
+    calls = []
+    failed_once = set()
+    lock = threading.Lock()
+
+    def embed_fn(batch):
+        with lock:
+            calls.append(tuple(batch))
+            if batch[0] == "t2" and "t2" not in failed_once:
+                failed_once.add("t2")
+                raise openai.APIConnectionError(request=httpx.Request("POST", "http://x"))
+        return [[float(t[1:])] for t in batch]
+
+    texts = [f"t{i}" for i in range(7)]
+    scheduler = EmbeddingScheduler(embed_fn, max_batch_items=2, concurrency=3, backoff=0)
+
+    assert scheduler.embed(texts) == [[float(i)] for i in range(7)]
+    # only the failing batch was retried
+    assert len(calls) == 5
@@ -0,0 +1,68 @@
+import time
+import threading
+from eval_worker import EvalWorkerPool
+
+
+class FakeFeedbackClient:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def create_feedback(self, run_id, key, score):
+        with self.lock:
+            self.calls.append((run_id, key, score))
+
+
+def test_submit_returns_immediately_and_scores_fill_in():
+    release = threading.Event()
+
+    def greeting_eval(run, example):
+        return True
+
+    def slow_judge_eval(run, example):
+        release.wait(5)
+        return run.outputs["summary"] == example.expected["output"]
+
+    def broken_eval(run, example):
+        raise RuntimeError("judge down")
+
+    feedback = FakeFeedbackClient()
+    pool = EvalWorkerPool([greeting_eval, slow_judge_eval, broken_eval],
+                          judge_evaluators=[slow_judge_eval], feedback_client=feedback, workers=2)
+
+    started = time.perf_counter()
+    job = pool.submit("run-1", {"input": "hi"}, {"summary": "hello"}, {"output": "hello"})
+    assert time.perf_counter() - started < 0.1
+    assert pool.result(job)["status"] == "pending"
+
+    release.set()
+    pool.join()
+
+    result = pool.result(job)
+    assert result["status"] == "done"
+    assert result["scores"]["greeting_eval"] is True
+    assert result["scores"]["slow_judge_eval"] is True
+    assert result["scores"]["broken_eval"].startswith("Error")
+    assert sorted(feedback.calls) == [("run-1", "greeting_eval", 1), ("run-1", "slow_judge_eval", 1)]
+
+
+def test_judge_concurrency_is_bounded():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def judge_eval(run, example):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return True
+
+    pool = EvalWorkerPool([judge_eval], judge_evaluators=[judge_eval], workers=6, judge_concurrency=2)
+    for i in range(8):
+        pool.submit(f"run-{i}", {"input": "q"}, {"summary": "a"})
+    pool.join()
+
+    assert peak[0] == 2
+    assert pool.stats()["completed"] == 8
@@ -0,0 +1,72 @@
+import httpx
+import pytest
+from gazetteer import Gazetteer, get_gazetteer, place_from_weather
+
+
+def test_find_multi_word_cities_in_one_pass():
+    gaz = get_gazetteer()
+    found = gaz.find("Compare weather in New Delhi, San Francisco and delhi, then New Delhi again")
+    assert [m["text"] for m in found] == ["new delhi", "san francisco", "delhi"]
+    assert found[0]["place"]["id"] != found[2]["place"]["id"]
+    assert gaz.lookup("Bombay")["name"] == "Mumbai"
+    assert gaz.find("Explain chapter 2 of the document") == []
+
+
+def test_extract_cities_prefers_gazetteer():
+    from pipeline import extract_city, extract_cities
+    assert extract_city("what's the weather like in New Delhi today?") == "new delhi"
+    assert extract_cities("is it raining in San Francisco or Bangalore") == ["san francisco", "bangalore"]
+    # unknown names fall back to the heuristic
+    assert extract_city("weather in Springfield") == "springfield"
+
+
+def test_learned_names_and_misses():
+    gaz = Gazetteer([])
+    owm = {"id": 42, "name": "Springfield", "coord": {"lat": 39.8, "lon": -89.6}, "sys": {"country": "US"}}
+    gaz.learn("springfield?", place_from_weather(owm))
+    assert gaz.lookup("Springfield")["lat"] == 39.8
+
+    gaz.learn_missing("Atlantis")
+    assert gaz.is_missing("atlantis") and gaz.lookup("atlantis") is None
+
+
+def test_weather_node_queries_places_by_coordinates_and_shares_cache(monkeypatch):
+    import weather
+    import pipeline
+    calls = []
+
+    async def fake_request(location, api_key, units):
+        calls.append(weather.location_query(location)[1])
+        return {"name": "Colaba", "main": {"temp": 30}, "weather": [{"description": "haze"}]}
+
+    monkeypatch.setattr(weather.weather_client, "_request", fake_request)
+    weather.weather_cache.clear()
+
+    first = pipeline.weather_node({"user_input": "weather in Mumbai"}, openweather_key="test")
+    second = pipeline.weather_node({"user_input": "is it humid in bombay?"}, openweather_key="test")
+
+    assert calls == [{"lat": 19.0728, "lon": 72.8826}]
+    assert first["summary"] == second["summary"]
+    assert "Weather in Mumbai" in first["summary"]
+
+
+def test_rejected_guess_is_not_requested_twice(monkeypatch):
+    import weather
+    import pipeline
+    calls = []
+
+    async def fake_request(location, api_key, units):
+        calls.append(location)
+        request = httpx.Request("GET", "http://weather.test")
+        raise httpx.HTTPStatusError("city not found", request=request,
+                                    response=httpx.Response(404, request=request))
+
+    monkeypatch.setattr(weather.weather_client, "_request", fake_request)
+    weather.weather_cache.clear()
+    get_gazetteer().clear_learned()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        pipeline.weather_node({"user_input": "weather in Narnia"}, openweather_key="test")
+    with pytest.raises(ValueError):
+        pipeline.weather_node({"user_input": "weather in narnia?"}, openweather_key="test")
+    assert calls == ["narnia"]
@@ -9,3 +9,40 @@ def test_graph_pdf_path():
     graph = build_pipeline_graph()
     result = graph.invoke({"user_input": "Explain the PDF introduction"})
     assert result["action"] == "pdf_rag"
+
+def test_stream_pipeline_yields_tokens_then_final(monkeypatch):
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    import pipeline
+    from graph import stream_pipeline
+    from llm_utils import summarize_with_llm
+
+    fake_llm = GenericFakeChatModel(messages=iter([AIMessage(content="Delhi is the capital")]))
+    monkeypatch.setattr(pipeline, "get_answer_cache", lambda: None)
+    monkeypatch.setattr(pipeline, "retrieve", lambda q, q_vec=None: [{"id": 1, "score": 1.0, "payload": {"text": "ctx"}}])
+    monkeypatch.setattr(pipeline, "summarize_with_llm", lambda prompt: summarize_with_llm(prompt, llm=fake_llm))
+
+    events = list(stream_pipeline(build_pipeline_graph(), {"user_input": "Explain the PDF introduction"}))
+
+    tokens = [e["text"] for e in events if e["type"] == "token"]
+    final = events[-1]
+    assert len(tokens) > 1 and "".join(tokens) == "Delhi is the capital"
+    assert final["type"] == "final"
+    assert final["state"]["summary"] == "Delhi is the capital"
+    assert final["metrics"]["streamed"] and final["metrics"]["ttft_s"] <= final["metrics"]["total_s"]
+
+def test_async_graph_weather_path(monkeypatch):
+    import asyncio
+    import pipeline
+    from graph import build_async_pipeline_graph
+
+    async def fake_fetch(location, api_key=None):
+        # gazetteer cities arrive as place dicts and are queried by coordinates
+        assert location["lat"] and location["lon"]
+        return {"name": "Shivajinagar", "main": {"temp": 30}, "weather": [{"description": "clear sky"}]}
+
+    monkeypatch.setattr(pipeline, "afetch_weather", fake_fetch)
+    graph = build_async_pipeline_graph(openweather_key="test")
+    result = asyncio.run(graph.ainvoke({"user_input": "weather in pune"}))
+    assert result["action"] == "weather"
+    assert "Pune" in result["summary"]
@@ -0,0 +1,73 @@
+import pdf_rag
+import docstore
+import ingest_manifest
+from ingest_manifest import IngestManifest, chunk_point_id, diff_source
+from local_index import LocalVectorIndex
+
+
+def test_chunk_ids_are_deterministic():
+    assert chunk_point_id("a.pdf", "hello") == chunk_point_id("a.pdf", "hello")
+    assert chunk_point_id("a.pdf", "hello") != chunk_point_id("b.pdf", "hello")
+    assert chunk_point_id("a.pdf", "hello") != chunk_point_id("a.pdf", "hello!")
+
+
+def test_diff_source_dedupes_and_finds_removed():
+    new, removed = diff_source({"x", "y"}, ["x", "z", "z", "w"])
+    assert new == [1, 3]
+    assert removed == ["y"]
+
+
+def test_reingest_embeds_only_changed_chunks(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setattr(ingest_manifest, "_manifest", IngestManifest(str(tmp_path / "manifest.sqlite")))
+    monkeypatch.setattr(docstore, "_docstore", docstore.ChunkStore(str(tmp_path / "docstore.sqlite")))
+    monkeypatch.setattr(pdf_rag, "COLLECTION_NAME", "docs_test")
+    qclient = LocalVectorIndex(str(tmp_path / "vectors"))
+
+    embedded = []
+
+    def fake_embed(texts):
+        embedded.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+    chunks = ["alpha chunk", "beta chunk", "gamma chunk"]
+    stats = pdf_rag.sync_source(qclient, chunks, "doc.pdf", fake_embed)
+    assert stats == {"chunks": 3, "embedded": 3, "deleted": 0, "renumbered": 0}
+    assert qclient.count("docs_test") == 3
+
+    # Unchanged document → no embedding calls, same collection size
+    stats = pdf_rag.sync_source(qclient, chunks, "doc.pdf", fake_embed)
+    assert stats == {"chunks": 3, "embedded": 0, "deleted": 0, "renumbered": 0}
+    assert len(embedded) == 1
+    assert qclient.count("docs_test") == 3
+
+    # One chunk edited, one dropped
+    stats = pdf_rag.sync_source(qclient, ["alpha chunk", "beta chunk v2"], "doc.pdf", fake_embed)
+    assert stats == {"chunks": 2, "embedded": 1, "deleted": 2, "renumbered": 0}
+    assert embedded[-1] == ["beta chunk v2"]
+    assert qclient.count("docs_test") == 2
+
+    hits = pdf_rag.get_lexical_index("docs_test").search("gamma")
+    assert hits == []
+
+
+def test_reingest_renumbers_chunks_that_moved(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEXICAL_INDEX_DIR", str(tmp_path / "lexical"))
+    monkeypatch.setattr(ingest_manifest, "_manifest", IngestManifest(str(tmp_path / "manifest.sqlite")))
+    monkeypatch.setattr(docstore, "_docstore", docstore.ChunkStore(str(tmp_path / "docstore.sqlite")))
+    monkeypatch.setattr(pdf_rag, "COLLECTION_NAME", "docs_moved")
+    qclient = LocalVectorIndex(str(tmp_path / "vectors"))
+
+    def fake_embed(texts):
+        return [[float(len(t)), 1.0] for t in texts]
+
+    pdf_rag.sync_source(qclient, ["alpha chunk", "beta chunk"], "doc.pdf", fake_embed)
+    # A chunk inserted in front shifts both kept chunks by one
+    stats = pdf_rag.sync_source(qclient, ["intro chunk", "alpha chunk", "beta chunk"], "doc.pdf", fake_embed)
+    assert stats["embedded"] == 1 and stats["renumbered"] == 2
+
+    beta = chunk_point_id("doc.pdf", "beta chunk")
+    dense = {h["id"]: h["payload"] for h in qclient.search("docs_moved", [1.0, 0.0], top_k=3)}
+    assert dense[beta] == {"source": "doc.pdf", "chunk_index": 2}
+    lexical = pdf_rag.get_lexical_index("docs_moved").search("beta")
+    assert lexical[0]["payload"]["chunk_index"] == 2
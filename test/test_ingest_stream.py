@@ -0,0 +1,57 @@
+# tests/test_ingest_stream.py
+import os
+from ingest_stream import iter_chunks, stream_ingest
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "sample_data", "Geography_of_India.pdf")
+
+def test_iter_chunks_streams_with_bounded_size():
+    pages = [(i, "word " * 300) for i in range(10)]
+    chunks = list(iter_chunks(pages, chunk_size=200, chunk_overlap=20))
+
+    assert [i for i, _ in chunks] == list(range(len(chunks)))
+    assert all(len(c) <= 200 for _, c in chunks)
+    assert sum(c.count("word") for _, c in chunks) >= 3000
+
+def test_stream_ingest_sample_pdf():
+    upserted = []
+    stages = set()
+
+    def fake_embed(texts):
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def fake_upsert(batch, vectors):
+        assert len(batch) == len(vectors)
+        upserted.extend(i for i, _ in batch)
+
+    with open(SAMPLE_PDF, "rb") as f:
+        progress = stream_ingest(f, fake_embed, fake_upsert, batch_size=8, queue_size=2,
+                                 on_progress=lambda stage, _: stages.add(stage))
+
+    assert progress["pages"] > 0
+    assert progress["chunks"] == progress["embedded"] == progress["upserted"] == len(upserted)
+    assert upserted == list(range(len(upserted)))
+    assert stages == {"pages", "chunks", "embedded", "upserted"}
+
+def test_stage_threads_exit_when_the_consumer_raises(monkeypatch):
+    import threading
+    import time
+    import pytest
+    import ingest_stream
+
+    def slow_pages(stream):
+        # Still extracting when the consumer fails, so no _DONE ever follows
+        for i in range(20):
+            yield i, "word " * 600
+            time.sleep(0.3)
+    monkeypatch.setattr(ingest_stream, "iter_pdf_pages", slow_pages)
+
+    def failing_upsert(batch, vectors):
+        raise RuntimeError("vector store down")
+
+    with pytest.raises(RuntimeError):
+        stream_ingest(None, lambda texts: [[1.0, 0.0] for _ in texts], failing_upsert, batch_size=1)
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and any(t.name.startswith("ingest-") for t in threading.enumerate()):
+        time.sleep(0.05)
+    assert [t.name for t in threading.enumerate() if t.name.startswith("ingest-")] == []
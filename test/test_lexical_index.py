@@ -0,0 +1,63 @@
+# tests/test_lexical_index.py
+from lexical_index import BM25Index, is_keyword_query, reciprocal_rank_fusion
+
+DOCS = {
+    "1": "Rajasthan is the largest state of India by area.",
+    "2": "The Ganga flows through Uttar Pradesh and Bihar.",
+    "3": "Kerala receives heavy monsoon rainfall every year.",
+}
+
+def build(path=None):
+    index = BM25Index(path)
+    index.add_many(list(DOCS), list(DOCS.values()), [{"source": "geo.pdf"}] * 3)
+    return index
+
+def test_bm25_ranks_proper_nouns_and_persists(tmp_path):
+    index = build(str(tmp_path / "idx.json.gz"))
+    hits = index.search("Which state is Rajasthan?", top_k=2)
+    assert hits[0]["id"] == "1"
+    assert hits[0]["payload"] == {"source": "geo.pdf"}  # texts live in the docstore
+
+    index.save()
+    reloaded = BM25Index(str(tmp_path / "idx.json.gz"))
+    assert reloaded.search("monsoon Kerala")[0]["id"] == "3"
+
+    reloaded.remove(["3"])
+    assert reloaded.search("monsoon") == []
+    assert all("3" not in docs for docs in reloaded.postings.values()) and "3" not in reloaded.doc_terms
+
+def test_keyword_query_detection():
+    index = build()
+    assert is_keyword_query("Kerala rainfall", index)
+    assert not is_keyword_query("Kerala Atlantis", index)
+    assert not is_keyword_query("How does the monsoon affect Kerala agriculture?", index)
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    dense = [{"id": "a", "score": 0.9, "payload": {}}, {"id": "b", "score": 0.8, "payload": {}}]
+    lexical = [{"id": "b", "score": 7.0, "payload": {}}, {"id": "c", "score": 5.0, "payload": {}}]
+    fused = reciprocal_rank_fusion([dense, lexical], top_k=3)
+    assert [h["id"] for h in fused] == ["b", "a", "c"]
+
+def test_legacy_index_hands_texts_to_the_docstore(tmp_path, monkeypatch):
+    import gzip
+    import json
+    import docstore
+    from docstore import ChunkStore
+    monkeypatch.setattr(docstore, "_docstore", ChunkStore(str(tmp_path / "docstore.sqlite")))
+
+    path = tmp_path / "old.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"postings": {"kerala": {"3": 1}}, "doc_len": {"3": 1},
+                   "payloads": {"3": {"source": "geo.pdf", "text": DOCS["3"]}}}, f)
+
+    index = BM25Index(str(path), collection="docs")
+    assert index.search("kerala")[0]["payload"] == {"source": "geo.pdf"}
+    assert docstore.get_docstore().get_many("docs", ["3"]) == [DOCS["3"]]
+    index.save()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "text" not in json.load(f)["payloads"]["3"]
+
+    # Per-doc terms are rebuilt for indexes saved without them
+    assert index.doc_terms == {"3": ["kerala"]}
+    index.remove(["3"])
+    assert index.postings == {}
@@ -0,0 +1,47 @@
+import llm_utils
+
+
+def _fake_azure_env(monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "secret-key-123")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-test")
+    llm_utils.clear_llm_registry()
+
+
+def test_llm_and_chain_are_built_once(monkeypatch, capsys):
+    _fake_azure_env(monkeypatch)
+
+    llm = llm_utils.get_llm()
+    assert llm_utils.get_llm() is llm
+    assert llm_utils.get_llm(temperature=0.0) is not llm
+    assert llm_utils.get_summary_chain() is llm_utils.get_summary_chain()
+
+    out = capsys.readouterr().out
+    assert "secret-key-123" not in out
+    llm_utils.clear_llm_registry()
+
+
+def test_summarize_uses_shared_chain(monkeypatch):
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    fake_llm = GenericFakeChatModel(messages=iter([AIMessage(content="short summary")]))
+    chain = llm_utils.build_summary_chain(fake_llm)
+    monkeypatch.setattr(llm_utils, "get_summary_chain", lambda *a, **k: chain)
+
+    assert llm_utils.summarize_with_llm("some text") == "short summary"
+
+
+def test_async_clients_are_per_event_loop(monkeypatch):
+    import asyncio
+    _fake_azure_env(monkeypatch)
+
+    async def in_loop():
+        llm = llm_utils.get_llm()
+        assert llm_utils.get_llm() is llm
+        return llm
+
+    first, second = asyncio.run(in_loop()), asyncio.run(in_loop())
+    assert first is not second
+    assert llm_utils.get_llm() not in (first, second)
+    llm_utils.clear_llm_registry()
@@ -0,0 +1,36 @@
+# tests/test_local_index.py
+import pytest
+from local_index import LocalVectorIndex
+from qdrant_utils import create_collection_if_not_exists, upsert_documents, query_similar
+
+def test_local_index_search_overwrite_and_reopen(tmp_path):
+    index = LocalVectorIndex(str(tmp_path))
+    create_collection_if_not_exists(index, "docs", 2)
+    upsert_documents(index, "docs", [[1, 0], [0, 1], [1, 1]],
+                     [{"text": "x"}, {"text": "y"}, {"text": "xy"}], ["a", "b", "c"])
+
+    hits = query_similar(index, "docs", [1, 0.1], top_k=2)
+    assert [h["id"] for h in hits] == ["a", "c"]
+    assert hits[0]["score"] == pytest.approx(0.995, abs=1e-3)
+
+    # Overwrite "a" so it points the other way, delete "c"
+    upsert_documents(index, "docs", [[0, -1]], [{"text": "x2"}], ["a"])
+    index.delete("docs", ["c"])
+    assert index.count("docs") == 2
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    hits = query_similar(reopened, "docs", [0, -1], top_k=5)
+    assert [(h["id"], h["payload"]["text"]) for h in hits] == [("a", "x2"), ("b", "y")]
+
+def test_local_index_rejects_dimension_mismatch(tmp_path):
+    index = LocalVectorIndex(str(tmp_path))
+    create_collection_if_not_exists(index, "docs", 3)
+    with pytest.raises(ValueError):
+        create_collection_if_not_exists(index, "docs", 4)
+
+def test_get_vector_client_selects_local_backend(tmp_path, monkeypatch):
+    from qdrant_utils import LocalBackend, get_vector_client
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_DIR", str(tmp_path))
+    backend = get_vector_client()
+    assert isinstance(backend, LocalBackend) and isinstance(backend.index, LocalVectorIndex)
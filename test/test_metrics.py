@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from metrics import MetricsRegistry, timed
+
+
+def test_timed_records_histograms_and_errors():
+    registry = MetricsRegistry()
+
+    @timed("node_seconds", registry, node="sync")
+    def ok():
+        return 1
+
+    @timed("node_seconds", registry, node="async")
+    async def aok():
+        return 2
+
+    @timed("node_seconds", registry, node="boom")
+    def boom():
+        raise RuntimeError("x")
+
+    assert ok() == 1
+    assert asyncio.run(aok()) == 2
+    with pytest.raises(RuntimeError):
+        boom()
+
+    snap = registry.snapshot()
+    by_node = {h["labels"]["node"]: h for h in snap["histograms"]["node_seconds"]}
+    assert set(by_node) == {"sync", "async", "boom"}
+    assert by_node["sync"]["count"] == 1
+    assert snap["counters"]["errors_total"][0]["labels"] == {
+        "metric": "node_seconds", "node": "boom", "error": "RuntimeError"
+    }
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("latency_seconds", 0.05, service="qdrant")
+    registry.observe("latency_seconds", 0.5, service="qdrant")
+    registry.inc("cache_requests_total", cache="weather", result="hit")
+    registry.set_gauge("payload_bytes", 512, kind="weather_response")
+
+    text = registry.render_prometheus()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{service="qdrant",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{service="qdrant",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{service="qdrant"} 2' in text
+    assert 'cache_requests_total{cache="weather",result="hit"} 1' in text
+    assert 'payload_bytes{kind="weather_response"} 512' in text
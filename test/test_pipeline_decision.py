@@ -13,3 +13,16 @@ def test_extract_city():
 def test_guardrails_no_context():
     p = build_guardrailed_prompt([], "test?")
     assert "No related documents found" in p
+
+def test_extract_cities_multi():
+    from pipeline import extract_cities
+    assert extract_cities("compare weather in Pune, Delhi and Chennai") == ["pune", "delhi", "chennai"]
+    assert extract_cities("weather in hyderabad") == ["hyderabad"]
+
+def test_decide_action_whole_words_only():
+    assert decide_action("What happened in Ukraine?") == "pdf_rag"
+    assert decide_action("Which train connects Delhi and Agra?") == "pdf_rag"
+    assert decide_action("Will it rain in Pune?") == "weather"
+    assert decide_action("hello") == "greeting"
+    assert decide_action("Good morning, how are you") == "greeting"
+    assert decide_action("say hello to the document") == "pdf_rag"
@@ -0,0 +1,150 @@
+# tests/test_qdrant_utils.py
+import pytest
+from qdrant_client import QdrantClient
+import qdrant_utils
+from qdrant_utils import create_collection_if_not_exists, get_qdrant_client
+
+class CountingClient(QdrantClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(":memory:")
+        self.exists_calls = 0
+
+    def collection_exists(self, collection_name):
+        self.exists_calls += 1
+        return super().collection_exists(collection_name)
+
+def test_get_qdrant_client_is_shared_per_url_and_key(monkeypatch):
+    monkeypatch.setattr(qdrant_utils, "QdrantClient", CountingClient)
+    qdrant_utils.close_qdrant_clients()
+
+    a = get_qdrant_client("http://a:6333", "k")
+    assert get_qdrant_client("http://a:6333", "k") is a
+    assert get_qdrant_client("http://b:6333", "k") is not a
+    qdrant_utils.close_qdrant_clients()
+    assert get_qdrant_client("http://a:6333", "k") is not a
+
+def test_collection_bootstrap_is_memoized():
+    client = CountingClient()
+    create_collection_if_not_exists(client, "docs", 4)
+    create_collection_if_not_exists(client, "docs", 4)
+    assert client.exists_calls == 1
+
+    with pytest.raises(ValueError):
+        create_collection_if_not_exists(client, "docs", 8)
+
+def test_upsert_documents_accepts_numpy_in_batches():
+    import numpy as np
+    from qdrant_utils import upsert_documents, query_similar
+    client = QdrantClient(":memory:")
+    create_collection_if_not_exists(client, "docs", 3)
+
+    vectors = np.eye(3, dtype=np.float32).repeat(4, axis=0)[:10]
+    ids = list(range(10))
+    # parallel is ignored for the in-process client, which is not thread-safe
+    stats = upsert_documents(client, "docs", vectors, [{"n": i} for i in ids], ids,
+                             batch_size=3, parallel=2, wait=False)
+
+    assert stats["batches"] == 4
+    assert client.count("docs").count == 10
+    assert query_similar(client, "docs", [0, 0, 1], top_k=1)[0]["payload"]["n"] >= 8
+
+class RecordingClient:
+    """Stands in for a server client: records the calls local mode would ignore."""
+    init_options = {"location": None, "url": "http://qdrant.test", "path": None}
+
+    def __init__(self):
+        self.calls = []
+
+    def collection_exists(self, name):
+        return False
+
+    def __getattr__(self, method):
+        return lambda **kwargs: self.calls.append((method, kwargs))
+
+def test_collection_profiles_configure_quantization_and_indexes():
+    from qdrant_client.models import ScalarQuantization, BinaryQuantization, Disabled
+    from qdrant_utils import get_collection_profile, migrate_collection, search_params
+
+    client = RecordingClient()
+    create_collection_if_not_exists(client, "docs", 8, profile=get_collection_profile("int8"))
+    (_, create), (_, index) = client.calls
+    assert isinstance(create["quantization_config"], ScalarQuantization)
+    assert create["vectors_config"].on_disk is True
+    assert index["field_name"] == "source"
+
+    params = search_params(get_collection_profile("int8"))
+    assert params.quantization.rescore and params.quantization.oversampling == 2.0
+    assert search_params(get_collection_profile("default")).quantization is None
+
+    client.calls.clear()
+    migrate_collection(client, "docs", get_collection_profile("binary"))
+    assert isinstance(client.calls[0][1]["quantization_config"], BinaryQuantization)
+    migrate_collection(client, "docs", get_collection_profile("default"))
+    assert client.calls[2][1]["quantization_config"] == Disabled.DISABLED
+
+    with pytest.raises(ValueError):
+        get_collection_profile("fp8")
+
+def test_async_memory_client_shares_the_in_process_data():
+    import asyncio
+    from qdrant_utils import get_async_qdrant_client, upsert_documents, aquery_similar
+    qdrant_utils.close_qdrant_clients()
+    client = get_qdrant_client(":memory:")
+    create_collection_if_not_exists(client, "shared", 2)
+    upsert_documents(client, "shared", [[1.0, 0.0], [0.0, 1.0]], [{"n": 0}, {"n": 1}], [1, 2])
+
+    async def search():
+        return await aquery_similar(get_async_qdrant_client(":memory:"), "shared", [0.0, 1.0], top_k=1)
+    assert [h["id"] for h in asyncio.run(search())] == [2]
+    qdrant_utils.close_qdrant_clients()
+
+def test_aquery_batch_similar_returns_one_list_per_query():
+    import asyncio
+    from qdrant_utils import get_async_qdrant_client, upsert_documents, aquery_batch_similar
+    qdrant_utils.close_qdrant_clients()
+    client = get_qdrant_client(":memory:")
+    create_collection_if_not_exists(client, "batch", 2)
+    upsert_documents(client, "batch", [[1.0, 0.0], [0.0, 1.0]], [{"n": 0}, {"n": 1}], [1, 2])
+
+    async def search():
+        return await aquery_batch_similar(get_async_qdrant_client(":memory:"), "batch",
+                                          [[1.0, 0.1], [0.1, 1.0]], top_k=1, with_vectors=True)
+    hits = asyncio.run(search())
+    assert [[h["id"] for h in per_query] for per_query in hits] == [[1], [2]]
+    assert len(hits[0][0]["vector"]) == 2
+    qdrant_utils.close_qdrant_clients()
+
+def test_vector_client_adapter_round_trip(monkeypatch):
+    from qdrant_utils import QdrantBackend, get_vector_client, upsert_documents, query_similar, update_payloads
+    qdrant_utils.close_qdrant_clients()
+    monkeypatch.setenv("VECTOR_BACKEND", "qdrant")
+    backend = get_vector_client(":memory:")
+    assert isinstance(backend, QdrantBackend)
+    create_collection_if_not_exists(backend, "adapted", 2)
+    upsert_documents(backend, "adapted", [[1.0, 0.0], [0.0, 1.0]], [{"n": 0}, {"n": 1}], [1, 2])
+    assert [h["id"] for h in query_similar(backend, "adapted", [0.0, 1.0], top_k=1)] == [2]
+
+    update_payloads(backend, "adapted", {2: {"chunk_index": 7}})
+    assert query_similar(backend, "adapted", [0.0, 1.0], top_k=1)[0]["payload"] == {"n": 1, "chunk_index": 7}
+
+    # Deleting through the adapter also drops the cached existence check
+    backend.delete_collection("adapted")
+    assert not backend.collection_exists("adapted")
+    qdrant_utils.close_qdrant_clients()
+
+def test_async_clients_are_rejected_on_sync_paths():
+    from qdrant_client import AsyncQdrantClient
+    from qdrant_utils import AsyncQdrantBackend, VectorBackend, as_async_backend, upsert_documents
+    async_client = AsyncQdrantClient(":memory:")
+    with pytest.raises(TypeError):
+        create_collection_if_not_exists(async_client, "docs", 2)
+    with pytest.raises(TypeError):
+        upsert_documents(AsyncQdrantBackend(async_client), "docs", [[1.0, 0.0]], [{}], [1])
+    with pytest.raises(TypeError):
+        as_async_backend(QdrantClient(":memory:"))
+
+    class SearchOnly(VectorBackend):
+        def search(self, name, vector, top_k, with_vectors):
+            return []
+    with pytest.raises(TypeError):
+        SearchOnly()
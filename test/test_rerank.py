@@ -0,0 +1,66 @@
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from local_index import LocalVectorIndex
+from qdrant_utils import create_collection_if_not_exists, upsert_documents, query_similar
+from rerank import mmr, mmr_rerank, mmr_settings
+
+
+def _near_duplicates():
+    # three near-copies of the best match, then two distinct, weaker ones
+    return np.array([
+        [1.0, 0.10, 0.10],
+        [1.0, 0.10, 0.09],
+        [1.0, 0.08, 0.10],
+        [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0],
+    ], dtype=np.float32)
+
+
+def test_mmr_skips_near_duplicates():
+    docs, q = _near_duplicates(), [1.0, 1.0, 1.0]
+    assert mmr(q, docs, top_k=3, lambda_mult=1.0) == [0, 1, 2]  # pure relevance
+    diverse = mmr(q, docs, top_k=3, lambda_mult=0.5)
+    assert diverse[0] == 0 and set(diverse[1:]) == {3, 4}
+
+
+def test_mmr_rerank_drops_vectors_and_is_fast():
+    hits = [{"id": i, "score": 0.0, "payload": {}, "vector": v} for i, v in enumerate(_near_duplicates())]
+    out = mmr_rerank(hits, [1.0, 1.0, 1.0], top_k=2, lambda_mult=0.5)
+    assert [h["id"] for h in out] == [0, 3]
+    assert all("vector" not in h for h in out)
+
+    rng = np.random.default_rng(0)
+    docs, q = rng.standard_normal((16, 1536)).astype(np.float32), rng.standard_normal(1536)
+    samples = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        mmr(q, docs, top_k=4)
+        samples.append(time.perf_counter() - t0)
+    assert sorted(samples)[10] < 0.001
+
+
+def test_with_vectors_on_both_backends(tmp_path):
+    vectors = _near_duplicates()
+    ids = list(range(len(vectors)))
+
+    local = LocalVectorIndex(str(tmp_path / "vectors"))
+    local.ensure_collection("docs", 3)
+    local.upsert("docs", ids, vectors, [{"n": i} for i in ids])
+
+    qdrant = QdrantClient(":memory:")
+    create_collection_if_not_exists(qdrant, "docs", 3)
+    upsert_documents(qdrant, "docs", vectors, [{"n": i} for i in ids], ids)
+
+    for client in (local, qdrant):
+        hits = query_similar(client, "docs", [1.0, 1.0, 1.0], top_k=5, with_vectors=True)
+        assert len(hits) == 5 and all(len(h["vector"]) == 3 for h in hits)
+        assert "vector" not in query_similar(client, "docs", [1.0, 1.0, 1.0], top_k=1)[0]
+        assert [h["id"] for h in mmr_rerank(hits, [1.0, 1.0, 1.0], 3, 0.5)][1:] in ([3, 4], [4, 3])
+
+
+def test_mmr_settings(monkeypatch):
+    assert mmr_settings() is None
+    monkeypatch.setenv("RAG_MMR", "1")
+    monkeypatch.setenv("RAG_MMR_FETCH_FACTOR", "3")
+    assert mmr_settings() == {"fetch_factor": 3, "lambda": 0.7}
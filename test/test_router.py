@@ -0,0 +1,71 @@
+from router import IntentRouter, DEFAULT_INTENTS
+
+
+def _keyword_embedder(calls):
+    # 2-d toy embedding: x = "weather-ness", y = "document-ness"
+    def embed(texts):
+        calls.append(list(texts))
+        vecs = []
+        for t in texts:
+            t = t.lower()
+            weather = sum(w in t for w in ("today", "now", "weather", "sunny", "forecast", "rain in"))
+            doc = sum(w in t for w in ("average", "annual", "document", "chapter", "rivers", "report", "rainfall"))
+            vecs.append([weather + 0.1, doc + 0.1])
+        return vecs
+    return embed
+
+
+def test_priorities_and_route_many():
+    router = IntentRouter(DEFAULT_INTENTS)
+    assert router.route_many([
+        "hi there",
+        "weather forecast for Goa",
+        "Summarize chapter 3",
+        "Ukraine's economy",
+    ]) == ["greeting", "weather", "pdf_rag", "pdf_rag"]
+
+
+def test_multi_word_phrases_and_custom_intents():
+    router = IntentRouter([
+        {"name": "support", "priority": 5, "phrases": ["reset my password", "log in"]},
+        {"name": "docs", "priority": 0, "phrases": []},
+    ], default="docs")
+    assert router.route("How do I reset my password?") == "support"
+    assert router.route("password policy in the handbook") == "docs"
+    assert router.route("cannot log in") == "support"
+
+
+def test_embedding_fallback_only_for_ambiguous_inputs():
+    calls = []
+    router = IntentRouter(DEFAULT_INTENTS, embed_many_fn=_keyword_embedder(calls))
+
+    routes = router.route_many([
+        "What is the average annual temperature in the document?",   # weak trigger → fallback
+        "current temperature in Chennai now",                        # weak trigger → fallback
+        "weather in Pune",                                           # strong → no embedding
+    ])
+    assert routes == ["pdf_rag", "weather", "weather"]
+
+    # centroids once from every intent's examples, then one batched call for the two ambiguous inputs
+    assert calls[0] == [e for intent in DEFAULT_INTENTS for e in intent.get("examples") or []]
+    assert len(calls[-1]) == 2
+    router.route("will it rain in Delhi today")
+    assert len(calls) == 3  # 1 batch for every centroid + 2 routing calls
+
+
+def test_aroute_awaits_the_async_embedder():
+    import asyncio
+    calls, acalls = [], []
+    embed = _keyword_embedder(calls)
+
+    async def aembed(texts):
+        acalls.append(list(texts))
+        return embed(texts)
+
+    router = IntentRouter(DEFAULT_INTENTS, embed_many_fn=_keyword_embedder([]), aembed_many_fn=aembed)
+    routes = asyncio.run(router.aroute_many([
+        "What is the average annual temperature in the document?",
+        "weather in Pune",
+    ]))
+    assert routes == ["pdf_rag", "weather"]
+    assert acalls == [["What is the average annual temperature in the document?"]]
@@ -0,0 +1,74 @@
+# tests/test_server.py
+import asyncio
+import time
+import httpx
+from server import AskServer
+
+class SlowGraph:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def ainvoke(self, state):
+        await asyncio.sleep(self.delay)
+        return {"action": "pdf_rag", "summary": state["user_input"].upper(), "raw": []}
+
+async def _run(app, requests):
+    server = await app.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            return await asyncio.gather(*(client.post("/ask", json=body) for body in requests))
+    finally:
+        server.close()
+        await server.wait_closed()
+
+def test_concurrent_requests_share_one_loop():
+    app = AskServer(SlowGraph(0.2), max_inflight=50, max_queue=0)
+    started = time.perf_counter()
+    responses = asyncio.run(_run(app, [{"input": f"q{i}"} for i in range(20)]))
+    assert [r.json()["summary"] for r in responses] == [f"Q{i}" for i in range(20)]
+    # 20 × 0.2s questions overlap instead of running back to back
+    assert time.perf_counter() - started < 2.0
+
+def test_backpressure_timeout_and_validation():
+    app = AskServer(SlowGraph(0.3), max_inflight=1, max_queue=1, timeout=1.0)
+    statuses = sorted(r.status_code for r in asyncio.run(_run(app, [{"input": "a"}] * 3)))
+    assert statuses == [200, 200, 503]
+
+    app = AskServer(SlowGraph(0.5), timeout=0.05)
+    assert asyncio.run(_run(app, [{"input": "a"}]))[0].status_code == 504
+    assert asyncio.run(_run(app, [{"nope": 1}]))[0].status_code == 400
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    app = AskServer(SlowGraph(0), max_inflight=4, max_queue=0)
+    status, _ = asyncio.run(app.route("POST", "/ask", b'{"input": "hi"}'))
+    assert status == 200
+
+    status, text = asyncio.run(app.route("GET", "/metrics", b""))
+    assert status == 200
+    assert "server_request_seconds_count" in text
+
+    status, snapshot = asyncio.run(app.route("GET", "/metrics", b"", "format=json"))
+    assert "server_request_seconds" in snapshot["histograms"]
+
+
+def test_invalid_content_length_gets_400():
+    app = AskServer(SlowGraph(0), max_inflight=4, max_queue=0)
+
+    async def raw(length):
+        server = await app.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /ask HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            return status_line
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert b" 400 " in asyncio.run(raw("abc"))
+    assert b" 400 " in asyncio.run(raw("-5"))
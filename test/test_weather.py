@@ -12,3 +12,78 @@ def test_format_weather_summary_basic():
     assert "TestCity" in s
     assert "light rain" in s
     assert "25" in s
+
+def test_fetch_weather_uses_cache(monkeypatch):
+    import weather
+    calls = []
+
+    async def fake_request(city, api_key, units):
+        calls.append(city)
+        return {"name": city}
+
+    monkeypatch.setattr(weather.weather_client, "_request", fake_request)
+    weather.weather_cache.clear()
+
+    first = weather.fetch_weather("Pune", api_key="test")
+    second = weather.fetch_weather("  pune? ", api_key="test")
+
+    assert first == second
+    assert calls == ["Pune"]
+
+def test_weather_cache_lru_and_stale_while_revalidate():
+    from weather import WeatherCache
+    now = [0.0]
+    cache = WeatherCache(ttl=10, maxsize=2, stale_while_revalidate=True)
+    cache._cache._clock = lambda: now[0]
+
+    cache.set("a", "metric", {"v": 1})
+    cache.set("b", "metric", {"v": 2})
+    cache.set("c", "metric", {"v": 3})
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 15
+    refreshed = []
+    value = cache.get_or_fetch("c", "metric", lambda: refreshed.append(1) or {"v": 4})
+    assert value == {"v": 3}
+    assert cache.stats()["stale_hits"] == 1
+
+@pytest.fixture
+def stub_weather_server():
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            city = parse_qs(urlparse(self.path).query)["q"][0]
+            hits.append(city)
+            body = json.dumps({"name": city, "main": {"temp": 20}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/weather", hits
+    server.shutdown()
+
+def test_async_client_fetch_many_against_stub(stub_weather_server):
+    from async_utils import run_sync
+    from weather import AsyncWeatherClient
+    url, hits = stub_weather_server
+    client = AsyncWeatherClient(base_url=url, api_key="test", max_concurrency=2)
+
+    results = run_sync(client.fetch_many(["Pune", "Delhi", "pune", "Chennai"]))
+
+    assert [r["name"] for r in results] == ["Pune", "Delhi", "Pune", "Chennai"]
+    assert sorted(hits) == ["Chennai", "Delhi", "Pune"]